@@ -2,7 +2,7 @@
 KIS API 계정 관리자 (v3: Limit-then-Market 로직 추가)
 """
 import time
-from typing import Dict, List, Optional
+from typing import Callable, Dict, List, Optional
 import logging
 from api.kis_api import KISApi
 
@@ -18,9 +18,10 @@ class OrderResult:
 class KISAccountManager:
     """KIS 계정 관리자 - KISApi를 사용하여 API 호출을 위임"""
     
-    def __init__(self, app_key: str, app_secret: str, account_no: str):
+    def __init__(self, app_key: str, app_secret: str, account_no: str, fill_bus=None):
         self.account_no = account_no
         self.api = KISApi(app_key, app_secret, account_no)
+        self.fill_bus = fill_bus  # 실시간 체결통보 버스 (FillEventBus). 없으면 REST 체결 조회만 사용
         logger.info("✅ [Manager] KISAccountManager 초기화 완료 (KISApi 사용)")
 
     def _get_account_parts(self):
@@ -126,6 +127,13 @@ class KISAccountManager:
             logger.error(f"[OPEN_ORDER] {stock_code} 미체결 주문 조회 오류: {e}")
             return False
 
+    def set_fill_bus(self, fill_bus):
+        """체결 대기에 사용할 체결통보 버스를 지정합니다."""
+        self.fill_bus = fill_bus
+
+    def _fills_live(self) -> bool:
+        return self.fill_bus is not None and self.fill_bus.live
+
     def get_filled_qty(self, order_id: str) -> int:
         """주문 ID로 체결 수량을 조회합니다."""
         try:
@@ -137,6 +145,23 @@ class KISAccountManager:
             logger.error(f"[FILLED_QTY] {order_id} 체결 수량 조회 오류: {e}")
             return 0
 
+    def wait_for_fill(self, order_id: str, quantity: int, timeout: float, poll_interval: float = 0.2) -> int:
+        """
+        주문의 누적 체결수량이 quantity에 도달할 때까지 최대 timeout초 기다립니다.
+        실시간 체결통보가 살아 있으면 이벤트를 기다리고, 아니면 REST 체결 조회를 poll_interval 간격으로 반복합니다.
+        """
+        deadline = time.time() + timeout
+        while True:
+            if self._fills_live():
+                filled = self.fill_bus.wait_for_fill(order_id, quantity, max(0.0, deadline - time.time()))
+            else:
+                filled = self.get_filled_qty(order_id)
+            remaining = deadline - time.time()
+            if filled >= quantity or remaining <= 0:
+                return filled
+            if not self._fills_live():
+                time.sleep(min(poll_interval, remaining))
+
     def cancel_order(self, order_id: str) -> bool:
         """주문 ID로 주문을 취소합니다."""
         try:
@@ -174,22 +199,20 @@ class KISAccountManager:
         order_id = limit_res['order_id']
         start = time.time()
 
-        # 2) 짧은 시간 동안 체결 확인
-        while time.time() - start < check_wait_sec:
-            filled = self.get_filled_qty(order_id)
-            if filled >= quantity:
-                return OrderResult(True, order_id, filled, "LIMIT_FILLED_FAST")
-            time.sleep(poll_interval)
+        # 2) 짧은 시간 동안 체결 확인 (체결통보 이벤트 대기, 미연결 시 REST 폴링)
+        filled = self.wait_for_fill(order_id, quantity, check_wait_sec, poll_interval)
+        if filled >= quantity:
+            return OrderResult(True, order_id, filled, "LIMIT_FILLED_FAST")
 
         # 3) 추가 대기
-        while time.time() - start < max_wait_sec:
-            filled = self.get_filled_qty(order_id)
-            if filled >= quantity:
-                return OrderResult(True, order_id, filled, "LIMIT_FILLED_SLOW")
-            time.sleep(poll_interval)
+        filled = self.wait_for_fill(order_id, quantity, max_wait_sec - (time.time() - start), poll_interval)
+        if filled >= quantity:
+            return OrderResult(True, order_id, filled, "LIMIT_FILLED_SLOW")
 
-        # 4) 부분 체결 또는 미체결 처리
+        # 4) 부분 체결 또는 미체결 처리 (취소 전 REST로 최종 확인)
         filled = self.get_filled_qty(order_id)
+        if self.fill_bus is not None:
+            filled = max(filled, self.fill_bus.filled(order_id)[0])
         remaining = max(0, quantity - filled)
 
         try:
@@ -267,6 +290,54 @@ class KISAccountManager:
             logger.error(f"❌ [PRICE] {stock_code} 현재가 조회 오류: {e}")
             return {}
 
+    def get_minute_bars(self, stock_code: str, end_time: str, start_time: Optional[str] = None, max_pages: int = 5,
+                        before_page: Optional[Callable[[], None]] = None) -> List[Dict]:
+        """
+        당일 1분봉 조회 (end_time 'HHMMSS' 이전, 오래된 순).
+        한 번에 최대 30개씩 과거 방향으로 받아오며, start_time('HHMMSS')까지 채워지면 중단합니다.
+        before_page: 페이지 요청 직전마다 호출 (호출 측 속도 제한용)
+        """
+        code = stock_code.lstrip('A').zfill(6)
+        bars: Dict[str, Dict] = {}
+        cursor = end_time
+        try:
+            for _ in range(max_pages):
+                if before_page is not None:
+                    before_page()
+                params = {
+                    "FID_ETC_CLS_CODE": "",
+                    "FID_COND_MRKT_DIV_CODE": "J",
+                    "FID_INPUT_ISCD": code,
+                    "FID_INPUT_HOUR_1": cursor,
+                    "FID_PW_DATA_INCU_YN": "N",
+                }
+                data = self.api.request("minute_chart", params=params)
+                if not (data and data.get("rt_cd") == "0"):
+                    break
+                rows = data.get("output2") or []
+                for row in rows:
+                    date, hhmmss = row.get('stck_bsop_date', ''), row.get('stck_cntg_hour', '')
+                    if not (date and hhmmss):
+                        continue
+                    bars[date + hhmmss[:4]] = {
+                        'time': date + hhmmss[:4],  # YYYYMMDDHHMM
+                        'open': float(row.get('stck_oprc', 0) or 0),
+                        'high': float(row.get('stck_hgpr', 0) or 0),
+                        'low': float(row.get('stck_lwpr', 0) or 0),
+                        'close': float(row.get('stck_prpr', 0) or 0),
+                        'volume': float(row.get('cntg_vol', 0) or 0),
+                    }
+                if len(rows) < 30:
+                    break
+                oldest = min(r.get('stck_cntg_hour', cursor) for r in rows)
+                if start_time and oldest <= start_time:
+                    break
+                cursor = oldest
+            return [bars[k] for k in sorted(bars)]
+        except Exception as e:
+            logger.error(f"❌ [CHART] {stock_code} 분봉 조회 오류: {e}")
+            return [bars[k] for k in sorted(bars)]
+
     def get_total_assets(self) -> int:
         """현재 총 자산(현금 + 주식 평가액)을 API를 통해 직접 조회합니다."""
         try:
@@ -282,6 +353,6 @@ class KISAccountManager:
             logger.error(f"❌ [ASSETS] 총 자산 조회 중 예외 발생: {e}", exc_info=True)
             return 0
 
-def init_account_manager(app_key: str, app_secret: str, account_no: str):
+def init_account_manager(app_key: str, app_secret: str, account_no: str, fill_bus=None):
     """계정 관리자 초기화"""
-    return KISAccountManager(app_key, app_secret, account_no)
\ No newline at end of file
+    return KISAccountManager(app_key, app_secret, account_no, fill_bus=fill_bus)
\ No newline at end of file
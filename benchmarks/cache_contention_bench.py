@@ -0,0 +1,90 @@
+# filepath: c:\WORK\kis-scalper\benchmarks\cache_contention_bench.py
+"""
+MarketCache 읽기/쓰기 경합 벤치마크
+- 수신 스레드(writer)가 틱을 계속 반영하는 동안 조회 스레드(reader)들이 매수/매도 점검·스크리너처럼
+  get_quote_full / get_candles / get_daily_vwap / get_spread_pct / get_recent_series를 반복 호출한다.
+- 보고 항목: writer 처리량(ticks/s), reader 호출 수, get_stats()['locks']의 역할별 락 경합/대기 시간
+- 실행: python -m benchmarks.cache_contention_bench [--symbols 50 --readers 4 --seconds 3 --stripes 16]
+"""
+import argparse
+import random
+import sys
+import threading
+import time
+from pathlib import Path
+
+# 프로젝트 루트를 Python path에 추가
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from benchmarks.tick_generator import tick_size
+from web_socket.market_cache import MarketCache
+
+
+def writer(cache, codes, stop, counter, seed):
+    rng = random.Random(seed)
+    price = {c: float(rng.choice([1500, 4800, 12000, 35000, 71000])) for c in codes}
+    t = time.time() - 3600
+    n = 0
+    while not stop.is_set():
+        batch = []
+        for _ in range(8):
+            code = rng.choice(codes)
+            step = tick_size(price[code])
+            price[code] = max(step, price[code] + step * rng.choice((-1, 0, 0, 1)))
+            batch.append((code, {'code': code, 'price': price[code], 'exec_vol': float(rng.randint(1, 500)),
+                                 'ask_price1': price[code] + step, 'bid_price1': price[code]}))
+        t += 0.05
+        cache.update_ticks(batch, t)
+        n += len(batch)
+    counter.append(n)
+
+
+def reader(cache, codes, stop, counter, seed):
+    rng = random.Random(seed)
+    n = 0
+    while not stop.is_set():
+        code = rng.choice(codes)
+        cache.get_quote_full(code)
+        cache.get_candles(code, 1)
+        cache.get_candles(code, 5)
+        cache.get_daily_vwap(code)
+        cache.get_spread_pct(code)
+        cache.get_recent_series(code, 60)
+        n += 6
+    counter.append(n)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--symbols', type=int, default=50)
+    parser.add_argument('--writers', type=int, default=1, help='수신 스레드 수 (샤드 수)')
+    parser.add_argument('--readers', type=int, default=4)
+    parser.add_argument('--seconds', type=float, default=3.0)
+    parser.add_argument('--stripes', type=int, default=16)
+    args = parser.parse_args()
+
+    cache = MarketCache({'cache': {'lock_stripes': args.stripes}})
+    codes = [f"{300000 + i * 37:06d}" for i in range(args.symbols)]
+    # 샤드처럼 writer마다 서로 다른 종목을 맡긴다
+    shards = [codes[i::args.writers] for i in range(args.writers)]
+    stop = threading.Event()
+    written, read = [], []
+    threads = [threading.Thread(target=writer, args=(cache, shards[i], stop, written, i)) for i in range(args.writers)]
+    threads += [threading.Thread(target=reader, args=(cache, codes, stop, read, 100 + i)) for i in range(args.readers)]
+    for th in threads:
+        th.start()
+    time.sleep(args.seconds)
+    stop.set()
+    for th in threads:
+        th.join()
+
+    stats = cache.get_stats()
+    print(f"symbols={args.symbols} writers={args.writers} readers={args.readers} seconds={args.seconds}")
+    print(f"writer : {sum(written) / args.seconds:,.0f} ticks/s")
+    print(f"reader : {sum(read) / args.seconds:,.0f} calls/s")
+    for role, s in stats.get('locks', {}).items():
+        print(f"lock[{role}]: {s}")
+
+
+if __name__ == '__main__':
+    main()
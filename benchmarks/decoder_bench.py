@@ -0,0 +1,120 @@
+# filepath: c:\WORK\kis-scalper\benchmarks\decoder_bench.py
+"""
+실시간 체결가(H0STCNT0) 디코더 마이크로벤치마크
+- 기존 수작업 파서(45개 키 전체 변환)와 스키마 컴파일 디코더(hot 필드만 즉시 변환)를 비교한다.
+- 실행: python -m benchmarks.decoder_bench [--records 200000]
+"""
+import argparse
+import sys
+import timeit
+from pathlib import Path
+
+# 프로젝트 루트를 Python path에 추가
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from web_socket.frame_decoder import H0STCNT0_SCHEMA, build_decoders, split_frame
+
+SAMPLE_RECORD = [
+    "005930", "093354", "71000", "2", "100", "0.14", "70900", "70500", "71200", "70400",
+    "71100", "71000", "10", "1000", "71000000", "5", "6", "1", "100.5", "500",
+    "600", "1", "50", "80", "090000", "2", "500", "091000", "5", "200",
+    "090100", "2", "600", "20250101", "20", "N", "100", "200", "1000", "2000",
+    "0.1", "900", "110", "0", "0", "0",
+]
+
+
+def _legacy_parse_fields(data_fields):
+    """기존 on_message의 캐럿 파서 (비교 기준)"""
+    return {
+        'code': data_fields[0], 'exec_time': data_fields[1], 'price': float(data_fields[2] or 0),
+        'change_sign': data_fields[3], 'change': float(data_fields[4] or 0), 'change_rate': float(data_fields[5] or 0),
+        'wghn_avrg_stck_prc': float(data_fields[6] or 0), 'open_price': float(data_fields[7] or 0),
+        'high_price': float(data_fields[8] or 0), 'low_price': float(data_fields[9] or 0),
+        'ask_price1': float(data_fields[10] or 0), 'bid_price1': float(data_fields[11] or 0),
+        'exec_vol': float(data_fields[12] or 0), 'acc_vol': float(data_fields[13] or 0),
+        'acc_tr_amount': float(data_fields[14] or 0), 'seln_cntg_csnu': int(data_fields[15] or 0),
+        'shnu_cntg_csnu': int(data_fields[16] or 0), 'ntby_cntg_csnu': int(data_fields[17] or 0),
+        'cttr': float(data_fields[18] or 0), 'seln_cntg_smtn': float(data_fields[19] or 0),
+        'shnu_cntg_smtn': float(data_fields[20] or 0), 'ccld_dvsn': data_fields[21],
+        'shnu_rate': float(data_fields[22] or 0), 'prdy_vol_vrss_acml_vol_rate': float(data_fields[23] or 0),
+        'oprc_hour': data_fields[24], 'oprc_vrss_prpr_sign': data_fields[25], 'oprc_vrss_prpr': float(data_fields[26] or 0),
+        'hgpr_hour': data_fields[27], 'hgpr_vrss_prpr_sign': data_fields[28], 'hgpr_vrss_prpr': float(data_fields[29] or 0),
+        'lwpr_hour': data_fields[30], 'lwpr_vrss_prpr_sign': data_fields[31], 'lwpr_vrss_prpr': float(data_fields[32] or 0),
+        'bsop_date': data_fields[33], 'new_mkop_cls_code': data_fields[34], 'trht_yn': data_fields[35],
+        'askp_rsqn1': float(data_fields[36] or 0), 'bidp_rsqn1': float(data_fields[37] or 0),
+        'total_askp_rsqn': float(data_fields[38] or 0), 'total_bidp_rsqn': float(data_fields[39] or 0),
+        'vol_tnrt': float(data_fields[40] or 0), 'prdy_smns_hour_acml_vol': float(data_fields[41] or 0),
+        'prdy_smns_hour_acml_vol_rate': float(data_fields[42] or 0), 'hour_cls_code': data_fields[43],
+        'mrkt_trtm_cls_code': data_fields[44], 'vi_stnd_prc': float(data_fields[45] or 0),
+    }
+
+
+def _legacy_parse_json(output):
+    """기존 on_message의 JSON 파서 (비교 기준)"""
+    return {
+        'code': output.get('MKSC_SHRN_ISCD', ''), 'exec_time': output.get('STCK_CNTG_HOUR', ''),
+        'price': float(output.get('STCK_PRPR', 0) or 0), 'change_sign': output.get('PRDY_VRSS_SIGN', ''),
+        'change': float(output.get('PRDY_VRSS', 0) or 0), 'change_rate': float(output.get('PRDY_CTRT', 0) or 0),
+        'wghn_avrg_stck_prc': float(output.get('WGHN_AVRG_STCK_PRC', 0) or 0), 'open_price': float(output.get('STCK_OPRC', 0) or 0),
+        'high_price': float(output.get('STCK_HGPR', 0) or 0), 'low_price': float(output.get('STCK_LWPR', 0) or 0),
+        'ask_price1': float(output.get('ASKP1', 0) or 0), 'bid_price1': float(output.get('BIDP1', 0) or 0),
+        'exec_vol': float(output.get('CNTG_VOL', 0) or 0), 'acc_vol': float(output.get('ACML_VOL', 0) or 0),
+        'acc_tr_amount': float(output.get('ACML_TR_PBMN', 0) or 0), 'seln_cntg_csnu': int(output.get('SELN_CNTG_CSNU', 0) or 0),
+        'shnu_cntg_csnu': int(output.get('SHNU_CNTG_CSNU', 0) or 0), 'ntby_cntg_csnu': int(output.get('NTBY_CNTG_CSNU', 0) or 0),
+        'cttr': float(output.get('CTTR', 0) or 0), 'seln_cntg_smtn': float(output.get('SELN_CNTG_SMTN', 0) or 0),
+        'shnu_cntg_smtn': float(output.get('SHNU_CNTG_SMTN', 0) or 0), 'ccld_dvsn': output.get('CCLD_DVSN', ''),
+        'shnu_rate': float(output.get('SHNU_RATE', 0) or 0), 'prdy_vol_vrss_acml_vol_rate': float(output.get('PRDY_VOL_VRSS_ACML_VOL_RATE', 0) or 0),
+        'oprc_hour': output.get('OPRC_HOUR', ''), 'oprc_vrss_prpr_sign': output.get('OPRC_VRSS_PRPR_SIGN', ''),
+        'oprc_vrss_prpr': float(output.get('OPRC_VRSS_PRPR', 0) or 0), 'hgpr_hour': output.get('HGPR_HOUR', ''),
+        'hgpr_vrss_prpr_sign': output.get('HGPR_VRSS_PRPR_SIGN', ''), 'hgpr_vrss_prpr': float(output.get('HGPR_VRSS_PRPR', 0) or 0),
+        'lwpr_hour': output.get('LWPR_HOUR', ''), 'lwpr_vrss_prpr_sign': output.get('LWPR_VRSS_PRPR_SIGN', ''),
+        'lwpr_vrss_prpr': float(output.get('LWPR_VRSS_PRPR', 0) or 0), 'bsop_date': output.get('BSOP_DATE', ''),
+        'new_mkop_cls_code': output.get('NEW_MKOP_CLS_CODE', ''), 'trht_yn': output.get('TRHT_YN', ''),
+        'askp_rsqn1': float(output.get('ASKP_RSQN1', 0) or 0), 'bidp_rsqn1': float(output.get('BIDP_RSQN1', 0) or 0),
+        'total_askp_rsqn': float(output.get('TOTAL_ASKP_RSQN', 0) or 0), 'total_bidp_rsqn': float(output.get('TOTAL_BIDP_RSQN', 0) or 0),
+        'vol_tnrt': float(output.get('VOL_TNRT', 0) or 0), 'prdy_smns_hour_acml_vol': float(output.get('PRDY_SMNS_HOUR_ACML_VOL', 0) or 0),
+        'prdy_smns_hour_acml_vol_rate': float(output.get('PRDY_SMNS_HOUR_ACML_VOL_RATE', 0) or 0), 'hour_cls_code': output.get('HOUR_CLS_CODE', ''),
+        'mrkt_trtm_cls_code': output.get('MRKT_TRTM_CLS_CODE', ''), 'vi_stnd_prc': float(output.get('VI_STND_PRC', 0) or 0),
+    }
+
+
+def _bench(label, fn, n):
+    per_call = min(timeit.repeat(fn, number=n, repeat=5)) / n
+    print(f"  {label:<36s} {per_call * 1e9:9.0f} ns/record")
+    return per_call
+
+
+def main():
+    parser = argparse.ArgumentParser(description="H0STCNT0 decoder microbenchmark")
+    parser.add_argument("--records", type=int, default=200000, help="측정 반복 횟수")
+    args = parser.parse_args()
+    n = args.records
+
+    decoder = build_decoders()['H0STCNT0']
+    fields = list(SAMPLE_RECORD)
+    output = {kis_name: value for (_, kis_name, _), value in zip(H0STCNT0_SCHEMA, SAMPLE_RECORD)}
+    message = "0|H0STCNT0|001|" + "^".join(SAMPLE_RECORD)
+
+    # 결과 동일성 확인 (hot 필드 + 지연 변환 필드)
+    legacy = _legacy_parse_fields(fields)
+    compiled = decoder.decode_fields(fields).materialize()
+    assert compiled == legacy, "컴파일 디코더 결과가 기존 파서와 다릅니다."
+    assert decoder.decode_json(output).materialize() == _legacy_parse_json(output)
+
+    print(f"H0STCNT0 decoder benchmark (n={n:,}, hot={len(decoder.hot_fields)}/{decoder.width} fields)")
+    print("[caret record]")
+    a = _bench("legacy full dict", lambda: _legacy_parse_fields(fields), n)
+    b = _bench("compiled (hot only)", lambda: decoder.decode_fields(fields), n)
+    print(f"  -> speedup x{a / b:.2f}")
+    print("[caret frame incl. split]")
+    a = _bench("legacy split + full dict", lambda: _legacy_parse_fields(message.split('|')[3].split('^')), n)
+    b = _bench("split_frame + compiled", lambda: decoder.decode_frame(split_frame(message)), n)
+    print(f"  -> speedup x{a / b:.2f}")
+    print("[json output]")
+    a = _bench("legacy full dict", lambda: _legacy_parse_json(output), n)
+    b = _bench("compiled (hot only)", lambda: decoder.decode_json(output), n)
+    print(f"  -> speedup x{a / b:.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,213 @@
+# filepath: c:\WORK\kis-scalper\benchmarks\ingest_bench.py
+"""
+실시간 수신 경로(ingest) 처리량 벤치마크
+- 합성 H0STCNT0 프레임을 지정한 속도로 실제 KISWebSocketClient.on_message에 넣고
+  split_frame → decode → MarketCache.update_ticks → data_logger → event_logger 경로를 그대로 통과시킨다.
+- 보고 항목: 유지 처리량(frames/s, ticks/s), 단계별 CPU 시간, 처리 지연 p50/p99/max, 메모리 증가량, 버퍼 최대 깊이/유실
+- 같은 seed/옵션이면 같은 프레임 열을 사용하므로 수신 경로 변경 전후를 비교할 수 있다.
+- 실행: python -m benchmarks.ingest_bench --symbols 50 --frames 20000 --rates 2000,5000,max [--json out.json]
+"""
+import argparse
+import json
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+from time import monotonic, thread_time
+
+# 프로젝트 루트를 Python path에 추가
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import web_socket.web_socket_manager as wsm
+from benchmarks.tick_generator import SyntheticTickGenerator
+from web_socket.market_cache import MarketCache
+from web_socket.web_socket_manager import KISWebSocketClient
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+
+class _Api:
+    access_token = "bench"
+
+
+class _AccountManager:
+    api = _Api()
+
+
+class StageTimer:
+    """함수 호출을 감싸 해당 스레드의 CPU 시간과 호출 수를 누적"""
+
+    def __init__(self):
+        self.cpu = {}
+        self.calls = {}
+
+    def wrap(self, name, fn):
+        self.cpu[name] = 0.0
+        self.calls[name] = 0
+        cpu, calls = self.cpu, self.calls
+
+        def timed(*args, **kwargs):
+            t0 = thread_time()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                cpu[name] += thread_time() - t0
+                calls[name] += 1
+        return timed
+
+
+def _percentile(sorted_values, q):
+    if not sorted_values:
+        return 0.0
+    k = min(len(sorted_values) - 1, int(round(q * (len(sorted_values) - 1))))
+    return sorted_values[k]
+
+
+def _rss_kb():
+    if resource is None:
+        return None
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss / 1024 if sys.platform == "darwin" else rss
+
+
+def run_once(frames, rate, args):
+    cfg = {'system': {
+        'ws_pipeline': not args.no_pipeline,
+        'ws_queue_size': args.queue_size,
+        'ws_backpressure': args.policy,
+    }}
+    client = KISWebSocketClient(cfg, _AccountManager(), "b" * 20, market_cache=MarketCache(cfg))
+
+    # 단계별 CPU 계측 (벤치마크 프로세스 안에서만 교체)
+    timer = StageTimer()
+    orig = dict(split=wsm.split_frame, add_tick=wsm.data_logger.add_tick, log_event=wsm.event_logger.log_event)
+    wsm.split_frame = timer.wrap("split_frame", orig['split'])
+    decoder = client._decoders['H0STCNT0']
+    decoder.decode_frame = timer.wrap("decode", decoder.decode_frame)
+    client.market_cache.update_ticks = timer.wrap("market_cache", client.market_cache.update_ticks)
+    wsm.data_logger.add_tick = timer.wrap("data_logger", orig['add_tick'])
+    wsm.event_logger.log_event = timer.wrap("event_logger", orig['log_event'])
+
+    latencies = []
+    process = client._process_message
+
+    def measured(message, recv_ts=None):
+        t0 = recv_ts if recv_ts is not None else monotonic()
+        process(message, recv_ts)
+        latencies.append(monotonic() - t0)
+
+    client._process_message = measured
+    if client._pipeline:
+        client._pipeline._handler = measured
+        client._pipeline.start()
+
+    if args.memory:
+        tracemalloc.start()
+    mem0 = tracemalloc.get_traced_memory()[0] if args.memory else None
+    rss0 = _rss_kb()
+
+    start = monotonic()
+    feed_cpu0 = thread_time()
+    for i, frame in enumerate(frames):
+        if rate:
+            ahead = start + i / rate - monotonic()
+            if ahead > 0.0005:
+                time.sleep(ahead)
+        client.on_message(None, frame)
+    feed_elapsed = monotonic() - start
+    feed_cpu = thread_time() - feed_cpu0
+
+    while len(latencies) < len(frames) and client._pipeline:
+        stats = client._pipeline.get_stats()
+        if stats['processed'] + stats['dropped'] >= len(frames):
+            break
+        time.sleep(0.005)
+    elapsed = monotonic() - start
+    pipe_stats = client.get_pipeline_stats()
+    client.stop()
+
+    mem = (tracemalloc.get_traced_memory()[0] - mem0) if args.memory else None
+    if args.memory:
+        tracemalloc.stop()
+    rss1 = _rss_kb()
+
+    # 원래 함수 복원
+    wsm.split_frame = orig['split']
+    wsm.data_logger.add_tick = orig['add_tick']
+    wsm.event_logger.log_event = orig['log_event']
+
+    lat = sorted(latencies)
+    ticks = client.market_cache.get_stats()['tick_count']
+    return {
+        "offered_rate": rate or "max",
+        "frames": len(frames),
+        "processed": len(lat),
+        "ticks": ticks,
+        "feed_sec": round(feed_elapsed, 3),
+        "total_sec": round(elapsed, 3),
+        "frames_per_sec": round(len(lat) / elapsed, 1) if elapsed else 0.0,
+        "ticks_per_sec": round(ticks / elapsed, 1) if elapsed else 0.0,
+        "latency_ms": {
+            "p50": round(_percentile(lat, 0.50) * 1000, 3),
+            "p99": round(_percentile(lat, 0.99) * 1000, 3),
+            "max": round(lat[-1] * 1000, 3) if lat else 0.0,
+        },
+        "cpu_sec": dict({k: round(v, 4) for k, v in timer.cpu.items()}, receive=round(feed_cpu, 4)),
+        "cpu_us_per_tick": {k: round(v / ticks * 1e6, 2) if ticks else 0.0 for k, v in timer.cpu.items()},
+        "max_depth": pipe_stats.get("max_depth"),
+        "dropped": pipe_stats.get("dropped", 0),
+        "mem_growth_kb": round(mem / 1024, 1) if mem is not None else None,
+        "max_rss_growth_kb": round(rss1 - rss0, 1) if rss0 is not None else None,
+    }
+
+
+def _print_result(r):
+    lat = r["latency_ms"]
+    print(f"[rate={r['offered_rate']}] {r['processed']:,}/{r['frames']:,} frames, {r['ticks']:,} ticks in {r['total_sec']}s "
+          f"(feed {r['feed_sec']}s)")
+    print(f"  throughput : {r['frames_per_sec']:,.0f} frames/s, {r['ticks_per_sec']:,.0f} ticks/s")
+    print(f"  latency    : p50 {lat['p50']} ms, p99 {lat['p99']} ms, max {lat['max']} ms")
+    print(f"  buffer     : max depth {r['max_depth']}, dropped {r['dropped']}")
+    stages = ", ".join(f"{k} {v}us" for k, v in r["cpu_us_per_tick"].items())
+    print(f"  cpu/tick   : {stages}")
+    if r["mem_growth_kb"] is not None:
+        print(f"  memory     : +{r['mem_growth_kb']:,} KiB (tracemalloc)")
+    elif r["max_rss_growth_kb"] is not None:
+        print(f"  memory     : max RSS +{r['max_rss_growth_kb']:,} KiB")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="websocket ingest throughput benchmark")
+    parser.add_argument("--symbols", type=int, default=50)
+    parser.add_argument("--frames", type=int, default=20000)
+    parser.add_argument("--records-per-frame", type=int, default=1)
+    parser.add_argument("--rates", default="2000,5000,max", help="초당 프레임 수 목록 (max = 대기 없이)")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--policy", default="block", help="파이프라인 backpressure 정책")
+    parser.add_argument("--queue-size", type=int, default=20000)
+    parser.add_argument("--no-pipeline", action="store_true", help="수신 스레드에서 직접 처리")
+    parser.add_argument("--memory", action="store_true", help="tracemalloc으로 메모리 증가량 측정 (느려짐)")
+    parser.add_argument("--json", help="결과를 JSON 파일로 저장")
+    args = parser.parse_args()
+
+    results = []
+    for token in args.rates.split(","):
+        token = token.strip().lower()
+        rate = 0 if token in ("max", "0") else float(token)
+        gen = SyntheticTickGenerator(args.symbols, seed=args.seed, records_per_frame=args.records_per_frame)
+        frames = list(gen.frames(args.frames))
+        result = run_once(frames, rate, args)
+        _print_result(result)
+        results.append(result)
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump({"args": vars(args), "results": results}, f, ensure_ascii=False, indent=2)
+        print(f"saved: {args.json}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+# filepath: c:\WORK\kis-scalper\benchmarks\tick_generator.py
+"""
+합성 실시간 체결가(H0STCNT0) 프레임 생성기
+- K개 종목에 대해 호가 단위를 지키는 랜덤 워크 가격, 누적 거래량/거래대금, 장중 체결 시각을 가진 캐럿 프레임을 만든다.
+- seed가 같으면 항상 같은 프레임 열을 생성한다. (벤치마크 재현성)
+"""
+import random
+from typing import Iterator, List
+
+from web_socket.frame_decoder import H0STCNT0_SCHEMA
+
+_IDX = {name: i for i, (name, _, _) in enumerate(H0STCNT0_SCHEMA)}
+
+
+def tick_size(price: float) -> int:
+    """KRX 호가 단위"""
+    if price < 2000: return 1
+    if price < 5000: return 5
+    if price < 20000: return 10
+    if price < 50000: return 50
+    if price < 200000: return 100
+    if price < 500000: return 500
+    return 1000
+
+
+class SyntheticTickGenerator:
+    def __init__(self, symbols: int = 50, seed: int = 42, records_per_frame: int = 1, start_sec: int = 9 * 3600):
+        self._rng = random.Random(seed)
+        self.records_per_frame = max(1, records_per_frame)
+        self.codes: List[str] = [f"{100000 + i * 37:06d}" for i in range(symbols)]
+        self._price = {c: float(self._rng.choice([1500, 4800, 12000, 35000, 71000, 250000])) for c in self.codes}
+        self._open = dict(self._price)
+        self._acc_vol = {c: 0.0 for c in self.codes}
+        self._acc_amt = {c: 0.0 for c in self.codes}
+        self._clock = float(start_sec)
+
+    def _record(self, code: str) -> str:
+        rng = self._rng
+        price = self._price[code]
+        step = tick_size(price)
+        price = max(step, price + step * rng.choice((-1, 0, 0, 1)))
+        self._price[code] = price
+        vol = float(rng.randint(1, 500))
+        self._acc_vol[code] += vol
+        self._acc_amt[code] += vol * price
+        self._clock += rng.random() * 0.01
+        sec = int(self._clock)
+        open_price = self._open[code]
+
+        f = ['0'] * len(H0STCNT0_SCHEMA)
+        f[_IDX['code']] = code
+        f[_IDX['exec_time']] = f"{sec // 3600:02d}{sec // 60 % 60:02d}{sec % 60:02d}"
+        f[_IDX['price']] = f"{price:.0f}"
+        f[_IDX['change_sign']] = '2' if price >= open_price else '5'
+        f[_IDX['change']] = f"{price - open_price:.0f}"
+        f[_IDX['change_rate']] = f"{(price - open_price) / open_price * 100:.2f}"
+        f[_IDX['open_price']] = f"{open_price:.0f}"
+        f[_IDX['high_price']] = f"{max(price, open_price):.0f}"
+        f[_IDX['low_price']] = f"{min(price, open_price):.0f}"
+        f[_IDX['ask_price1']] = f"{price + step:.0f}"
+        f[_IDX['bid_price1']] = f"{price:.0f}"
+        f[_IDX['exec_vol']] = f"{vol:.0f}"
+        f[_IDX['acc_vol']] = f"{self._acc_vol[code]:.0f}"
+        f[_IDX['acc_tr_amount']] = f"{self._acc_amt[code]:.0f}"
+        f[_IDX['askp_rsqn1']] = str(rng.randint(100, 5000))
+        f[_IDX['bidp_rsqn1']] = str(rng.randint(100, 5000))
+        f[_IDX['ccld_dvsn']] = rng.choice(('1', '5'))
+        f[_IDX['bsop_date']] = "20250101"
+        f[_IDX['trht_yn']] = 'N'
+        return "^".join(f)
+
+    def frame(self) -> str:
+        """종목 하나를 골라 records_per_frame건의 체결이 담긴 프레임 1개를 생성"""
+        code = self._rng.choice(self.codes)
+        n = self.records_per_frame
+        return f"0|H0STCNT0|{n:03d}|" + "^".join(self._record(code) for _ in range(n))
+
+    def frames(self, count: int) -> Iterator[str]:
+        for _ in range(count):
+            yield self.frame()
@@ -0,0 +1,121 @@
+# filepath: c:\WORK\kis-scalper\benchmarks\trend_bench.py
+"""
+MarketCache 캔들 트렌드(trend_3/5/10) 계산 비용 벤치마크
+- 기존 방식(틱마다 주기별 pandas DataFrame 생성 + set_index + _judge_trend)과
+  캔들이 바뀔 때만 갱신하는 O(1) 트렌드 상태를 같은 틱 열로 비교한다.
+- 두 방식의 틱별 trend_3/5/10 결과가 모두 같은지 검증한 뒤, 틱당 처리 시간을 보고한다.
+- 실행: python -m benchmarks.trend_bench [--symbols 20 --ticks 50000 --minutes 120]
+"""
+import argparse
+import random
+import sys
+import time
+from pathlib import Path
+
+# 프로젝트 루트를 Python path에 추가
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import pandas as pd
+
+from benchmarks.tick_generator import tick_size
+from web_socket.market_cache import MarketCache
+
+
+def _legacy_judge_trend(df):
+    """기존 MarketCache._judge_trend (비교 기준)"""
+    if len(df) < 2:
+        return None
+    try:
+        start_price = df['open'].iloc[0]
+        end_price = df['close'].iloc[-1]
+        if start_price == 0:
+            return None
+        change_rate = (end_price - start_price) / start_price
+        if change_rate > 0.005:
+            return '상승'
+        elif change_rate < -0.005:
+            return '하락'
+        else:
+            return '횡보'
+    except (IndexError, KeyError):
+        return None
+
+
+class LegacyTrendCache(MarketCache):
+    """틱마다 DataFrame으로 트렌드를 다시 계산하던 기존 경로"""
+
+    def _update_current_holding_data(self, sid, latest_data):
+        super()._update_current_holding_data(sid, latest_data)
+        holding = self._current_holding_data[sid]
+        for interval in [3, 5, 10]:
+            holding[f'trend_{interval}'] = None
+            candles = self._candles.get(sid, {}).get(interval, ()) # 기존 get_candles는 원본 deque를 반환
+            if len(candles) >= 2:
+                df = pd.DataFrame(list(candles))
+                df.set_index('start_min', inplace=True)
+                holding[f'trend_{interval}'] = _legacy_judge_trend(df)
+
+
+def make_ticks(symbols: int, count: int, minutes: int, seed: int):
+    """(코드, 가격, 체결량, 타임스탬프) 열. 변동폭이 커서 상승/하락/횡보가 모두 나오도록 가격을 움직인다"""
+    rng = random.Random(seed)
+    codes = [f"{200000 + i * 37:06d}" for i in range(symbols)]
+    price = {c: float(rng.choice([1500, 4800, 12000, 35000, 71000])) for c in codes}
+    start = time.mktime(time.strptime("2025-01-02 09:00:00", "%Y-%m-%d %H:%M:%S"))
+    step_sec = minutes * 60 / count
+    ticks = []
+    for i in range(count):
+        code = rng.choice(codes)
+        step = tick_size(price[code])
+        price[code] = max(step, price[code] + step * rng.choice((-2, -1, 0, 0, 1, 2)))
+        ticks.append((code, price[code], float(rng.randint(1, 500)), start + i * step_sec))
+    return ticks
+
+
+def run(cache_cls, ticks):
+    """틱을 하나씩 반영하며 (틱별 트렌드 결과, 총 소요 시간) 반환"""
+    cache = cache_cls({})
+    results = []
+    elapsed = 0.0
+    for code, price, vol, ts in ticks:
+        data = {'code': code, 'price': price, 'exec_vol': vol}
+        t0 = time.perf_counter()
+        cache.update_tick(code, data, ts)
+        elapsed += time.perf_counter() - t0
+        h = cache.get_holding_data(code)
+        results.append((h['trend_3'], h['trend_5'], h['trend_10']))
+    return results, elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--symbols', type=int, default=20)
+    parser.add_argument('--ticks', type=int, default=50000)
+    parser.add_argument('--minutes', type=int, default=120, help='틱 열이 걸치는 장중 시간(분)')
+    parser.add_argument('--seed', type=int, default=7)
+    args = parser.parse_args()
+
+    ticks = make_ticks(args.symbols, args.ticks, args.minutes, args.seed)
+
+    new_res, new_sec = run(MarketCache, ticks)
+    old_res, old_sec = run(LegacyTrendCache, ticks)
+
+    mismatches = sum(1 for a, b in zip(old_res, new_res) if a != b)
+    counts = {}
+    for row in new_res:
+        for trend in row:
+            counts[trend] = counts.get(trend, 0) + 1
+
+    n = len(ticks)
+    print(f"ticks={n} symbols={args.symbols} minutes={args.minutes}")
+    print(f"trend 분포: {counts}")
+    print(f"legacy (pandas DataFrame): {old_sec / n * 1e6:8.2f} us/tick")
+    print(f"incremental (O(1) 상태)  : {new_sec / n * 1e6:8.2f} us/tick")
+    print(f"speedup: x{old_sec / new_sec:.1f}")
+    print(f"결과 불일치: {mismatches}")
+    if mismatches:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -45,7 +45,8 @@ class Config:
                         "app_secret": secrets.get("APP_SECRET", ""),
                         "account_no": secrets.get("ACCOUNT_NO", ""),
                         "environment": secrets.get("ENVIRONMENT", "DEMO"),
-                        "custtype": secrets.get("CUSTTYPE", "P")
+                        "custtype": secrets.get("CUSTTYPE", "P"),
+                        "hts_id": secrets.get("HTS_ID", "")  # 실시간 체결통보(H0STCNI0) 구독용
                     },
                     "telegram": {
                         "bot_token": secrets.get("TELEGRAM_TOKEN", ""),
@@ -116,7 +117,45 @@ class Config:
                         "log_level": "INFO",
                         "health_check_interval": 300,
                         "backup_interval": 3600,
-                        "max_subscriptions": int(secrets.get("MAX_SUBSCRIPTIONS", 30))
+                        "max_subscriptions": int(secrets.get("MAX_SUBSCRIPTIONS", 30)),
+                        # 웹소켓 수신 파이프라인 (block / drop_oldest / coalesce)
+                        "ws_pipeline": secrets.get("WS_PIPELINE", True),
+                        "ws_queue_size": int(secrets.get("WS_QUEUE_SIZE", 20000)),
+                        "ws_backpressure": secrets.get("WS_BACKPRESSURE", "drop_oldest"),
+                        "ws_client": secrets.get("WS_CLIENT", "thread"),  # thread | asyncio
+                        "ws_send_interval": float(secrets.get("WS_SEND_INTERVAL", 0.05)),
+                        # 추가 세션용 접속 키 목록 (지정 시 세션당 구독 한도를 넘어 샤드로 분산 구독)
+                        "ws_shard_approval_keys": secrets.get("WS_SHARD_APPROVAL_KEYS", []),
+                        "ws_order_book": secrets.get("WS_ORDER_BOOK", True),  # 종가 후보 실시간 호가(H0STASP0) 구독
+                        # 원본 프레임 캡처 (data/capture/YYYY-MM-DD/*.seg, 재생/분석용)
+                        "ws_capture": secrets.get("WS_CAPTURE", False),
+                        "ws_capture_dir": secrets.get("WS_CAPTURE_DIR", "data/capture"),
+                        "ws_capture_segment_mb": int(secrets.get("WS_CAPTURE_SEGMENT_MB", 64)),
+                        # 웹소켓 접속 주소 (미지정 시 KIS 운영 서버, 재생 서버 사용 시 ws://127.0.0.1:21000/ws)
+                        "ws_url": secrets.get("WS_URL"),
+                        "ws_subscribe_rate": float(secrets.get("WS_SUBSCRIBE_RATE", 10)),  # 초당 구독/해지 메시지 수
+                        "ws_reconnect_max_delay": float(secrets.get("WS_RECONNECT_MAX_DELAY", 60)),  # 재연결 백오프 상한(초)
+                        "ws_gap_backfill": secrets.get("WS_GAP_BACKFILL", True),  # 재연결 후 REST 분봉으로 끊김 구간 보충
+                        # 장중 신규 구독 종목의 당일 분봉 REST 보충 (동시 처리 워커 수, 초당 페이지 요청 수)
+                        "intraday_backfill": secrets.get("INTRADAY_BACKFILL", True),
+                        "backfill_workers": int(secrets.get("BACKFILL_WORKERS", 2)),
+                        "backfill_rate": float(secrets.get("BACKFILL_RATE", 5)),
+                        # 대기 세션용 접속 키 (지정 시 같은 종목을 구독하는 핫 스탠바이 세션 운용, 샤드 미사용 시에만)
+                        "ws_standby_approval_key": secrets.get("WS_STANDBY_APPROVAL_KEY"),
+                        "ws_stall_sec": float(secrets.get("WS_STALL_SEC", 3)),  # 주 세션 무수신 시 대기 세션 전환 기준(초)
+                        "ws_exec_notice_tr": secrets.get("WS_EXEC_NOTICE_TR", "H0STCNI0")  # 체결통보 TR (모의투자: H0STCNI9)
+                    },
+                    "cache": {
+                        "lock_stripes": int(secrets.get("CACHE_LOCK_STRIPES", 16)),  # 종목별 쓰기 락 스트라이프 수
+                        # 모든 종목에 기본으로 만들 분 미만 봉 (예: ["5s", "v:10000"]). 비우면 declare_bars로 선언한 종목만
+                        "bar_specs": secrets.get("BAR_SPECS", []),
+                        "max_fine_bars": int(secrets.get("MAX_FINE_BARS", 600)),  # 초봉/거래량봉 종류별 보관 개수
+                        # 장중 재시작 복원용 체크포인트 (캔들/지표/최근 시세). 경로를 비우면 기록·복원하지 않음
+                        "checkpoint_path": secrets.get("CACHE_CHECKPOINT_PATH", "data/market_cache.ckpt"),
+                        "checkpoint_interval_sec": float(secrets.get("CACHE_CHECKPOINT_SEC", 30)),
+                        # 캐시 메모리 예산(MB). 넘으면 구독·보유하지 않는 종목을 LRU로 내보냄 (0이면 무제한)
+                        "memory_budget_mb": float(secrets.get("CACHE_MEMORY_BUDGET_MB", 256)),
+                        "spill_dir": secrets.get("CACHE_SPILL_DIR", "data/cache_spill")  # 내보낸 종목 보관 (비우면 버림)
                     }
                 }
                 
@@ -15,9 +15,21 @@ from strategies.swing_screener import get_swing_candidates, is_etf_like
 from strategies.news_handler import on_news_event
 from data.data_logger import data_logger
 from data.event_logger import event_logger
+from data.latency_tracer import latency_tracer
 from web_socket.web_socket_manager import KISWebSocketClient
+from web_socket.async_ws_client import AsyncKISWebSocketClient
+from web_socket.sharded_feed import ShardedFeed
+from web_socket.standby_feed import StandbyFeed
+from web_socket.gap_backfill import GapBackfiller
+from web_socket.intraday_backfill import IntradayBackfiller
+from web_socket.exec_notice import fill_events
+from web_socket.subscription_scheduler import (
+    SubscriptionScheduler, PRIORITY_HOLDING, PRIORITY_CANDIDATE, PRIORITY_WATCH
+)
 from web_socket.market_cache import init_market_cache    
+from web_socket.market_events import EVENT_QUOTE, latest_by_code
 from core.config import config
+from core.symbol_table import symbol_table
 from core.position_manager import RealPositionManager
 from utils.balance_manager import BalanceManager
 from utils.news_fetcher import news_fetcher
@@ -34,7 +46,11 @@ class IntegratedTradingSystem:
         self.position_manager = RealPositionManager()
         self.balance_manager = BalanceManager()
         self.ws_manager: KISWebSocketClient = None
+        self.sub_scheduler: Optional[SubscriptionScheduler] = None
+        self.gap_backfiller: Optional[GapBackfiller] = None
+        self.intraday_backfiller: Optional[IntradayBackfiller] = None
         self.subscribed_codes: Set[str] = set()
+        self.book_codes: Set[str] = set() # 실시간 호가(H0STASP0) 구독 종목
         self.beginning_total_assets = 0
 
         self.closing_price_candidates: List[Dict] = []
@@ -52,20 +68,23 @@ class IntegratedTradingSystem:
         logger.info("[SYSTEM] 종가 매매 전략 시스템으로 초기화")
 
     def _normalize_code(self, code: str) -> str:
-        return f"A{str(code).lstrip('A').zfill(6)}"
+        return symbol_table.normalize(code)
 
     def initialize(self) -> bool:
         try:
             logger.info("[SYSTEM] 시스템 초기화 시작")
             api_config = self.config.get('api', {})
             self.account_manager = init_account_manager(
-                api_config['app_key'], api_config['app_secret'], api_config['account_no']
+                api_config['app_key'], api_config['app_secret'], api_config['account_no'], fill_bus=fill_events
             )
             if not (self.account_manager and self.account_manager.api.access_token):
                 raise Exception("API 계정 인증 실패")
             logger.info("[SYSTEM] API 계정 인증 완료")
 
             self.market_cache = init_market_cache(self.config, self.position_manager, self.account_manager)
+            checkpoint_path = self.config.get('cache', {}).get('checkpoint_path')
+            if checkpoint_path:
+                self.market_cache.restore_checkpoint(checkpoint_path) # 장중 재시작이면 캔들/지표/시세 복원
             
             self.beginning_total_assets = self.account_manager.get_total_assets()
             if self.beginning_total_assets == 0:
@@ -90,8 +109,41 @@ class IntegratedTradingSystem:
             approval_key = self.account_manager.api.get_approval_key()
             if not approval_key: raise Exception("웹소켓 승인 키 발급 실패")
 
-            self.ws_manager = KISWebSocketClient(config=self.config, account_manager=self.account_manager, approval_key=approval_key, codes=codes_to_subscribe, market_cache=self.market_cache)
+            system_config = self.config.get('system', {})
+            ws_cls = AsyncKISWebSocketClient if system_config.get('ws_client') == 'asyncio' else KISWebSocketClient
+            gap_handler = None
+            if system_config.get('ws_gap_backfill', True):
+                self.gap_backfiller = GapBackfiller(self.account_manager, self.market_cache, data_logger)
+                gap_handler = self.gap_backfiller.on_gap
+            # 실시간 체결통보 (HTS ID가 있으면 구독, 주문 체결 확인을 REST 폴링 대신 이벤트로 대기)
+            hts_id = self.config.get('api', {}).get('hts_id')
+            ws_kwargs = dict(url=system_config.get('ws_url'), gap_handler=gap_handler)
+            if hts_id:
+                ws_kwargs.update(exec_notice_key=hts_id, exec_notice_tr=system_config.get('ws_exec_notice_tr', 'H0STCNI0'))
+            shard_keys = [k for k in system_config.get('ws_shard_approval_keys', []) if k]
+            standby_key = system_config.get('ws_standby_approval_key')
+            if shard_keys and standby_key:
+                logger.warning("[SYSTEM] 샤드 구성에서는 대기 세션(ws_standby_approval_key)을 사용하지 않습니다.")
+            if shard_keys:
+                self.ws_manager = ShardedFeed(self.config, self.account_manager, [approval_key] + shard_keys, self.market_cache, codes=codes_to_subscribe, client_cls=ws_cls, **ws_kwargs)
+                logger.info(f"[SYSTEM] 웹소켓 샤드 {len(shard_keys) + 1}개 구성 (최대 {self.ws_manager.capacity}종목)")
+            elif standby_key:
+                self.ws_manager = StandbyFeed(self.config, self.account_manager, approval_key, standby_key, self.market_cache, codes=codes_to_subscribe, client_cls=ws_cls, **ws_kwargs)
+                logger.info("[SYSTEM] 웹소켓 주/대기 세션 이중화 구성")
+            else:
+                self.ws_manager = ws_cls(config=self.config, account_manager=self.account_manager, approval_key=approval_key, codes=codes_to_subscribe, market_cache=self.market_cache, **ws_kwargs)
             self.subscribed_codes.update(codes_to_subscribe)
+            self.sub_scheduler = SubscriptionScheduler(
+                self.ws_manager, rate_per_sec=system_config.get('ws_subscribe_rate', 10), initial=codes_to_subscribe
+            )
+            self.sub_scheduler.start()
+            if system_config.get('intraday_backfill', True):
+                self.intraday_backfiller = IntradayBackfiller(
+                    self.account_manager, self.market_cache, data_logger,
+                    workers=system_config.get('backfill_workers', 2), rate_per_sec=system_config.get('backfill_rate', 5)
+                )
+                self.intraday_backfiller.start()
+                self.intraday_backfiller.request(codes_to_subscribe, PRIORITY_HOLDING) # 장중 재시작 시 보유 종목 캔들 보충
             logger.info(f"[SYSTEM] 시스템 초기화 완료. 보유 종목 {len(self.subscribed_codes)}개 구독 준비 완료.")
             return True
             
@@ -127,6 +179,7 @@ class IntegratedTradingSystem:
         threading.Thread(target=self._closing_price_buy_worker, daemon=True).start()
         threading.Thread(target=self._news_event_worker, daemon=True).start()
         threading.Thread(target=self._daily_reset_worker, daemon=True).start()
+        threading.Thread(target=self._checkpoint_worker, daemon=True).start()
         logger.info("[WORKER] 모든 워커 시작 완료")
 
     def _is_sell_time(self, now: datetime) -> bool:
@@ -149,7 +202,26 @@ class IntegratedTradingSystem:
                     self.last_news_timestamp = {}
             time.sleep(60)
 
+    def _checkpoint_worker(self):
+        """장중 주기적으로 MarketCache 체크포인트 기록 (재시작 시 initialize에서 복원)"""
+        cache_config = self.config.get('cache', {})
+        path = cache_config.get('checkpoint_path')
+        interval = cache_config.get('checkpoint_interval_sec', 30)
+        if not path or interval <= 0:
+            return
+        while not self.shutdown_event.wait(interval):
+            try:
+                if dt_time(9, 0) <= datetime.now().time() <= dt_time(15, 35):
+                    self.market_cache.save_checkpoint(path)
+            except Exception as e:
+                logger.error(f"[CHECKPOINT] 오류: {e}", exc_info=True)
+
     def _opening_sell_worker(self):
+        # 매도 대상 종목의 시세 변경 이벤트로 깨어나 바뀐 종목을 점검하고, 이와 별개로 2초마다 전체 종목을 점검한다.
+        # (시세가 조용한 종목, 가용수량 조회 실패 등으로 매도가 보류된 종목의 재시도, 시간 조건 대비)
+        quotes = self.market_cache.subscribe('sell_worker', kinds=(EVENT_QUOTE,), codes=(), maxlen=4096)
+        events = []
+        next_full_check = 0.0
         while not self.shutdown_event.is_set():
             try:
                 now = datetime.now()
@@ -182,10 +254,16 @@ class IntegratedTradingSystem:
                             self.sell_worker_done_today = True
                         continue
 
-                    positions_to_check = list(self.positions_to_sell.keys())
-                    for code in positions_to_check:
-                        quote = self.market_cache.get_quote_full(code)
-                        if quote and quote.get('price') > 0:
+                    quotes.set_codes(self.positions_to_sell.keys())
+                    changed = {code: event.data for code, event in latest_by_code(events).items()}
+                    if time.monotonic() >= next_full_check:
+                        next_full_check = time.monotonic() + 2
+                        for code in list(self.positions_to_sell.keys()):
+                            if code not in changed:
+                                changed[code] = self.market_cache.get_quote_full(code)
+                    for code, quote in changed.items():
+                        if code in self.positions_to_sell and quote and quote.get('price') > 0:
+                            latency_tracer.consume('sell_check', quote)
                             self._check_sell_conditions(code, quote.get('price'))
                 
                 if now.time() >= dt_time(15, 20) and not self.sell_worker_done_today:
@@ -194,7 +272,9 @@ class IntegratedTradingSystem:
                         logger.info(f"[SELL_WORKER] 미청산 종목: {list(self.positions_to_sell.keys())}")
                     self.sell_worker_done_today = True
 
-                time.sleep(2)
+                if self.sell_worker_done_today:
+                    quotes.set_codes(()) # 매도 작업이 끝나면 이벤트를 받지 않음
+                events = quotes.drain(timeout=2)
             except Exception as e:
                 logger.error(f"[SELL_WORKER] 오류: {e}", exc_info=True)
                 time.sleep(60)
@@ -248,18 +328,25 @@ class IntegratedTradingSystem:
         req_shares = int(pos['shares'])
         logger.info(f"[SELL] 매도 조건 충족: {pos['name']} ({code}) - 사유: {reason}, 요청수량: {req_shares}")
 
-        # 실시간 보유/가용수량 조회
-        try:
-            holdings = self.account_manager.get_current_positions()
-            avail = 0
-            for h in holdings:
-                if self._normalize_code(h.get('pdno')) == code:
-                    avail = int(h.get('ord_psbl_qty') or h.get('hldg_qty') or 0)
-                    logger.info(f"[SELL] {pos['name']} 실시간 가용수량 확인: {avail}주")
-                    break
-        except Exception as e:
-            logger.error(f"[SELL] {pos['name']} 가용수량 조회 실패: {e}", exc_info=True)
-            avail = 0 # 실패 시 매도 보류
+        # 가용수량: 체결통보로 추적 중이면 그 값을, 아니면 REST 잔고 조회 (조회 결과로 추적 재시작)
+        avail = fill_events.available_qty(code)
+        if avail is not None:
+            logger.info(f"[SELL] {pos['name']} 체결통보 기준 가용수량: {avail}주")
+        else:
+            try:
+                mark = fill_events.fill_mark() # 조회 중 도착한 체결은 시작점에 다시 반영
+                holdings = self.account_manager.get_current_positions()
+                quantities = {
+                    self._normalize_code(h.get('pdno')): int(h.get('ord_psbl_qty') or h.get('hldg_qty') or 0)
+                    for h in holdings if h.get('pdno')
+                }
+                if quantities:  # 조회 실패 시 빈 목록이 오므로 추적 시작점으로 쓰지 않음
+                    fill_events.seed_available(quantities, mark)
+                avail = quantities.get(code, 0)
+                logger.info(f"[SELL] {pos['name']} 실시간 가용수량 확인: {avail}주")
+            except Exception as e:
+                logger.error(f"[SELL] {pos['name']} 가용수량 조회 실패: {e}", exc_info=True)
+                avail = 0 # 실패 시 매도 보류
 
         sell_qty = max(0, min(req_shares, avail))
         if sell_qty <= 0:
@@ -271,9 +358,18 @@ class IntegratedTradingSystem:
         if sell_qty < req_shares:
             logger.warning(f"[SELL] {pos['name']} ({code}) 요청수량({req_shares})보다 가용수량({avail})이 적어 {sell_qty}주만 매도합니다.")
 
+        latency_tracer.consume('sell_order', self.market_cache.get_quote_full(code))
         result = self.account_manager.place_sell_order_market(code, sell_qty)
         if result and result.get('success'):
             current_price = self.market_cache.get_quote(code) or pos.get('price', 0)
+            if fill_events.live and result.get('order_id'):
+                # 체결통보로 실제 체결가 확인 (시장가라 보통 즉시 체결, 시간 초과 시 시세로 기록)
+                filled, avg_price = fill_events.filled(result['order_id'])
+                if filled < sell_qty:
+                    fill_events.wait_for_fill(result['order_id'], sell_qty, timeout=1.0)
+                    filled, avg_price = fill_events.filled(result['order_id'])
+                if filled > 0:
+                    current_price = avg_price
             self.position_manager.close_position(
                 code=code, quantity=sell_qty, price=current_price, reason=reason, name=pos['name']
             )
@@ -374,7 +470,7 @@ class IntegratedTradingSystem:
                     
                     closing_codes = {self._normalize_code(c['code']) for c in self.closing_price_candidates}
                     swing_codes = {self._normalize_code(c['code']) for c in self.swing_candidates.values()}
-                    self._update_subscriptions(closing_codes.union(swing_codes))
+                    self._update_subscriptions(closing_codes.union(swing_codes), book_codes=closing_codes)
 
                 time.sleep(300)
             except Exception as e:
@@ -466,7 +562,9 @@ class IntegratedTradingSystem:
                         budget_per_stock = initial_cash_balance * weight
                         
                         quote_info = self.market_cache.get_quote_full(code)
-                        if not quote_info or not quote_info.get('ask_price', 0) > 0:
+                        best_ask = self.market_cache.get_best_ask(code)
+                        latency_tracer.consume('buy_check', quote_info)
+                        if not quote_info or not best_ask > 0:
                             logger.warning(f"[BUY_WORKER] {name} ({code}) 호가 정보가 없어 시장가로 주문합니다.")
                             current_price = quote_info.get('price', 0) if quote_info else 0
                             if current_price > 0:
@@ -477,6 +575,7 @@ class IntegratedTradingSystem:
                                     continue
                                 
                                 if shares > 0:
+                                    latency_tracer.consume('buy_order', quote_info)
                                     result = self.account_manager.place_buy_order_market(code, shares)
                                     if result and result.get('success'):
                                         logger.info(f"[BUY] 시장가 매수 주문 성공: {name} ({code}) {shares}주")
@@ -490,8 +589,6 @@ class IntegratedTradingSystem:
                                         buy_names.append(name)
                             continue
 
-                        best_ask = quote_info.get('ask_price', 0)
-
                         if best_ask > 0:
                             shares = int(budget_per_stock // best_ask)
                             required_cash = shares * best_ask
@@ -501,6 +598,7 @@ class IntegratedTradingSystem:
 
                             if shares > 0:
                                 logger.info(f"[BUY_WORKER] {name} ({code}) {shares}주 매수 시도 (지정가: {best_ask})")
+                                latency_tracer.consume('buy_order', self.market_cache.get_quote_full(code))
                                 result = self.account_manager.place_buy_with_limit_then_market(
                                     stock_code=code,
                                     quantity=shares,
@@ -533,30 +631,44 @@ class IntegratedTradingSystem:
                 logger.error(f"[BUY_WORKER] 오류: {e}", exc_info=True)
                 time.sleep(60)
 
-    def _update_subscriptions(self, new_codes: Set[str]):
+    def _update_subscriptions(self, new_codes: Set[str], book_codes: Optional[Set[str]] = None):
         if not self.ws_manager or not self.ws_manager.is_connected:
             logger.warning("[SUB_MGR] 웹소켓이 연결되지 않아 구독을 업데이트할 수 없습니다.")
             return
 
         owned_codes = set(self.position_manager.positions.keys())
         required_codes = new_codes.union(owned_codes)
+        candidate_codes = book_codes or set()
 
         codes_to_add = required_codes - self.subscribed_codes
         codes_to_remove = self.subscribed_codes - required_codes
-
         if codes_to_add:
             logger.info(f"[SUB_MCR] 신규 구독 추가: {list(codes_to_add)}")
-            for code in codes_to_add:
-                self.ws_manager.subscribe(code)
-                time.sleep(0.3)
-        
         if codes_to_remove:
             logger.info(f"[SUB_MGR] 기존 구독 해지: {list(codes_to_remove)}")
-            for code in codes_to_remove:
-                self.ws_manager.unsubscribe(code)
-                time.sleep(0.3)
-        
+
+        # 우선순위: 보유 종목 > 매수 후보 > 관심 종목 (전송은 스케줄러 스레드가 속도 제한에 맞춰 수행)
+        desired = {
+            code: PRIORITY_HOLDING if code in owned_codes
+            else PRIORITY_CANDIDATE if code in candidate_codes
+            else PRIORITY_WATCH
+            for code in required_codes
+        }
+        # 종가 매수 후보는 스프레드 필터/최우선 매도호가 산정을 위해 실시간 호가도 구독
+        if book_codes is not None and self.config.get('system', {}).get('ws_order_book', True):
+            self.book_codes = set(book_codes)
+        books = {code: PRIORITY_CANDIDATE for code in self.book_codes}
+
+        # 구독 대상이 아닌 종목은 캐시 메모리 예산을 넘을 때 내보내고, 다시 구독하면 디스크 보관분을 복원
+        self.market_cache.set_retained(required_codes)
+        self.sub_scheduler.set_desired(desired, books)
         self.subscribed_codes = required_codes
+        if isinstance(self.ws_manager, ShardedFeed):
+            self.ws_manager.rebalance() # 자리가 난 선호 샤드로 남은 종목을 조금씩 되돌림
+        # 새로 구독한 종목은 구독 이전 캔들이 없으므로 당일 분봉을 보충 (우선순위 순)
+        if self.intraday_backfiller and codes_to_add:
+            for code in sorted(codes_to_add, key=lambda c: desired[c]):
+                self.intraday_backfiller.request([code], desired[code])
 
     def _wait_and_connect_ws(self) -> bool:
         logger.info("[SYSTEM] 장 시작(09:00)까지 대기하며, 08:58에 웹소켓 연결을 시도합니다.")
@@ -582,9 +694,15 @@ class IntegratedTradingSystem:
             logger.info("[SYSTEM] 시스템 종료 시작")
             self.shutdown_event.set()
             if self.ws_manager:
+                if self.sub_scheduler:
+                    self.sub_scheduler.stop()
+                if self.intraday_backfiller:
+                    self.intraday_backfiller.stop()
                 self.ws_manager.stop()
+                logger.info(f"[SYSTEM] 웹소켓 수신 파이프라인 통계: {self.ws_manager.get_pipeline_stats()}")
             data_logger.shutdown()
             event_logger.shutdown()
+            latency_tracer.shutdown()
             notifier.send_message("시스템 종료")
 
     def _signal_handler(self, signum, frame):
@@ -601,7 +719,8 @@ def load_config() -> Dict:
             'api': config.get_kis_config(),
             'telegram': config.get_telegram_config(),
             'trading': config.get_trading_config(),
-            'system': config.get('system', {})
+            'system': config.get('system', {}),
+            'cache': config.get('cache', {})
         }
     except Exception as e:
         logger.error(f"[CONFIG] 설정 로드 실패: {e}", exc_info=True)
@@ -3,6 +3,7 @@
 import time
 import threading
 from analytics import trade_summary
+from core.symbol_table import symbol_table
 
 class RealPositionManager:
     _instance = None
@@ -26,15 +27,18 @@ class RealPositionManager:
             return self.positions.copy()
 
     def get_position(self, code):
+        code = symbol_table.normalize(code)
         with self._position_lock:
             return self.positions.get(code)
 
     def has_position(self, code: str) -> bool:
         """특정 종목의 포지션 보유 여부를 확인합니다."""
+        code = symbol_table.normalize(code)
         with self._position_lock:
             return code in self.positions
 
     def add_position(self, code, shares, price, name=""):
+        code = symbol_table.normalize(code)
         with self._position_lock:
             self.positions[code] = {
                 'shares': shares, 'price': price, 'time': time.time(),
@@ -42,6 +46,7 @@ class RealPositionManager:
             }
 
     def update_position_price(self, code, current_price):
+        code = symbol_table.normalize(code)
         with self._position_lock:
             if code in self.positions:
                 self.positions[code]['price'] = current_price
@@ -49,6 +54,7 @@ class RealPositionManager:
 
     def close_position(self, code, quantity: int, price: float, reason: str, name: str):
         """포지션을 종료하고 거래 내역을 기록합니다. (스레드 안전성 강화)"""
+        code = symbol_table.normalize(code)
         position_closed = None
         with self._position_lock:
             if code in self.positions:
@@ -0,0 +1,77 @@
+"""
+프로세스 전역 종목 심볼 테이블
+- 종목코드를 한 번만 정규화하여 0부터 시작하는 조밀한 정수 ID로 등록(intern)한다.
+- 원본 코드 문자열("005930", "A005930", " a005930 " 등) → ID 변환 결과를 캐싱하므로
+  틱마다 문자열 가공(strip/upper/replace/zfill) 없이 딕셔너리 조회 1회로 끝난다.
+- ID → 정규화 코드("A005930") / 단축 코드("005930")는 리스트 인덱싱으로 얻는다.
+- ID는 프로세스가 살아있는 동안 바뀌지 않으며, 해제하지 않는다.
+"""
+import threading
+from typing import Dict, List, Optional, Union
+
+SymbolKey = Union[str, int]
+
+
+class SymbolTable:
+    MAX_RAW_ALIASES = 100_000  # 원본 표기 캐시 상한 (비정상 입력으로 무한히 커지는 것 방지)
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._ids: Dict[str, int] = {}    # 정규화 코드 -> ID
+        self._raw: Dict[str, int] = {}    # 원본 표기 -> ID (캐시)
+        self.codes: List[str] = []        # ID -> 정규화 코드 ("A005930")
+        self.short_codes: List[str] = []  # ID -> 단축 코드 ("005930")
+
+    @staticmethod
+    def canonical(code) -> str:
+        """정규화 규칙: 공백/하이픈/점 제거, 대문자, 선행 'A' 제거 후 숫자면 6자리 보정, 'A' 접두"""
+        s = str(code).strip().upper()
+        s = s.replace("-", "").replace(".", "").lstrip("A")
+        if s.isdigit() and len(s) <= 6:
+            s = s.zfill(6)
+        return f"A{s}"
+
+    def intern(self, code: SymbolKey) -> int:
+        """코드를 ID로 변환 (처음 보는 종목이면 새 ID 발급). 정수는 ID로 간주해 그대로 반환"""
+        if type(code) is int:
+            return code
+        sid = self._raw.get(code)
+        if sid is not None:
+            return sid
+        norm = self.canonical(code)
+        with self._lock:
+            sid = self._ids.get(norm)
+            if sid is None:
+                sid = len(self.codes)
+                self._ids[norm] = sid
+                self.codes.append(norm)
+                self.short_codes.append(norm[1:])
+            if len(self._raw) < self.MAX_RAW_ALIASES:
+                self._raw[code] = sid
+        return sid
+
+    def lookup(self, code: SymbolKey) -> Optional[int]:
+        """등록된 종목의 ID (등록되지 않았으면 None, 새로 발급하지 않음)"""
+        if type(code) is int:
+            return code if 0 <= code < len(self.codes) else None
+        sid = self._raw.get(code)
+        if sid is not None:
+            return sid
+        return self._ids.get(self.canonical(code))
+
+    def normalize(self, code: SymbolKey) -> str:
+        """정규화 코드 ("A005930"). ID나 임의 표기 모두 받습니다."""
+        return self.codes[self.intern(code)]
+
+    def code_of(self, sid: int) -> str:
+        return self.codes[sid]
+
+    def short_of(self, sid: int) -> str:
+        return self.short_codes[sid]
+
+    def __len__(self) -> int:
+        return len(self.codes)
+
+
+# 전역 인스턴스
+symbol_table = SymbolTable()
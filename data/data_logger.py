@@ -5,6 +5,7 @@ from datetime import datetime, timedelta
 from collections import defaultdict
 from threading import Timer, Lock
 from utils.logger import logger
+from core.symbol_table import symbol_table
 
 class DataLogger:
     """
@@ -43,8 +44,10 @@ class DataLogger:
         except Exception as e:
             logger.error(f"[DataLogger] 기존 데이터 로드 실패: {e}")
 
-    def add_tick(self, symbol: str, price: float, exec_volume: float):
-        """웹소켓 등에서 틱 데이터를 받아 1분봉을 업데이트한다."""
+    def add_tick(self, symbol, price: float, exec_volume: float):
+        """웹소켓 등에서 틱 데이터를 받아 1분봉을 업데이트한다. (symbol: 정규화 코드 또는 심볼 테이블 ID)"""
+        if type(symbol) is int:
+            symbol = symbol_table.code_of(symbol)
         with self._lock:
             now = datetime.now()
             current_minute = now.replace(second=0, microsecond=0)
@@ -75,6 +78,41 @@ class DataLogger:
                 bar['close'] = price
                 bar['volume'] += exec_volume
 
+    def merge_bars(self, symbol, bars: list) -> int:
+        """
+        REST로 보충한 1분봉(시간 'YYYYMMDDHHMM')을 완료 봉 목록에 병합한다.
+        같은 분의 봉이 이미 있으면 교체하고(중복 집계 방지), 진행 중인 현재 분은 건드리지 않는다.
+        """
+        symbol = symbol_table.normalize(symbol)
+        with self._lock:
+            current_minute = datetime.now().replace(second=0, microsecond=0)
+            incoming = {}
+            for b in bars:
+                try:
+                    start = datetime.strptime(b['time'], '%Y%m%d%H%M')
+                except (KeyError, ValueError):
+                    continue
+                if start >= current_minute:
+                    continue
+                incoming[start.isoformat()] = {
+                    'time': start.isoformat(),
+                    'open': b['open'], 'high': b['high'], 'low': b['low'], 'close': b['close'],
+                    'volume': b['volume'],
+                    'start_time': start,
+                }
+            if not incoming:
+                return 0
+            # 끊기기 직전의 미완성 봉이 남아 있으면 REST 봉으로 대체되므로 버림
+            bar = self.current_bars.get(symbol)
+            if bar and bar.get('time') in incoming:
+                del self.current_bars[symbol]
+            existing = self.completed_bars[symbol]
+            kept = [bar for bar in existing if bar.get('time') not in incoming]
+            kept.extend(incoming.values())
+            kept.sort(key=lambda bar: bar.get('time', ''))
+            self.completed_bars[symbol] = kept
+            return len(incoming)
+
     def _start_periodic_save(self):
         """주기적으로 데이터를 파일에 저장하는 타이머 시작"""
         def run():
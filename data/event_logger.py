@@ -1,6 +1,7 @@
 import json
 import os
 from datetime import datetime
+from time import time
 from collections import defaultdict
 from threading import Timer, Lock
 from utils.logger import logger
@@ -18,6 +19,8 @@ class EventLogger:
         # { 'MMDDHHmm': { 'code': event_data } }
         # 같은 분, 같은 종목에 대해서는 최신 데이터만 유지
         self.events_by_minute: Dict[str, Dict[str, Dict[str, Any]]] = defaultdict(dict)
+        self._minute = -1 # 현재 분 (epoch 분) 과 그 키 캐시
+        self._minute_key = ''
         self.save_path = self._get_save_path() # 초기화 시 경로 설정
         self._load_existing_data()
         self._start_periodic_save()
@@ -69,41 +72,39 @@ class EventLogger:
             
         return price_group, turnover_tier
 
-    def log_event(self, tick_data: dict):
+    def log_event(self, tick_data):
         """
-        틱 데이터를 받아 분류하고 이벤트로 기록합니다.
-        tick_data는 web_socket_manager에서 파싱된 전체 딕셔너리를 받습니다.
+        틱 데이터를 해당 분의 종목 이벤트로 기록합니다. (같은 분, 같은 종목은 최신 이벤트로 교체)
+        tick_data는 web_socket_manager에서 파싱된 틱 레코드(TickRecord)이며, 수신 시점에 저장용 딕셔너리를 만들어
+        보관하므로 이후 캐시가 레코드를 바꾸거나 놓아도(release) 기록에는 영향이 없습니다.
         """
+        code = tick_data.get('code')
+        price = tick_data.get('price', 0)
+        if not code or not price:
+            return
+        now = time()
+        try:
+            price_group, turnover_tier = self._classify_stock(price, tick_data.get('acc_tr_amount', 0))
+            event_data = {
+                'price_group': price_group,
+                'turnover_tier': turnover_tier,
+                'time': datetime.fromtimestamp(now).isoformat(),
+                'price': price,
+                'high': tick_data.get('high_price', 0),
+                'low': tick_data.get('low_price', 0),
+                'exec_vol': tick_data.get('exec_vol', 0),
+                'acc_vol': tick_data.get('acc_vol', 0),
+                'change_rate': tick_data.get('change_rate', 0),
+            }
+        except Exception as e:
+            logger.error(f"[EventLogger] 이벤트 로깅 실패: {e}", exc_info=True)
+            return
+        minute = int(now // 60)
         with self._lock:
-            try:
-                now = datetime.now()
-                timestamp_key = now.strftime('%m%d%H%M') # 년 제외 월일시분
-
-                code = tick_data.get('code')
-                price = tick_data.get('price', 0)
-                turnover = tick_data.get('acc_tr_amount', 0)
-                
-                if not code or price == 0: return
-
-                price_group, turnover_tier = self._classify_stock(price, turnover)
-
-                event_data = {
-                    'price_group': price_group,
-                    'turnover_tier': turnover_tier,
-                    'time': now.isoformat(),
-                    'price': price,
-                    'high': tick_data.get('high_price', 0),
-                    'low': tick_data.get('low_price', 0),
-                    'exec_vol': tick_data.get('exec_vol', 0),
-                    'acc_vol': tick_data.get('acc_vol', 0),
-                    'change_rate': tick_data.get('change_rate', 0),
-                }
-                
-                # 해당 분의 해당 종목 데이터를 최신으로 갱신
-                self.events_by_minute[timestamp_key][code] = event_data
-
-            except Exception as e:
-                logger.error(f"[EventLogger] 이벤트 로깅 실패: {e}", exc_info=True)
+            if minute != self._minute:
+                self._minute = minute
+                self._minute_key = datetime.fromtimestamp(now).strftime('%m%d%H%M') # 년 제외 월일시분
+            self.events_by_minute[self._minute_key][code] = event_data
 
     def _start_periodic_save(self):
         """주기적으로 데이터를 파일에 저장하는 타이머 시작"""
@@ -0,0 +1,280 @@
+"""
+실시간 원본 프레임 기록기 (캡처/재생용)
+- 수신 스레드는 (monotonic 수신 시각, 원본 프레임)을 버퍼에 append만 하고, 백그라운드 스레드가 블록 단위로 압축해 기록한다.
+- 세그먼트 파일(.seg) 구조
+    헤더 : MAGIC(8) + wall 기준 시각(d) + monotonic 기준 시각(d)
+    블록 : BLOCK_HEADER(압축 길이, 원본 길이, 레코드 수, 첫/마지막 monotonic 시각) + zlib(레코드들)
+    레코드: RECORD_HEADER(monotonic 시각, 프레임 바이트 길이) + UTF-8 프레임
+- 인덱스 파일(.idx): 블록마다 (파일 오프셋, 레코드 수, 첫/마지막 wall 시각)을 고정 길이로 append → 시간으로 seek
+- 세그먼트는 크기/날짜 기준으로 교체(rotation)되며, 파일명은 data/capture/YYYY-MM-DD/<source>_HHMMSS_<seq>.seg
+"""
+import bisect
+import glob
+import heapq
+import os
+import struct
+import threading
+import zlib
+from collections import deque
+from datetime import datetime
+from time import monotonic, time
+from typing import Deque, Iterator, List, Optional, Tuple
+
+from utils.logger import logger
+
+MAGIC = b"KISCAP1\n"
+SEGMENT_HEADER = struct.Struct("<8sdd")    # magic, wall_anchor, mono_anchor
+BLOCK_HEADER = struct.Struct("<IIIdd")     # comp_len, raw_len, count, first_mono, last_mono
+RECORD_HEADER = struct.Struct("<dI")       # mono_ts, length
+INDEX_ENTRY = struct.Struct("<QIdd")       # offset, count, first_wall, last_wall
+
+
+class FrameRecorder:
+    """원본 프레임을 압축 세그먼트 파일로 기록하는 백그라운드 기록기"""
+
+    def __init__(
+        self,
+        base_dir: str = "data/capture",
+        source: str = "ws",
+        max_segment_bytes: int = 64 * 1024 * 1024,
+        block_bytes: int = 256 * 1024,
+        flush_interval: float = 1.0,
+        max_pending: int = 1_000_000,
+        compress_level: int = 6,
+    ):
+        self.base_dir = base_dir
+        self.source = source
+        self.max_segment_bytes = max_segment_bytes
+        self.block_bytes = block_bytes
+        self.flush_interval = flush_interval
+        self.compress_level = compress_level
+
+        self._buf: Deque[Tuple[float, str]] = deque(maxlen=max_pending)
+        self._stop_evt = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+        self._seg = None
+        self._idx = None
+        self._seg_path: Optional[str] = None
+        self._seg_date: Optional[str] = None
+        self._seg_seq = 0
+        self._wall_anchor = 0.0
+        self._mono_anchor = 0.0
+
+        self.frames_written = 0
+        self.bytes_written = 0
+        self.segments = 0
+
+    # ---------- 수신 스레드 측 ----------
+    def append(self, message, recv_ts: Optional[float] = None) -> None:
+        """수신 프레임을 버퍼에 추가 (락 없음, deque.append는 스레드 안전)"""
+        self._buf.append((recv_ts if recv_ts is not None else monotonic(), message))
+
+    # ---------- 기록 스레드 ----------
+    def start(self):
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop_evt.clear()
+        self._thread = threading.Thread(target=self._run, name=f"recorder-{self.source}", daemon=True)
+        self._thread.start()
+        logger.info(f"[Recorder] 원본 프레임 기록 시작 ({self.base_dir}, source={self.source})")
+
+    def stop(self, timeout: float = 10.0):
+        """버퍼에 남은 프레임을 모두 기록한 뒤 종료합니다."""
+        self._stop_evt.set()
+        if self._thread:
+            self._thread.join(timeout)
+            self._thread = None
+        logger.info(f"[Recorder] 기록 종료: 프레임 {self.frames_written:,}건, {self.bytes_written:,} bytes, 세그먼트 {self.segments}개")
+
+    def _run(self):
+        try:
+            while not self._stop_evt.wait(self.flush_interval):
+                self._drain()
+            self._drain()
+        except Exception as e:
+            logger.error(f"[Recorder] 기록 중 오류: {e}", exc_info=True)
+        finally:
+            self._close_segment()
+
+    def _drain(self):
+        buf = self._buf
+        records = []
+        size = 0
+        while buf:
+            ts, message = buf.popleft()
+            data = message.encode("utf-8") if isinstance(message, str) else bytes(message)
+            records.append((ts, data))
+            size += RECORD_HEADER.size + len(data)
+            if size >= self.block_bytes:
+                self._write_block(records, size)
+                records, size = [], 0
+        if records:
+            self._write_block(records, size)
+
+    def _write_block(self, records: List[Tuple[float, bytes]], raw_len: int):
+        self._ensure_segment()
+        raw = bytearray()
+        pack = RECORD_HEADER.pack
+        for ts, data in records:
+            raw += pack(ts, len(data))
+            raw += data
+        comp = zlib.compress(bytes(raw), self.compress_level)
+        first, last = records[0][0], records[-1][0]
+
+        offset = self._seg.tell()
+        self._seg.write(BLOCK_HEADER.pack(len(comp), raw_len, len(records), first, last))
+        self._seg.write(comp)
+        self._seg.flush()
+        self._idx.write(INDEX_ENTRY.pack(offset, len(records), self._to_wall(first), self._to_wall(last)))
+        self._idx.flush()
+
+        self.frames_written += len(records)
+        self.bytes_written += BLOCK_HEADER.size + len(comp)
+
+    def _to_wall(self, mono_ts: float) -> float:
+        return self._wall_anchor + (mono_ts - self._mono_anchor)
+
+    # ---------- 세그먼트 관리 ----------
+    def _ensure_segment(self):
+        today = datetime.now().strftime('%Y-%m-%d')
+        if self._seg is not None and self._seg_date == today and self._seg.tell() < self.max_segment_bytes:
+            return
+        self._close_segment()
+
+        day_dir = os.path.join(self.base_dir, today)
+        os.makedirs(day_dir, exist_ok=True)
+        if self._seg_date != today:
+            self._seg_seq = 0
+        self._seg_date = today
+        self._seg_seq += 1
+        name = f"{self.source}_{datetime.now().strftime('%H%M%S')}_{self._seg_seq:04d}"
+        self._seg_path = os.path.join(day_dir, name + ".seg")
+
+        # 세그먼트마다 wall/monotonic 기준 시각을 새로 잡아 장시간 기록 시 시계 차이를 제한
+        self._wall_anchor, self._mono_anchor = time(), monotonic()
+        self._seg = open(self._seg_path, "wb")
+        self._seg.write(SEGMENT_HEADER.pack(MAGIC, self._wall_anchor, self._mono_anchor))
+        self._idx = open(self._seg_path[:-4] + ".idx", "wb")
+        self.segments += 1
+        logger.info(f"[Recorder] 새 세그먼트: {self._seg_path}")
+
+    def _close_segment(self):
+        for f in (self._seg, self._idx):
+            if f is not None:
+                try:
+                    f.close()
+                except Exception:
+                    pass
+        self._seg = None
+        self._idx = None
+
+    def get_stats(self):
+        return {
+            "pending": len(self._buf),
+            "frames_written": self.frames_written,
+            "bytes_written": self.bytes_written,
+            "segments": self.segments,
+            "segment": self._seg_path,
+        }
+
+
+class SegmentReader:
+    """세그먼트 파일 1개 읽기 (인덱스로 시각 seek)"""
+
+    def __init__(self, path: str):
+        self.path = path
+        with open(path, "rb") as f:
+            magic, self.wall_anchor, self.mono_anchor = SEGMENT_HEADER.unpack(f.read(SEGMENT_HEADER.size))
+        if magic != MAGIC:
+            raise ValueError(f"캡처 세그먼트 형식이 아닙니다: {path}")
+        self.index = self._load_index()
+
+    def _load_index(self) -> List[Tuple[int, int, float, float]]:
+        idx_path = self.path[:-4] + ".idx"
+        entries = []
+        if os.path.exists(idx_path):
+            with open(idx_path, "rb") as f:
+                data = f.read()
+            usable = len(data) - len(data) % INDEX_ENTRY.size  # 기록 중 잘린 마지막 항목 무시
+            entries = [INDEX_ENTRY.unpack_from(data, i) for i in range(0, usable, INDEX_ENTRY.size)]
+            if entries:
+                return entries
+        # 인덱스가 없으면 블록 헤더를 훑어 재구성
+        with open(self.path, "rb") as f:
+            f.seek(SEGMENT_HEADER.size)
+            while True:
+                offset = f.tell()
+                head = f.read(BLOCK_HEADER.size)
+                if len(head) < BLOCK_HEADER.size:
+                    break
+                comp_len, _, count, first, last = BLOCK_HEADER.unpack(head)
+                f.seek(comp_len, os.SEEK_CUR)
+                entries.append((offset, count, self.to_wall(first), self.to_wall(last)))
+        return entries
+
+    def to_wall(self, mono_ts: float) -> float:
+        return self.wall_anchor + (mono_ts - self.mono_anchor)
+
+    @property
+    def first_wall(self) -> Optional[float]:
+        return self.index[0][2] if self.index else None
+
+    @property
+    def last_wall(self) -> Optional[float]:
+        return self.index[-1][3] if self.index else None
+
+    def read(self, start: Optional[float] = None, end: Optional[float] = None) -> Iterator[Tuple[float, float, str]]:
+        """(wall 시각, monotonic 시각, 프레임)을 시간순으로 반환. start/end는 wall 시각(epoch 초)"""
+        entries = self.index
+        i = 0
+        if start is not None:
+            # 마지막 시각이 start 이상인 첫 블록부터 읽음
+            i = bisect.bisect_left([e[3] for e in entries], start)
+        with open(self.path, "rb") as f:
+            for offset, _, first_wall, _ in entries[i:]:
+                if end is not None and first_wall > end:
+                    return
+                f.seek(offset)
+                head = f.read(BLOCK_HEADER.size)
+                if len(head) < BLOCK_HEADER.size:
+                    return
+                comp_len = BLOCK_HEADER.unpack(head)[0]
+                comp = f.read(comp_len)
+                if len(comp) < comp_len:
+                    return  # 기록 중 잘린 블록
+                raw = zlib.decompress(comp)
+                pos = 0
+                while pos < len(raw):
+                    ts, length = RECORD_HEADER.unpack_from(raw, pos)
+                    pos += RECORD_HEADER.size
+                    wall = self.to_wall(ts)
+                    if (start is None or wall >= start) and (end is None or wall <= end):
+                        yield wall, ts, raw[pos:pos + length].decode("utf-8")
+                    elif end is not None and wall > end:
+                        return
+                    pos += length
+
+
+class CaptureReader:
+    """하루치 캡처 디렉터리 읽기. 여러 source(샤드)의 세그먼트를 wall 시각 기준으로 병합합니다."""
+
+    def __init__(self, day_dir: str, source: Optional[str] = None):
+        pattern = f"{source}_*.seg" if source else "*.seg"
+        self.segments = [SegmentReader(p) for p in sorted(glob.glob(os.path.join(day_dir, pattern)))]
+
+    def _by_source(self):
+        groups = {}
+        for seg in self.segments:
+            groups.setdefault(os.path.basename(seg.path).rsplit("_", 2)[0], []).append(seg)
+        return groups.values()
+
+    def read(self, start: Optional[float] = None, end: Optional[float] = None) -> Iterator[Tuple[float, float, str]]:
+        def chain(segs):
+            for seg in segs:
+                if start is not None and seg.last_wall is not None and seg.last_wall < start:
+                    continue
+                if end is not None and seg.first_wall is not None and seg.first_wall > end:
+                    break
+                yield from seg.read(start, end)
+        return heapq.merge(*(chain(segs) for segs in self._by_source()), key=lambda r: r[0])
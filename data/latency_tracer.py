@@ -0,0 +1,191 @@
+import json
+import os
+import time
+from datetime import datetime
+from threading import Timer, Lock
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from utils.logger import logger
+
+
+class LatencyHistogram:
+    """
+    HDR 방식의 로그-선형 버킷 히스토그램 (마이크로초 단위).
+    - 2^k 구간마다 64개 하위 버킷으로 나누어 상대 오차 약 1.6% 이내로 기록한다.
+    - 기록은 정수 인덱스 계산 + 카운트 증가뿐이라 틱마다 호출해도 부담이 적다.
+    """
+    SUB_BITS = 7
+    SUB_COUNT = 1 << SUB_BITS        # 128: 이 값 미만은 1µs 단위 그대로
+    SUB_HALF = SUB_COUNT >> 1        # 64: 이후 2배 구간마다 하위 버킷 수
+
+    def __init__(self, max_us: int = 60_000_000):
+        self.max_us = max_us
+        self.counts: List[int] = [0] * (self._index(max_us) + 1)
+        self.total = 0
+        self.sum_us = 0
+        self.min_us: Optional[int] = None
+        self.max_seen_us = 0
+        self.overflow = 0  # max_us 초과로 최대 버킷에 합산된 건수
+
+    @classmethod
+    def _index(cls, v: int) -> int:
+        if v < cls.SUB_COUNT:
+            return v
+        shift = v.bit_length() - cls.SUB_BITS
+        return cls.SUB_COUNT + (shift - 1) * cls.SUB_HALF + ((v >> shift) - cls.SUB_HALF)
+
+    @classmethod
+    def _value_at(cls, idx: int) -> int:
+        """버킷의 상한값(µs)"""
+        if idx < cls.SUB_COUNT:
+            return idx
+        shift = (idx - cls.SUB_COUNT) // cls.SUB_HALF + 1
+        sub = (idx - cls.SUB_COUNT) % cls.SUB_HALF + cls.SUB_HALF
+        return ((sub + 1) << shift) - 1
+
+    def record(self, seconds: float):
+        v = int(seconds * 1_000_000)
+        if v < 0:
+            v = 0
+        if v > self.max_us:
+            self.overflow += 1
+            v = self.max_us
+        self.counts[self._index(v)] += 1
+        self.total += 1
+        self.sum_us += v
+        if self.min_us is None or v < self.min_us:
+            self.min_us = v
+        if v > self.max_seen_us:
+            self.max_seen_us = v
+
+    def percentile(self, q: float) -> int:
+        if not self.total:
+            return 0
+        target = max(1, int(self.total * q + 0.5))
+        seen = 0
+        for idx, c in enumerate(self.counts):
+            seen += c
+            if seen >= target:
+                return min(self._value_at(idx), self.max_seen_us)
+        return self.max_seen_us
+
+    def summary(self) -> Dict[str, Any]:
+        """건수와 p50/p90/p99/p99.9/최대 지연(ms)"""
+        ms = lambda us: round(us / 1000, 3)
+        return {
+            "count": self.total,
+            "mean_ms": ms(self.sum_us / self.total) if self.total else 0.0,
+            "min_ms": ms(self.min_us or 0),
+            "p50_ms": ms(self.percentile(0.50)),
+            "p90_ms": ms(self.percentile(0.90)),
+            "p99_ms": ms(self.percentile(0.99)),
+            "p999_ms": ms(self.percentile(0.999)),
+            "max_ms": ms(self.max_seen_us),
+            "overflow": self.overflow,
+        }
+
+
+class LatencyTracer:
+    """
+    틱 → 의사결정 구간별 지연을 히스토그램으로 집계하고 주기적으로 파일에 기록하는 로거.
+    - 틱 스탬프: exec_time(거래소 체결시각, 초 단위) / recv_ts(소켓 수신) / apply_ts(캐시 반영), recv/apply는 monotonic
+    - 구간: exchange_to_recv, recv_to_apply, 그리고 소비 지점별 apply_to_<stage>, tick_to_<stage>
+    - 소비 지점(매도 판단, 주문 직전 등)에서 consume(stage, quote)를 호출하면 그 시점까지의 지연을 기록한다.
+    """
+    def __init__(self, save_dir: str = 'logs', save_interval_seconds: int = 300):
+        self.save_dir = save_dir
+        self.save_interval = save_interval_seconds
+        self._lock = Lock()
+        self._hists: Dict[str, LatencyHistogram] = {}
+        self._started_at = datetime.now()
+        self._start_periodic_save()
+
+    def _hist(self, stage: str) -> LatencyHistogram:
+        h = self._hists.get(stage)
+        if h is None:
+            h = self._hists[stage] = LatencyHistogram()
+        return h
+
+    @staticmethod
+    def _exec_epoch(exec_time: str, now_wall: float) -> Optional[float]:
+        """'HHMMSS' 체결시각을 오늘 날짜의 epoch 초로 변환"""
+        if not exec_time or len(exec_time) < 6:
+            return None
+        try:
+            h, m, s = int(exec_time[0:2]), int(exec_time[2:4]), int(exec_time[4:6])
+        except ValueError:
+            return None
+        midnight = datetime.fromtimestamp(now_wall).replace(hour=0, minute=0, second=0, microsecond=0).timestamp()
+        return midnight + h * 3600 + m * 60 + s
+
+    def record_ticks(self, ticks: Iterable[Tuple[str, Dict[str, Any]]], recv_ts: float, apply_ts: float):
+        """캐시 반영 직후 호출: 한 프레임의 틱들에 대한 거래소→수신, 수신→반영 지연을 기록"""
+        now_wall = time.time()
+        recv_wall = now_wall - (time.monotonic() - recv_ts)
+        with self._lock:
+            recv_to_apply = self._hist('recv_to_apply')
+            exch_to_recv = self._hist('exchange_to_recv')
+            exec_cache: Dict[str, Optional[float]] = {}
+            for _, tick in ticks:
+                recv_to_apply.record(apply_ts - recv_ts)
+                exec_time = tick.get('exec_time')
+                if exec_time not in exec_cache:
+                    exec_cache[exec_time] = self._exec_epoch(exec_time, now_wall)
+                exec_epoch = exec_cache[exec_time]
+                if exec_epoch is not None:
+                    exch_to_recv.record(recv_wall - exec_epoch)
+
+    def consume(self, stage: str, quote: Optional[Dict[str, Any]]):
+        """의사결정/주문 지점에서 사용한 시세(quote)가 얼마나 오래된 것인지 기록"""
+        if not quote:
+            return
+        recv_ts, apply_ts = quote.get('recv_ts'), quote.get('apply_ts')
+        if not apply_ts:
+            return
+        now = time.monotonic()
+        with self._lock:
+            self._hist(f'apply_to_{stage}').record(now - apply_ts)
+            if recv_ts:
+                self._hist(f'tick_to_{stage}').record(now - recv_ts)
+
+    def get_stats(self) -> Dict[str, Dict[str, Any]]:
+        with self._lock:
+            return {stage: h.summary() for stage, h in sorted(self._hists.items())}
+
+    def _start_periodic_save(self):
+        """주기적으로 데이터를 파일에 저장하는 타이머 시작"""
+        def run():
+            self.save_to_file()
+            self._start_periodic_save() # 다음 저장 예약
+
+        self.timer = Timer(self.save_interval, run)
+        self.timer.daemon = True
+        self.timer.start()
+
+    def save_to_file(self):
+        """구간별 지연 요약을 logs/latency_YYYY-MM-DD.json에 덮어써 저장한다."""
+        stats = self.get_stats()
+        if not stats:
+            return
+        path = os.path.join(self.save_dir, f"latency_{datetime.now().strftime('%Y-%m-%d')}.json")
+        try:
+            os.makedirs(self.save_dir, exist_ok=True)
+            with open(path, 'w', encoding='utf-8') as f:
+                json.dump({
+                    "since": self._started_at.isoformat(),
+                    "updated": datetime.now().isoformat(),
+                    "stages": stats,
+                }, f, ensure_ascii=False, indent=2)
+            brief = ", ".join(f"{k} p50={v['p50_ms']}ms p99={v['p99_ms']}ms" for k, v in stats.items())
+            logger.info(f"[Latency] {brief}")
+        except Exception as e:
+            logger.error(f"[Latency] 파일 저장 실패: {e}")
+
+    def shutdown(self):
+        """시스템 종료 시 호출되어 최종 통계를 저장합니다."""
+        if hasattr(self, 'timer'):
+            self.timer.cancel()
+        self.save_to_file()
+
+# 전역 인스턴스 생성
+latency_tracer = LatencyTracer()
@@ -10,15 +10,25 @@ from api.kis_api import KISApi
 from api.kis_investor import KISInvestorAPI
 from analytics.supply_score import build_supply_features, calc_supply_absorb_score
 from core.config import config # 중앙 설정 객체 임포트
+from core.symbol_table import symbol_table
+from web_socket.indicators import indicator_registry
 from typing import List, Dict, Optional, Tuple
 import numpy as np
 import pandas as pd
 from pykrx import stock
 from datetime import datetime, timedelta
 
+# 점수 계산에 쓰는 1분봉 스트리밍 지표 (MarketCache가 캔들 마감 시 O(1)로 갱신)
+indicator_registry.declare(1, 'vwap', config.get('cache.max_candles_per_interval', 480)) # get_daily_vwap과 같은 기간
+indicator_registry.declare(1, 'sma', 5)
+indicator_registry.declare(1, 'sma', 20)
+indicator_registry.declare(1, 'sma', 60)
+indicator_registry.declare(1, 'day_high')
+indicator_registry.declare(1, 'day_low')
+
 # ---------- 내부 유틸 ----------
 def _normalize_code(code: str) -> str:
-    return code if code.startswith("A") else f"A{code}"
+    return symbol_table.normalize(code)
 
 def _safe_float(x, default: float = 0.0) -> float:
     try: return float(x)
@@ -133,12 +143,13 @@ def calculate_liquidity_penalty(market_cache: MarketCache, code: str) -> float:
     penalty_score = (spread_pct - 0.1) * 250
     return np.clip(penalty_score, 0, 100)
 
-def calculate_ma_alignment(candles: List[Dict]) -> float:
-    if len(candles) < 60: return 50.0
-    prices = [_safe_float(c['close']) for c in candles]
-    ma5 = np.mean(prices[-5:])
-    ma20 = np.mean(prices[-20:])
-    ma60 = np.mean(prices[-60:])
+def calculate_ma_alignment_streaming(market_cache: MarketCache, ncode: str) -> float:
+    """1분봉 5/20/60 이평 정렬 점수를 캐시의 SMA 지표로 계산 (캔들 전체를 다시 훑지 않음)"""
+    ma5, ma20, ma60 = (market_cache.get_indicator(ncode, 1, 'sma', n) for n in (5, 20, 60))
+    if ma60 is None: return 50.0 # 60개 미만
+    return _ma_alignment_score(ma5, ma20, ma60)
+
+def _ma_alignment_score(ma5: float, ma20: float, ma60: float) -> float:
     if not (ma5 and ma20 and ma60): return 50.0
     if ma5 > ma20 > ma60: return 100.0
     if ma5 > ma20: return 80.0
@@ -214,8 +225,8 @@ def calculate_closing_price_score(market_cache: MarketCache, api: KISApi, code:
     weights = config.get('trading.strategy_weights', {})
 
     close_price = _safe_float(candles[-1]['close'])
-    high_price = max(_safe_float(c['high']) for c in candles)
-    low_price = min(_safe_float(c['low']) for c in candles)
+    high_price = _safe_float(market_cache.get_indicator(ncode, 1, 'day_high'))
+    low_price = _safe_float(market_cache.get_indicator(ncode, 1, 'day_low'))
     daily_atr = high_price - low_price
 
     # 기본 점수 계산
@@ -224,7 +235,7 @@ def calculate_closing_price_score(market_cache: MarketCache, api: KISApi, code:
     pvap = calculate_vwap_premium(close_price, vwap)
     v30 = calculate_last_30min_volume_pct(candles)
     lp = calculate_liquidity_penalty(market_cache, ncode)
-    ma_align = calculate_ma_alignment(candles)
+    ma_align = calculate_ma_alignment_streaming(market_cache, ncode)
     req = calculate_req(code, candles)
     rs_mkt, rs_sector = calculate_relative_strength(code, candles)
 
@@ -2,13 +2,18 @@
 from web_socket.market_cache import MarketCache
 from utils.logger import logger
 from api.kis_api import KISApi
+from core.symbol_table import symbol_table
+from web_socket.indicators import indicator_registry
 from typing import List, Dict, Optional
 import numpy as np
 
+# 사용하는 1분봉 스트리밍 지표 (MarketCache가 캔들 마감 시 O(1)로 갱신)
+indicator_registry.declare(1, 'ret_std')
+indicator_registry.declare(1, 'roc', 5)
+
 # ---------- 내부 유틸 ----------
 def _normalize_code(code: str) -> str:
-    code = (code or "").strip()
-    return code if code.startswith("A") else f"A{code}"
+    return symbol_table.normalize(code or "")
 
 def _safe_float(x, default: float = 0.0) -> float:
     try:
@@ -216,23 +221,13 @@ def get_current_price(market_cache: MarketCache, raw_code: str, api: KISApi, nco
 def calculate_daily_volatility(market_cache: MarketCache, ncode: str) -> float:
     """1분봉 기반 변동성(최근 20분) 표준편차(%). 데이터 부족 시 보수적 기본값."""
     try:
-        candles = market_cache.get_candles(ncode, 1)  # 1분봉
-        if len(candles) < 10:
+        if market_cache.get_candle_count(ncode, 1) < 10:
             return 0.30  # 기본값 현실화 (0.30%)
 
-        prices = [c.get('close') for c in candles if _safe_float(c.get('close'), 0.0) > 0]
-        if len(prices) < 10:
-            return 0.30
-
-        returns = []
-        for i in range(1, len(prices)):
-            if prices[i-1] > 0:
-                ret = (prices[i] - prices[i-1]) / prices[i-1] * 100.0
-                returns.append(ret)
-
-        if not returns:
+        std = market_cache.get_indicator(ncode, 1, 'ret_std')  # 1분봉 종가 수익률 표준편차
+        if std is None:
             return 0.30
-        return float(np.std(returns))
+        return float(std)
     except Exception:
         return 0.30
 
@@ -261,13 +256,7 @@ def estimate_spread(price: float) -> float:
 def get_momentum(market_cache: MarketCache, ncode: str, minutes: int = 5) -> float:
     """단기 모멘텀 계산 (N분간 종가 대비 수익률, %)"""
     try:
-        candles = market_cache.get_candles(ncode, 1)
-        if len(candles) < minutes + 1:
-            return 0.0
-        a = _safe_float(candles[-minutes-1].get('close'), 0.0)
-        b = _safe_float(candles[-1].get('close'), 0.0)
-        if a <= 0 or b <= 0:
-            return 0.0
-        return (b - a) / a * 100.0
+        roc = market_cache.get_indicator(ncode, 1, 'roc', minutes)
+        return float(roc) if roc is not None else 0.0
     except Exception:
         return 0.0
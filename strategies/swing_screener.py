@@ -3,6 +3,7 @@ from core.config import config
 import logging
 import re
 import numpy as np
+from web_socket.indicators import indicator_registry
 
 logger = logging.getLogger(__name__)
 
@@ -26,9 +27,9 @@ def is_etf_like(name: str, code: str, trading_conf: dict) -> bool:
         
     return False
 
-def _calculate_ema(prices, period):
-    import pandas as pd
-    return pd.Series(prices).ewm(span=period, adjust=False).mean().iloc[-1]
+# 하락 추세 필터용 5분봉 EMA (MarketCache가 캔들 마감 시 O(1)로 갱신)
+indicator_registry.declare(5, 'ema', 5)
+indicator_registry.declare(5, 'ema', 20)
 
 def _pick_swing_slice(rows: List[Dict]) -> List[Dict]:
     """조건에 따라 스윙 후보군을 선택합니다."""
@@ -69,13 +70,11 @@ def get_swing_candidates(volume_stocks: List[Dict], config_obj: dict, market_cac
 
         # 하락 추세 필터링
         try:
-            ohlcv_5m = market_cache.get_candles(code, interval=5)
-            if not ohlcv_5m or len(ohlcv_5m) < 5: # Relaxed from 10
+            if market_cache.get_candle_count(code, 5) < 5: # Relaxed from 10
                 continue
-            
-            close_prices = [c['close'] for c in ohlcv_5m]
-            ema5 = _calculate_ema(close_prices, 5)
-            ema20 = _calculate_ema(close_prices, 20)
+
+            ema5 = market_cache.get_indicator(code, 5, 'ema', 5)
+            ema20 = market_cache.get_indicator(code, 5, 'ema', 20)
 
             if ema5 < ema20:
                 logger.debug(f"[SWING-FILTER] 하락 추세로 스윙 후보 제외: {name}({code}) (5-EMA < 20-EMA)")
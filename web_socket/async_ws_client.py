@@ -0,0 +1,181 @@
+"""
+asyncio 기반 KIS 실시간 WebSocket 클라이언트
+- KISWebSocketClient와 같은 공개 API(start/subscribe/unsubscribe/wait_for_connection/stop)를 제공한다.
+- 수신, heartbeat, 재연결, 구독 메시지 전송 간격 조절을 하나의 이벤트 루프(전용 스레드 1개)에서 처리한다.
+- 메시지 파싱/캐시 반영은 기존 클라이언트의 on_message 경로(수신 파이프라인 포함)를 그대로 사용한다.
+"""
+import asyncio
+import json
+import threading
+from typing import Optional
+
+from utils.logger import logger
+from web_socket.web_socket_manager import KISWebSocketClient
+
+try:
+    import websockets
+except ImportError:  # 선택 의존성: asyncio 클라이언트를 쓸 때만 필요
+    websockets = None
+
+
+class AsyncKISWebSocketClient(KISWebSocketClient):
+    """
+    단일 이벤트 루프에서 동작하는 KIS WebSocket 클라이언트.
+    subscribe/unsubscribe 등은 어느 스레드에서 호출해도 되며, 전송은 루프의 송신 큐를 거쳐
+    send_interval 간격으로 나간다.
+    """
+
+    def __init__(self, config, account_manager, approval_key: str, send_interval: Optional[float] = None, **kwargs):
+        super().__init__(config, account_manager, approval_key, **kwargs)
+        system_config = config.get('system', {})
+        self._send_interval = send_interval if send_interval is not None else system_config.get('ws_send_interval', 0.05)
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._loop_thread: Optional[threading.Thread] = None
+        self._send_queue: Optional[asyncio.Queue] = None
+        self._ws = None
+        self._ws_ready = False
+
+    # ---------- 공개 API ----------
+    def start(self):
+        """이벤트 루프 스레드를 띄우고 연결을 시작합니다."""
+        if websockets is None:
+            logger.error("[AWS] websockets 패키지가 설치되지 않아 asyncio 클라이언트를 시작할 수 없습니다. (pip install websockets)")
+            return
+        if not self.approval_key or len(self.approval_key) < 16:
+            logger.error(f"[AWS] 잘못된 approval_key: {self.approval_key}")
+            return
+        if not self.api.access_token:
+            logger.error("[AWS] access_token 없음")
+            return
+        if self._loop_thread and self._loop_thread.is_alive():
+            return
+
+        logger.info(f"[AWS] 연결 시도: url={self.url}")
+        self._stop_evt.clear()
+        self._start_workers()
+        self._loop = asyncio.new_event_loop()
+        self._loop_thread = threading.Thread(target=self._run_loop, name="ws-asyncio", daemon=True)
+        self._loop_thread.start()
+
+    def stop(self):
+        self._stop_evt.set()
+        loop = self._loop
+        if loop and loop.is_running():
+            asyncio.run_coroutine_threadsafe(self._close_ws(), loop)
+        if self._loop_thread:
+            self._loop_thread.join(timeout=5)
+            self._loop_thread = None
+        self._connected_evt.clear()
+        self._stop_workers()
+        logger.info("🛑 [AWS] WebSocket 중지 요청 완료")
+
+    @property
+    def is_connected(self) -> bool:
+        return self._ws_ready and self._connected_evt.is_set()
+
+    # ---------- 이벤트 루프 ----------
+    def _run_loop(self):
+        asyncio.set_event_loop(self._loop)
+        try:
+            self._loop.run_until_complete(self._main())
+        except Exception as e:
+            logger.error(f"[AWS] 이벤트 루프 종료 (오류): {e}", exc_info=True)
+        finally:
+            self._loop.close()
+
+    async def _main(self):
+        self._send_queue = asyncio.Queue()
+        sender = asyncio.create_task(self._sender())
+        heartbeat = asyncio.create_task(self._heartbeat())
+        try:
+            while not self._stop_evt.is_set():
+                await self._connect_once()
+                if self._stop_evt.is_set():
+                    break
+                delay = await asyncio.get_running_loop().run_in_executor(None, self._next_reconnect_delay)
+                if delay is None:
+                    break
+                logger.info(f"[AWS] {delay}s 후 재연결 시도 (#{self._reconnect_attempts})")
+                await self._sleep_unless_stopped(delay)
+        finally:
+            sender.cancel()
+            heartbeat.cancel()
+
+    async def _connect_once(self):
+        """연결 1회: 접속 → on_open(구독 전송) → 수신 루프. 연결이 끊기면 반환"""
+        try:
+            async with websockets.connect(self.url, ping_interval=None, max_queue=None) as ws:
+                self._ws = ws
+                self._ws_ready = True
+                self.on_open(ws)
+                async for message in ws:
+                    self.on_message(ws, message)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            if not self._stop_evt.is_set():
+                logger.error(f"🚨 [AWS] WebSocket 에러: {e}")
+        finally:
+            self._ws = None
+            self._ws_ready = False
+            self._connected_evt.clear()
+            self._mark_disconnected()
+            if not self._stop_evt.is_set():
+                logger.info("[AWS] WebSocket 연결 종료")
+
+    async def _sender(self):
+        """송신 큐를 send_interval 간격으로 비웁니다. (구독 메시지 속도 제한)"""
+        while True:
+            text = await self._send_queue.get()
+            ws = self._ws
+            if ws is None:
+                continue
+            try:
+                await ws.send(text)
+            except Exception as e:
+                logger.debug(f"[AWS] send 실패: {e}")
+            if self._send_interval > 0:
+                await asyncio.sleep(self._send_interval)
+
+    async def _heartbeat(self):
+        ping = json.dumps({"header": {"tr_id": "PINGPONG"}})
+        while True:
+            await asyncio.sleep(self._ping_interval)
+            if self.is_connected:
+                self._send_queue.put_nowait(ping)
+
+    async def _sleep_unless_stopped(self, delay: float):
+        waited = 0.0
+        while waited < delay and not self._stop_evt.is_set():
+            await asyncio.sleep(min(0.5, delay - waited))
+            waited += 0.5
+
+    async def _close_ws(self):
+        ws = self._ws
+        if ws is not None:
+            try:
+                await ws.close()
+            except Exception:
+                pass
+
+    # ---------- KISWebSocketClient 전송 계층 대체 ----------
+    def _send_json(self, payload: Optional[dict]) -> bool:
+        if not payload:
+            return False
+        loop = self._loop
+        if loop is None or not self._ws_ready or self._send_queue is None:
+            return False
+        loop.call_soon_threadsafe(self._send_queue.put_nowait, json.dumps(payload))
+        return True
+
+    def _start_ping_thread(self):
+        # heartbeat는 이벤트 루프 태스크(_heartbeat)로 처리
+        pass
+
+    def _spawn_ws(self):
+        # 연결/재연결은 이벤트 루프(_main)가 담당
+        pass
+
+    def _schedule_reconnect(self, ws=None):
+        # 재연결은 이벤트 루프(_main)가 담당
+        pass
@@ -0,0 +1,196 @@
+"""
+분 미만 초봉 / 거래량봉 / 거래대금봉 엔진
+- 틱마다 1초 기본봉(base)만 갱신하고, 5초·10초·30초 등 상위 초봉은 마감된 1초봉을 접어(roll-up) 만든다.
+  조회 시 진행 중인 상위 봉 = 접힌 부분봉 + 현재 1초봉 이므로 틱당 비용은 상위 주기 수와 무관하다.
+- 거래량봉('v:수량')·거래대금봉('t:금액')은 누적량이 기준에 도달한 틱에서 마감한다. (넘친 양은 다음 봉으로 나누지 않음)
+- 종목마다 필요한 봉 집합(spec)을 선언하며, 선언하지 않은 종목은 아무 비용도 들지 않는다.
+- 분봉(1/3/5/10분)은 트렌드·지표·REST 병합과 맞물려 있어 MarketCache의 기존 캔들 경로를 그대로 쓴다.
+- 스레드 안전하지 않다. MarketCache가 종목 스트라이프 락을 잡은 상태에서만 갱신한다.
+
+봉 dict 키: start_ts, end_ts, open, high, low, close, volume, amount, ticks
+"""
+from collections import deque
+from typing import Any, Deque, Dict, Iterable, List, Optional, Tuple
+
+BarSpec = Tuple[str, float]  # ('s', 초) / ('v', 거래량) / ('t', 거래대금)
+
+
+def parse_bar_spec(key: str) -> BarSpec:
+    """'5s' -> ('s', 5), 'v:10000' -> ('v', 10000.0), 't:1e8' -> ('t', 100000000.0)"""
+    key = key.strip()
+    if key.endswith('s') and key[:-1].isdigit():
+        sec = int(key[:-1])
+        if sec <= 0 or 60 % sec:
+            raise ValueError(f"초봉 주기는 60의 약수여야 합니다: {key}")
+        return 's', sec
+    kind, _, size = key.partition(':')
+    if kind in ('v', 't') and size:
+        value = float(size)
+        if value <= 0:
+            raise ValueError(f"봉 기준값은 0보다 커야 합니다: {key}")
+        return kind, value
+    raise ValueError(f"알 수 없는 봉 형식: {key} (예: '5s', 'v:10000', 't:100000000')")
+
+
+def _new_bar(start_ts: float, price: float, vol: float) -> Dict[str, Any]:
+    return {
+        'start_ts': start_ts, 'end_ts': start_ts,
+        'open': price, 'high': price, 'low': price, 'close': price,
+        'volume': vol, 'amount': price * vol, 'ticks': 1,
+    }
+
+
+def _merge_into(bar: Dict[str, Any], part: Dict[str, Any]) -> None:
+    """bar 뒤에 이어지는 part를 합친다 (제자리)"""
+    if part['high'] > bar['high']:
+        bar['high'] = part['high']
+    if part['low'] < bar['low']:
+        bar['low'] = part['low']
+    bar['close'] = part['close']
+    bar['end_ts'] = part['end_ts']
+    bar['volume'] += part['volume']
+    bar['amount'] += part['amount']
+    bar['ticks'] += part['ticks']
+
+
+class _RollupSeries:
+    """마감된 1초봉을 접어 만드는 n초봉"""
+    __slots__ = ('seconds', 'closed', 'partial')
+
+    def __init__(self, seconds: int, maxlen: int):
+        self.seconds = seconds
+        self.closed: Deque[Dict[str, Any]] = deque(maxlen=maxlen)
+        self.partial: Optional[Dict[str, Any]] = None  # 현재 구간에서 이미 마감된 1초봉들의 합
+
+    def fold(self, base: Dict[str, Any]) -> None:
+        bucket = int(base['start_ts']) // self.seconds * self.seconds
+        partial = self.partial
+        if partial is not None and partial['start_ts'] == bucket:
+            _merge_into(partial, base)
+            return
+        if partial is not None:
+            self.closed.append(partial)
+        partial = dict(base)
+        partial['start_ts'] = bucket
+        self.partial = partial
+
+    def snapshot(self, base: Optional[Dict[str, Any]]) -> Tuple[Dict[str, Any], ...]:
+        bars = list(self.closed)
+        partial = self.partial
+        bucket = int(base['start_ts']) // self.seconds * self.seconds if base is not None else None
+        if partial is not None:
+            if partial['start_ts'] == bucket:
+                forming = dict(partial)
+                _merge_into(forming, base)
+                bars.append(forming)
+                return tuple(bars)
+            bars.append(partial)  # 다음 1초봉이 아직 안 접혔을 뿐 이미 끝난 구간
+        if base is not None:
+            forming = dict(base)
+            forming['start_ts'] = bucket
+            bars.append(forming)
+        return tuple(bars)
+
+
+class _ThresholdSeries:
+    """누적 거래량/거래대금이 기준에 도달하면 마감하는 봉"""
+    __slots__ = ('kind', 'size', 'closed', 'current')
+
+    def __init__(self, kind: str, size: float, maxlen: int):
+        self.kind = kind
+        self.size = size
+        self.closed: Deque[Dict[str, Any]] = deque(maxlen=maxlen)
+        self.current: Optional[Dict[str, Any]] = None
+
+    def on_tick(self, t: float, price: float, vol: float) -> None:
+        bar = self.current
+        if bar is None:
+            bar = self.current = _new_bar(t, price, vol)
+        else:
+            if price > bar['high']:
+                bar['high'] = price
+            if price < bar['low']:
+                bar['low'] = price
+            bar['close'] = price
+            bar['end_ts'] = t
+            bar['volume'] += vol
+            bar['amount'] += price * vol
+            bar['ticks'] += 1
+        if bar['volume' if self.kind == 'v' else 'amount'] >= self.size:
+            self.closed.append(bar)
+            self.current = None
+
+    def snapshot(self) -> Tuple[Dict[str, Any], ...]:
+        bars = tuple(self.closed)
+        return bars + (dict(self.current),) if self.current is not None else bars
+
+
+class SymbolBars:
+    """종목 1개의 선언된 초봉/거래량봉/거래대금봉"""
+
+    def __init__(self, specs: Iterable[str], maxlen: int = 600):
+        self.maxlen = maxlen
+        self.base: Optional[Dict[str, Any]] = None       # 진행 중 1초봉
+        self.base_closed: Optional[Deque[Dict[str, Any]]] = None  # '1s'를 선언했을 때만 보관
+        self._rollups: Dict[int, _RollupSeries] = {}
+        self._thresholds: Dict[str, _ThresholdSeries] = {}
+        self.specs: List[str] = []
+        self.declare(specs)
+
+    def declare(self, specs: Iterable[str]) -> None:
+        """봉 종류 추가 (이미 있는 것은 무시). 새로 추가한 봉은 지금부터 쌓인다"""
+        for key in specs:
+            kind, size = parse_bar_spec(key)
+            if key in self.specs:
+                continue
+            self.specs.append(key)
+            if kind == 's' and size == 1:
+                self.base_closed = deque(maxlen=self.maxlen)
+            elif kind == 's':
+                self._rollups[int(size)] = _RollupSeries(int(size), self.maxlen)
+            else:
+                self._thresholds[key] = _ThresholdSeries(kind, size, self.maxlen)
+
+    def on_tick(self, t: float, price: float, vol: float) -> None:
+        sec = int(t)
+        base = self.base
+        if base is not None and int(base['start_ts']) == sec:
+            if price > base['high']:
+                base['high'] = price
+            if price < base['low']:
+                base['low'] = price
+            base['close'] = price
+            base['end_ts'] = t
+            base['volume'] += vol
+            base['amount'] += price * vol
+            base['ticks'] += 1
+        else:
+            if base is not None:
+                # 1초봉 마감 → 상위 초봉으로 접기 (초당 1회)
+                if self.base_closed is not None:
+                    self.base_closed.append(base)
+                for rollup in self._rollups.values():
+                    rollup.fold(base)
+            base = self.base = _new_bar(float(sec), price, vol)
+            base['end_ts'] = t
+        for series in self._thresholds.values():
+            series.on_tick(t, price, vol)
+
+    def bar_count(self) -> int:
+        """보관 중인 봉 dict 수 (메모리 산정용)"""
+        n = len(self.base_closed or ()) + (self.base is not None)
+        n += sum(len(r.closed) + (r.partial is not None) for r in self._rollups.values())
+        n += sum(len(t.closed) + (t.current is not None) for t in self._thresholds.values())
+        return n
+
+    def snapshot(self, key: str) -> Optional[Tuple[Dict[str, Any], ...]]:
+        """선언된 봉의 스냅샷 (오래된 순, 마지막은 진행 중 봉). 선언되지 않았으면 None"""
+        if key not in self.specs:
+            return None
+        kind, size = parse_bar_spec(key)
+        if kind == 's' and size == 1:
+            bars = tuple(self.base_closed)
+            return bars + (dict(self.base),) if self.base is not None else bars
+        if kind == 's':
+            return self._rollups[int(size)].snapshot(self.base)
+        return self._thresholds[key].snapshot()
@@ -0,0 +1,86 @@
+"""
+MarketCache 체크포인트 파일 (장중 재시작 시 캔들/지표/최근 시세 복원용)
+- 파일 구조
+    헤더  : FILE_HEADER(MAGIC, 메타 JSON 길이, 캔들 행 수, 시세 행 수)
+    메타  : UTF-8 JSON (세션 일자, 기록 시각, 종목코드/종목명 목록, 지표 누적 상태) + 8바이트 정렬 패딩
+    캔들  : float64 (행 수 x CANDLE_COLUMNS) — 종목 인덱스, 주기, 시작 분 순으로 정렬
+    시세  : float64 (행 수 x QUOTE_COLUMNS)
+- 숫자 배열은 np.memmap으로 열어 필요한 만큼만 읽으므로 종목 수십 개·세션 전체 분봉도 수 ms 안에 복원된다.
+- 임시 파일에 쓴 뒤 os.replace로 교체하므로 기록 도중 종료돼도 직전 체크포인트가 남는다.
+- 종목은 심볼 테이블 ID가 아니라 정규화 코드로 저장한다. (ID는 프로세스마다 다름)
+"""
+import json
+import os
+import struct
+from time import time
+from typing import Any, Dict, List, NamedTuple, Optional
+
+import numpy as np
+
+MAGIC = b"KISMCC1\n"
+FILE_HEADER = struct.Struct("<8sQQQ")  # magic, meta_len, candle_rows, quote_rows
+CANDLE_COLUMNS = ('code_idx', 'interval', 'start_min', 'open', 'high', 'low', 'close', 'volume', 'start_ts')
+QUOTE_COLUMNS = ('code_idx', 'price', 'change_rate', 'acc_vol', 'ask_price1', 'bid_price1', 'timestamp')
+
+
+class Checkpoint(NamedTuple):
+    meta: Dict[str, Any]
+    candles: np.ndarray  # (행 수, len(CANDLE_COLUMNS)) 읽기 전용 memmap
+    quotes: np.ndarray   # (행 수, len(QUOTE_COLUMNS)) 읽기 전용 memmap
+
+
+def _padded(n: int) -> int:
+    return (n + 7) // 8 * 8
+
+
+def write_checkpoint(path: str, session: str, codes: List[str], names: List[str],
+                     candles: np.ndarray, quotes: np.ndarray, indicators: Dict[str, Any]) -> int:
+    """체크포인트를 원자적으로 기록하고 파일 크기(바이트)를 반환"""
+    candles = np.ascontiguousarray(candles, dtype=np.float64).reshape(-1, len(CANDLE_COLUMNS))
+    quotes = np.ascontiguousarray(quotes, dtype=np.float64).reshape(-1, len(QUOTE_COLUMNS))
+    meta = json.dumps({
+        'session': session,
+        'written_at': time(),
+        'codes': codes,
+        'names': names,
+        'candle_columns': CANDLE_COLUMNS,
+        'quote_columns': QUOTE_COLUMNS,
+        'indicators': indicators,
+    }, ensure_ascii=False).encode('utf-8')
+    meta_len = len(meta)
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'wb') as f:
+        f.write(FILE_HEADER.pack(MAGIC, meta_len, len(candles), len(quotes)))
+        f.write(meta + b"\0" * (_padded(meta_len) - meta_len))
+        f.write(candles.tobytes())
+        f.write(quotes.tobytes())
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+    return FILE_HEADER.size + _padded(meta_len) + candles.nbytes + quotes.nbytes
+
+
+def open_checkpoint(path: str) -> Optional[Checkpoint]:
+    """체크포인트를 memmap으로 연다. 파일이 없거나 형식이 다르면 None"""
+    try:
+        with open(path, 'rb') as f:
+            magic, meta_len, candle_rows, quote_rows = FILE_HEADER.unpack(f.read(FILE_HEADER.size))
+            if magic != MAGIC:
+                return None
+            meta = json.loads(f.read(meta_len).decode('utf-8'))
+    except (FileNotFoundError, struct.error, ValueError):
+        return None
+    if tuple(meta.get('candle_columns', ())) != CANDLE_COLUMNS or tuple(meta.get('quote_columns', ())) != QUOTE_COLUMNS:
+        return None
+    offset = FILE_HEADER.size + _padded(meta_len)
+    empty_candles = np.empty((0, len(CANDLE_COLUMNS)))
+    empty_quotes = np.empty((0, len(QUOTE_COLUMNS)))
+    candles = np.memmap(path, dtype=np.float64, mode='r', offset=offset,
+                        shape=(candle_rows, len(CANDLE_COLUMNS))) if candle_rows else empty_candles
+    offset += candle_rows * len(CANDLE_COLUMNS) * 8
+    quotes = np.memmap(path, dtype=np.float64, mode='r', offset=offset,
+                       shape=(quote_rows, len(QUOTE_COLUMNS))) if quote_rows else empty_quotes
+    return Checkpoint(meta, candles, quotes)
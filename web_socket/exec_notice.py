@@ -0,0 +1,202 @@
+"""
+실시간 체결통보 (H0STCNI0, 모의투자 H0STCNI9)
+- 구독 요청의 tr_key는 HTS ID이며, 구독 응답(JSON)의 body.output에 AES-256-CBC 복호화용 key/iv가 담겨 온다.
+- 이후 체결통보 프레임은 "1|H0STCNI0|001|<base64 암호문>" 형태로 오며, 복호화하면 캐럿(^) 구분 필드가 된다.
+- CNTG_YN == '2' 인 통보만 체결(fill)이며, '1'은 주문 접수/정정/취소/거부 통보이다.
+- 파싱한 체결은 FillEventBus에 발행하고, 주문 코드는 REST 폴링 대신 wait_for_fill()로 기다린다.
+- FillEventBus는 REST 잔고로 시작점을 받은 뒤 체결로 종목별 주문가능수량을 갱신하므로, live인 동안 매도 전 잔고 조회가 필요 없다.
+  체결통보가 끊기면(live=False) 그 사이 체결을 놓칠 수 있어 추적을 버리고, 다음 REST 조회로 다시 시작한다.
+  REST 조회 전에 fill_mark()로 체결 순번을 받아 두면, 조회 중에 도착한 체결을 시작점에 다시 반영한다.
+"""
+import base64
+import threading
+import time
+from collections import OrderedDict, deque
+from typing import Any, Callable, Deque, Dict, List, NamedTuple, Optional, Tuple
+
+from core.symbol_table import symbol_table, SymbolKey
+from utils.logger import logger
+
+try:
+    from Crypto.Cipher import AES
+    from Crypto.Util.Padding import unpad
+except ImportError:  # 선택 의존성: 체결통보를 쓸 때만 필요 (pycryptodome)
+    AES = None
+
+EXEC_NOTICE_TRS = ("H0STCNI0", "H0STCNI9")
+
+# 체결통보 필드 (KIS 실시간 체결통보 명세 순서)
+H0STCNI0_FIELDS: List[str] = [
+    'CUST_ID', 'ACNT_NO', 'ODER_NO', 'OODER_NO', 'SELN_BYOV_CLS', 'RCTF_CLS', 'ODER_KIND', 'ODER_COND',
+    'STCK_SHRN_ISCD', 'CNTG_QTY', 'CNTG_UNPR', 'STCK_CNTG_HOUR', 'RFUS_YN', 'CNTG_YN', 'ACPT_YN',
+    'BRNC_NO', 'ODER_QTY', 'ACNT_NAME', 'CNTG_ISNM', 'CRDT_CLS', 'CRDT_LOAN_DATE', 'CNTG_ISNM40', 'ODER_PRC',
+]
+_IDX = {name: i for i, name in enumerate(H0STCNI0_FIELDS)}
+
+
+class FillEvent(NamedTuple):
+    order_id: str       # 주문번호 (선행 0 제거)
+    code: str           # 단축 종목코드
+    side: str           # 'BUY' / 'SELL'
+    qty: int            # 이번 통보의 체결 수량
+    price: float        # 체결 단가
+    exec_time: str      # 체결 시각 HHMMSS
+    recv_ts: float      # 수신 시각 (monotonic)
+
+
+def normalize_order_id(order_id) -> str:
+    return str(order_id or '').strip().lstrip('0')
+
+
+class ExecNoticeCipher:
+    """구독 응답으로 받은 key/iv로 체결통보 본문을 복호화합니다."""
+
+    def __init__(self, key: str, iv: str):
+        if AES is None:
+            raise RuntimeError("체결통보 복호화에는 pycryptodome 패키지가 필요합니다.")
+        self.key = key.encode('utf-8')
+        self.iv = iv.encode('utf-8')
+
+    def decrypt(self, payload: str) -> str:
+        cipher = AES.new(self.key, AES.MODE_CBC, self.iv)
+        return unpad(cipher.decrypt(base64.b64decode(payload)), AES.block_size).decode('utf-8')
+
+
+def parse_exec_notice(text: str, recv_ts: Optional[float] = None) -> Optional[FillEvent]:
+    """복호화된 체결통보를 FillEvent로 변환합니다. 체결이 아닌 통보(접수/정정/취소/거부)는 None"""
+    f = text.split('^')
+    if len(f) <= _IDX['CNTG_YN'] or f[_IDX['CNTG_YN']] != '2' or f[_IDX['RFUS_YN']] == '1':
+        return None
+    try:
+        qty = int(f[_IDX['CNTG_QTY']] or 0)
+        price = float(f[_IDX['CNTG_UNPR']] or 0)
+    except ValueError:
+        return None
+    if qty <= 0:
+        return None
+    return FillEvent(
+        order_id=normalize_order_id(f[_IDX['ODER_NO']]),
+        code=f[_IDX['STCK_SHRN_ISCD']],
+        side='SELL' if f[_IDX['SELN_BYOV_CLS']] == '01' else 'BUY',
+        qty=qty,
+        price=price,
+        exec_time=f[_IDX['STCK_CNTG_HOUR']],
+        recv_ts=recv_ts or time.monotonic(),
+    )
+
+
+class FillEventBus:
+    """
+    체결 이벤트를 주문번호별로 누적하고, 기다리는 스레드를 깨웁니다.
+    live는 체결통보 구독이 성공해 복호화 키를 받은 상태인지 여부로, False이면 호출 측이 REST 조회로 대체해야 합니다.
+    """
+
+    def __init__(self, retain_orders: int = 2000):
+        self._cond = threading.Condition()
+        self._orders: "OrderedDict[str, Tuple[int, float]]" = OrderedDict()  # 주문번호 -> (누적 체결수량, 누적 체결금액)
+        self._retain = retain_orders
+        self._listeners: List[Callable[[FillEvent], None]] = []
+        self._available: Optional[Dict[str, int]] = None  # 정규화 코드 -> 주문가능수량 (추적 중이 아니면 None)
+        self._seq = 0  # 체결 순번 (끊김도 순번 1개를 차지)
+        self._recent: Deque[Tuple[int, str, int]] = deque()  # (순번, 정규화 코드, 수량 변화) — 시작점 재반영용
+        self._recent_floor = 0  # 이 순번 이하의 체결은 _recent에 없음
+        self._recent_max = 512
+        self.live = False
+        self.events = 0
+
+    def set_live(self, live: bool):
+        with self._cond:
+            self.live = live
+            if not live:
+                self._available = None  # 끊긴 동안의 체결을 모르므로 수량 추적 중단
+                self._seq += 1
+                self._recent.clear()
+                self._recent_floor = self._seq  # 끊기기 전에 받은 순번으로는 시작점을 만들 수 없음
+            self._cond.notify_all()
+
+    def add_listener(self, listener: Callable[[FillEvent], None]):
+        self._listeners.append(listener)
+
+    def publish(self, event: FillEvent):
+        with self._cond:
+            qty, amount = self._orders.pop(event.order_id, (0, 0.0))
+            self._orders[event.order_id] = (qty + event.qty, amount + event.qty * event.price)
+            while len(self._orders) > self._retain:
+                self._orders.popitem(last=False)
+            code = symbol_table.normalize(event.code)
+            delta = event.qty if event.side == 'BUY' else -event.qty
+            self._seq += 1
+            self._recent.append((self._seq, code, delta))
+            if len(self._recent) > self._recent_max:
+                self._recent_floor = self._recent.popleft()[0]
+            if self._available is not None:
+                self._available[code] = max(0, self._available.get(code, 0) + delta)
+            self.events += 1
+            self._cond.notify_all()
+        for listener in list(self._listeners):
+            try:
+                listener(event)
+            except Exception as e:
+                logger.error(f"[FILL] 체결 이벤트 처리 오류: {e}")
+
+    def filled(self, order_id) -> Tuple[int, float]:
+        """(누적 체결수량, 평균 체결가)"""
+        with self._cond:
+            qty, amount = self._orders.get(normalize_order_id(order_id), (0, 0.0))
+        return qty, (amount / qty if qty else 0.0)
+
+    def fill_mark(self) -> int:
+        """현재 체결 순번 (REST 잔고 조회 직전에 받아 seed_available에 넘김)"""
+        with self._cond:
+            return self._seq
+
+    def seed_available(self, quantities: Dict[SymbolKey, int], since: int) -> bool:
+        """
+        REST로 조회한 종목별 주문가능수량으로 수량 추적을 (다시) 시작합니다.
+        since(fill_mark) 이후 도착한 체결은 조회 결과에 빠졌을 수 있으므로 다시 반영합니다.
+        live가 아니거나, 그 사이 끊김이 있었거나, 재반영할 체결이 보관 범위를 넘으면 시작하지 않고 False
+        """
+        with self._cond:
+            if not self.live or since < self._recent_floor:
+                return False
+            available = {symbol_table.normalize(c): int(q) for c, q in quantities.items()}
+            for seq, code, delta in self._recent:
+                if seq > since:
+                    available[code] = max(0, available.get(code, 0) + delta)
+            self._available = available
+            return True
+
+    def available_qty(self, code: SymbolKey) -> Optional[int]:
+        """체결로 추적 중인 주문가능수량. 추적 중이 아니면(미연결/시작점 없음) None — 호출 측이 REST로 조회"""
+        with self._cond:
+            if not self.live or self._available is None:
+                return None
+            return self._available.get(symbol_table.normalize(code), 0)
+
+    def wait_for_fill(self, order_id, quantity: int, timeout: float) -> int:
+        """
+        누적 체결수량이 quantity에 도달하거나 timeout이 지날 때까지 기다리고 누적 체결수량을 반환합니다.
+        대기 중 체결통보 연결이 끊기면(live=False) 즉시 반환합니다.
+        """
+        key = normalize_order_id(order_id)
+        deadline = time.monotonic() + timeout
+        with self._cond:
+            while True:
+                qty = self._orders.get(key, (0, 0.0))[0]
+                remaining = deadline - time.monotonic()
+                if qty >= quantity or remaining <= 0 or not self.live:
+                    return qty
+                self._cond.wait(remaining)
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._cond:
+            return {
+                "live": self.live,
+                "events": self.events,
+                "orders": len(self._orders),
+                "tracking": self._available is not None,
+            }
+
+
+# 전역 인스턴스
+fill_events = FillEventBus()
@@ -0,0 +1,350 @@
+"""
+KIS 실시간 시세 프레임 디코더
+- 포맷: "<암호화여부>|<TR_ID>|<데이터건수>|<데이터>"
+- 데이터는 캐럿(^)으로 구분되며, 데이터건수만큼의 레코드가 하나의 프레임에 이어 붙어 전달된다.
+  (장 시작/종가 단일가 등 체결이 몰리는 구간에는 한 프레임에 여러 건의 체결이 담김)
+- TR_ID별 필드 스키마를 한 번 컴파일하여 JSON/캐럿 두 경로 모두 같은 디코더로 처리한다.
+  자주 쓰는 hot 필드만 즉시 변환하고, 나머지는 원본 문자열을 보관했다가 접근 시 변환한다.
+"""
+from typing import Any, Callable, Dict, Iterable, List, NamedTuple, Optional, Tuple, Union
+
+# 필드 타입: 's' 문자열, 'f' 실수, 'i' 정수
+# (내부 필드명, KIS 공식 필드명, 타입) — 순서가 곧 캐럿 포맷의 필드 인덱스
+H0STCNT0_SCHEMA: List[Tuple[str, str, str]] = [
+    ('code', 'MKSC_SHRN_ISCD', 's'),
+    ('exec_time', 'STCK_CNTG_HOUR', 's'),
+    ('price', 'STCK_PRPR', 'f'),
+    ('change_sign', 'PRDY_VRSS_SIGN', 's'),
+    ('change', 'PRDY_VRSS', 'f'),
+    ('change_rate', 'PRDY_CTRT', 'f'),
+    ('wghn_avrg_stck_prc', 'WGHN_AVRG_STCK_PRC', 'f'),
+    ('open_price', 'STCK_OPRC', 'f'),
+    ('high_price', 'STCK_HGPR', 'f'),
+    ('low_price', 'STCK_LWPR', 'f'),
+    ('ask_price1', 'ASKP1', 'f'),
+    ('bid_price1', 'BIDP1', 'f'),
+    ('exec_vol', 'CNTG_VOL', 'f'),
+    ('acc_vol', 'ACML_VOL', 'f'),
+    ('acc_tr_amount', 'ACML_TR_PBMN', 'f'),
+    ('seln_cntg_csnu', 'SELN_CNTG_CSNU', 'i'),
+    ('shnu_cntg_csnu', 'SHNU_CNTG_CSNU', 'i'),
+    ('ntby_cntg_csnu', 'NTBY_CNTG_CSNU', 'i'),
+    ('cttr', 'CTTR', 'f'),
+    ('seln_cntg_smtn', 'SELN_CNTG_SMTN', 'f'),
+    ('shnu_cntg_smtn', 'SHNU_CNTG_SMTN', 'f'),
+    ('ccld_dvsn', 'CCLD_DVSN', 's'),
+    ('shnu_rate', 'SHNU_RATE', 'f'),
+    ('prdy_vol_vrss_acml_vol_rate', 'PRDY_VOL_VRSS_ACML_VOL_RATE', 'f'),
+    ('oprc_hour', 'OPRC_HOUR', 's'),
+    ('oprc_vrss_prpr_sign', 'OPRC_VRSS_PRPR_SIGN', 's'),
+    ('oprc_vrss_prpr', 'OPRC_VRSS_PRPR', 'f'),
+    ('hgpr_hour', 'HGPR_HOUR', 's'),
+    ('hgpr_vrss_prpr_sign', 'HGPR_VRSS_PRPR_SIGN', 's'),
+    ('hgpr_vrss_prpr', 'HGPR_VRSS_PRPR', 'f'),
+    ('lwpr_hour', 'LWPR_HOUR', 's'),
+    ('lwpr_vrss_prpr_sign', 'LWPR_VRSS_PRPR_SIGN', 's'),
+    ('lwpr_vrss_prpr', 'LWPR_VRSS_PRPR', 'f'),
+    ('bsop_date', 'BSOP_DATE', 's'),
+    ('new_mkop_cls_code', 'NEW_MKOP_CLS_CODE', 's'),
+    ('trht_yn', 'TRHT_YN', 's'),
+    ('askp_rsqn1', 'ASKP_RSQN1', 'f'),
+    ('bidp_rsqn1', 'BIDP_RSQN1', 'f'),
+    ('total_askp_rsqn', 'TOTAL_ASKP_RSQN', 'f'),
+    ('total_bidp_rsqn', 'TOTAL_BIDP_RSQN', 'f'),
+    ('vol_tnrt', 'VOL_TNRT', 'f'),
+    ('prdy_smns_hour_acml_vol', 'PRDY_SMNS_HOUR_ACML_VOL', 'f'),
+    ('prdy_smns_hour_acml_vol_rate', 'PRDY_SMNS_HOUR_ACML_VOL_RATE', 'f'),
+    ('hour_cls_code', 'HOUR_CLS_CODE', 's'),
+    ('mrkt_trtm_cls_code', 'MRKT_TRTM_CLS_CODE', 's'),
+    ('vi_stnd_prc', 'VI_STND_PRC', 'f'),
+]
+
+# TR_ID별 필드 스키마
+SCHEMAS: Dict[str, List[Tuple[str, str, str]]] = {
+    "H0STCNT0": H0STCNT0_SCHEMA,  # 실시간 주식 체결가
+}
+
+# 실시간 주식 호가 (10단계) — 호가창은 딕셔너리로 디코딩하지 않고 OrderBookStore가 필드 리스트를 직접 읽는다
+H0STASP0_FIELDS: List[str] = (
+    ['MKSC_SHRN_ISCD', 'BSOP_HOUR', 'HOUR_CLS_CODE']
+    + [f'ASKP{i}' for i in range(1, 11)]
+    + [f'BIDP{i}' for i in range(1, 11)]
+    + [f'ASKP_RSQN{i}' for i in range(1, 11)]
+    + [f'BIDP_RSQN{i}' for i in range(1, 11)]
+    + ['TOTAL_ASKP_RSQN', 'TOTAL_BIDP_RSQN', 'OVTM_TOTAL_ASKP_RSQN', 'OVTM_TOTAL_BIDP_RSQN',
+       'ANTC_CNPR', 'ANTC_CNQN', 'ANTC_VOL', 'ANTC_CNTG_VRSS', 'ANTC_CNTG_VRSS_SIGN', 'ANTC_CNTG_PRDY_CTRT',
+       'ACML_VOL', 'TOTAL_ASKP_RSQN_ICDC', 'TOTAL_BIDP_RSQN_ICDC', 'OVTM_TOTAL_ASKP_ICDC', 'OVTM_TOTAL_BIDP_ICDC',
+       'STCK_DEAL_CLS_CODE']
+)
+
+# TR_ID별 레코드당 필드 수 (KIS 실시간 시세 명세 기준)
+FIELDS_PER_RECORD: Dict[str, int] = {tr_id: len(schema) for tr_id, schema in SCHEMAS.items()}
+FIELDS_PER_RECORD["H0STASP0"] = len(H0STASP0_FIELDS)
+
+# 기본 hot 필드: 캐시/캔들/로거/전략이 매 틱 읽는 필드
+DEFAULT_HOT_FIELDS: Tuple[str, ...] = (
+    'code', 'exec_time', 'price', 'change_rate',
+    'open_price', 'high_price', 'low_price',
+    'ask_price1', 'bid_price1', 'askp_rsqn1', 'bidp_rsqn1',
+    'exec_vol', 'acc_vol', 'acc_tr_amount',
+)
+
+
+class RealtimeFrame(NamedTuple):
+    encrypted: bool            # 암호화 여부 (header[0] == '1')
+    tr_id: str                 # header[1]
+    records: List[List[str]]   # 레코드별 필드 리스트 (암호화 프레임은 빈 리스트)
+    payload: str               # 원본 데이터 영역 (복호화 용도)
+
+
+def split_frame(message: str) -> Optional[RealtimeFrame]:
+    """
+    파이프/캐럿 포맷의 실시간 프레임을 헤더의 데이터건수만큼 레코드로 분리합니다.
+    헤더가 부족하면 None을 반환합니다.
+    """
+    parts = message.split('|', 3)
+    if len(parts) < 4:
+        return None
+
+    encrypted = parts[0] == '1'
+    tr_id = parts[1]
+    payload = parts[3]
+    if encrypted:
+        return RealtimeFrame(True, tr_id, [], payload)
+
+    try:
+        count = max(1, int(parts[2]))
+    except ValueError:
+        count = 1
+
+    fields = payload.split('^')
+    if count == 1:
+        return RealtimeFrame(False, tr_id, [fields], payload)
+
+    # 명세상의 필드 수를 우선 사용하고, 명세가 없거나 길이가 맞지 않으면 균등 분할
+    width = FIELDS_PER_RECORD.get(tr_id, 0)
+    if width <= 0 or len(fields) < width * count:
+        width = len(fields) // count
+    if width <= 0:
+        return RealtimeFrame(False, tr_id, [], payload)
+
+    records = [fields[i * width:(i + 1) * width] for i in range(count)]
+    return RealtimeFrame(False, tr_id, records, payload)
+
+
+# 최신 값만 의미 있어 대기 중 프레임을 교체해도 되는 TR (호가). 체결(H0STCNT0)은 레코드마다 체결량이 있어 제외
+COALESCE_TRS = frozenset(('H0STASP0',))
+
+
+def frame_key(message: str) -> Optional[Tuple[str, str]]:
+    """
+    교체 가능한 프레임의 (TR_ID, 종목코드) 키를 반환합니다. (파이프라인 coalesce 용도)
+    COALESCE_TRS의 단일 레코드 프레임만 키를 가지며, 체결 프레임·다건 프레임·제어용 JSON·암호화 프레임은
+    None을 반환하여 교체 대상에서 제외합니다.
+    """
+    if not message or message[0] != '0':
+        return None
+    parts = message.split('|', 3)
+    if len(parts) < 4 or parts[1] not in COALESCE_TRS or parts[2] != '001':
+        return None
+    return parts[1], parts[3].partition('^')[0]
+
+
+# 틱 레코드 고정 슬롯: 기본 hot 필드 + 파이프라인 스탬프(캐시 반영 시각, 소켓 수신/캐시 반영 monotonic 시각)
+# 슬롯은 저장 위치일 뿐이며, 설정한 hot 필드에서 빠진 슬롯 필드는 cold 필드처럼 처음 접근할 때 변환된다.
+TICK_FIELD_SLOTS: Tuple[str, ...] = DEFAULT_HOT_FIELDS
+TICK_STAMP_SLOTS: Tuple[str, ...] = ('timestamp', 'recv_ts', 'apply_ts')
+_SLOT_SET = frozenset(TICK_FIELD_SLOTS + TICK_STAMP_SLOTS)
+
+
+class TickRecord:
+    """
+    디코딩된 실시간 체결 레코드.
+    자주 쓰는 필드는 고정 슬롯(__slots__)에 들어 있고, 나머지(cold) 필드는 원본(캐럿 필드 리스트 또는
+    JSON output 딕셔너리)에서 처음 접근할 때 변환되어 _extra에 캐싱된다.
+    rec['price'], rec.get(...), rec[k] = v 처럼 딕셔너리와 같은 방식으로 접근한다.
+    release() 이후에는 원본을 놓아 메모리를 줄이며, 이미 변환된 필드만 남는다.
+    """
+    __slots__ = TICK_FIELD_SLOTS + TICK_STAMP_SLOTS + ('_raw', '_decoder', '_extra')
+
+    def __init__(self, fields: Optional[Dict[str, Any]] = None):
+        self._raw = None
+        self._decoder = None
+        self._extra = None
+        if fields:
+            for key, value in fields.items():
+                self[key] = value
+
+    def __getitem__(self, key: str) -> Any:
+        if key in _SLOT_SET:
+            try:
+                return getattr(self, key)
+            except AttributeError:
+                pass
+            # hot 설정에서 빠진 슬롯 필드: 원본에서 변환해 슬롯에 캐싱
+            decoder = self._decoder
+            if decoder is None or key not in decoder._cold:
+                raise KeyError(key) from None
+            value = decoder.decode_cold(self._raw, key)
+            setattr(self, key, value)
+            return value
+        extra = self._extra
+        if extra is not None and key in extra:
+            return extra[key]
+        decoder = self._decoder
+        if decoder is None:
+            raise KeyError(key)
+        value = decoder.decode_cold(self._raw, key)
+        if extra is None:
+            extra = self._extra = {}
+        extra[key] = value
+        return value
+
+    def __setitem__(self, key: str, value: Any) -> None:
+        if key in _SLOT_SET:
+            setattr(self, key, value)
+        else:
+            if self._extra is None:
+                self._extra = {}
+            self._extra[key] = value
+
+    def get(self, key: str, default: Any = None) -> Any:
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+    def __contains__(self, key: object) -> bool:
+        if key in _SLOT_SET and hasattr(self, key):
+            return True
+        if self._extra is not None and key in self._extra:
+            return True
+        decoder = self._decoder
+        return decoder is not None and key in decoder._cold
+
+    def release(self) -> None:
+        """
+        원본 필드를 놓습니다. (캐시에 오래 보관되는 레코드의 메모리 절감용)
+        hot 설정에서 빠져 아직 변환되지 않은 슬롯 필드는 먼저 변환해 두므로, 슬롯 필드는 release 후에도 항상 읽힌다.
+        """
+        decoder = self._decoder
+        if decoder is not None:
+            for key in decoder.lazy_slots:
+                if not hasattr(self, key):
+                    setattr(self, key, decoder.decode_cold(self._raw, key))
+        self._raw = None
+        self._decoder = None
+
+    def materialize(self) -> Dict[str, Any]:
+        """모든 스키마 필드를 변환한 일반 딕셔너리를 반환 (저장/직렬화 용도)"""
+        out = {key: getattr(self, key) for key in self.__slots__[:-3] if hasattr(self, key)}
+        decoder = self._decoder
+        if decoder is not None:
+            for key in decoder.cold_fields:
+                out[key] = self[key]
+        if self._extra:
+            out.update(self._extra)
+        return out
+
+    def __repr__(self) -> str:
+        return f"TickRecord({self.materialize()!r})"
+
+
+_CONVERTERS: Dict[str, Callable[[Any], Any]] = {
+    's': lambda x: x if x is not None else '',
+    'f': lambda x: float(x or 0),
+    'i': lambda x: int(x or 0),
+}
+
+
+def _expr(kind: str, src: str) -> str:
+    """필드 타입별 변환 표현식 (생성 코드용)"""
+    if kind == 'f':
+        return f"float({src} or 0)"
+    if kind == 'i':
+        return f"int({src} or 0)"
+    return src
+
+
+class CompiledDecoder:
+    """
+    TR_ID 스키마를 컴파일한 디코더.
+    hot 필드 변환 코드를 생성(exec)해 두어 레코드마다 루프/조회 없이 한 번에 딕셔너리를 만든다.
+    """
+
+    def __init__(self, tr_id: str, schema: List[Tuple[str, str, str]], hot_fields: Optional[Iterable[str]] = None):
+        self.tr_id = tr_id
+        self.schema = schema
+        self.width = len(schema)
+        self.code_key = schema[0][1]  # JSON 경로의 종목코드 필드명 (구독 응답에는 없음)
+        names = [name for name, _, _ in schema]
+        hot = set(hot_fields) if hot_fields is not None else set(DEFAULT_HOT_FIELDS)
+        hot.add('code')  # 종목코드는 항상 필요
+        unknown = hot - set(names)
+        if unknown:
+            raise ValueError(f"{tr_id} 스키마에 없는 필드: {sorted(unknown)}")
+
+        self.hot_fields: Tuple[str, ...] = tuple(n for n in names if n in hot)
+        # cold 필드: 이름 -> (인덱스, KIS 필드명, 변환 함수)
+        self._cold: Dict[str, Tuple[int, str, Callable[[Any], Any]]] = {
+            name: (idx, kis_name, _CONVERTERS[kind])
+            for idx, (name, kis_name, kind) in enumerate(schema) if name not in hot
+        }
+        self.cold_fields: Tuple[str, ...] = tuple(self._cold)
+        self.lazy_slots: Tuple[str, ...] = tuple(n for n in self.cold_fields if n in _SLOT_SET)  # release 시 변환
+
+        # hot 필드만 즉시 변환: 슬롯 필드는 속성으로, 슬롯 밖의 필드는 _extra 딕셔너리로
+        hot_specs = [(idx, name, kis_name, kind) for idx, (name, kis_name, kind) in enumerate(schema) if name in hot]
+        slot_specs = [spec for spec in hot_specs if spec[1] in _SLOT_SET]
+        extra_specs = [spec for spec in hot_specs if spec[1] not in _SLOT_SET]
+
+        def body(src_of) -> str:
+            lines = ["    r = new(TickRecord)"]
+            lines += [f"    r.{name} = {_expr(kind, src_of(idx, kis))}" for idx, name, kis, kind in slot_specs]
+            extra = ", ".join(f"{name!r}: {_expr(kind, src_of(idx, kis))}" for idx, name, kis, kind in extra_specs)
+            lines.append(f"    r._extra = {{{extra}}}" if extra else "    r._extra = None")
+            return "\n".join(lines) + "\n"
+
+        src = (
+            "def decode_fields(f):\n"
+            + body(lambda idx, kis: f"f[{idx}]")
+            + "    r._raw = f\n"
+            "    r._decoder = dec\n"
+            "    return r\n"
+            "def decode_json(o):\n"
+            "    g = o.get\n"
+            + body(lambda idx, kis: "g(%r, %r)" % (kis, ''))
+            + "    r._raw = o\n"
+            "    r._decoder = dec\n"
+            "    return r\n"
+        )
+        namespace: Dict[str, Any] = {'TickRecord': TickRecord, 'dec': self, 'new': object.__new__}
+        exec(compile(src, f"<decoder:{tr_id}>", "exec"), namespace)
+        self.decode_fields: Callable[[List[str]], TickRecord] = namespace['decode_fields']
+        self.decode_json: Callable[[Dict[str, Any]], TickRecord] = namespace['decode_json']
+
+    def decode_cold(self, raw: Union[List[str], Dict[str, Any]], key: str) -> Any:
+        """cold 필드 1개를 원본에서 변환합니다."""
+        spec = self._cold.get(key)
+        if spec is None:
+            raise KeyError(key)
+        idx, kis_name, conv = spec
+        if isinstance(raw, dict):
+            return conv(raw.get(kis_name, ''))
+        return conv(raw[idx] if idx < len(raw) else '')
+
+    def decode_frame(self, frame: RealtimeFrame) -> List[TickRecord]:
+        """프레임의 모든 레코드를 디코딩 (필드 수가 모자란 레코드는 건너뜀)"""
+        width = self.width
+        decode = self.decode_fields
+        return [decode(fields) for fields in frame.records if len(fields) >= width]
+
+
+def build_decoders(hot_fields: Optional[Iterable[str]] = None) -> Dict[str, CompiledDecoder]:
+    """등록된 모든 TR_ID 스키마를 컴파일합니다."""
+    hot = tuple(hot_fields) if hot_fields is not None else None
+    decoders = {}
+    for tr_id, schema in SCHEMAS.items():
+        names = {name for name, _, _ in schema}
+        decoders[tr_id] = CompiledDecoder(tr_id, schema, [h for h in hot if h in names] if hot is not None else None)
+    return decoders
@@ -0,0 +1,76 @@
+"""
+WebSocket 끊김 구간 보충(gap backfill)
+- 재연결 직후 클라이언트가 (끊긴 시각, 복구 시각, 구독 종목)을 넘기면, 종목별 당일 1분봉을 REST로 받아
+  MarketCache 캔들과 DataLogger 1분봉에 병합한다. (같은 분은 교체하므로 중복 집계 없음)
+- 보충은 별도 스레드에서 순차로 처리하며, 끊김 시작부터 보충 완료까지의 복구 시간을 기록한다.
+"""
+import threading
+from datetime import datetime
+from time import monotonic, sleep, time
+from typing import Any, Dict, List, Optional
+
+from utils.logger import logger
+
+
+class GapBackfiller:
+    def __init__(self, account_manager, market_cache, data_logger=None, request_interval: float = 0.06):
+        self.account_manager = account_manager
+        self.market_cache = market_cache
+        self.data_logger = data_logger
+        self.request_interval = request_interval  # REST 호출 간격 (초당 호출 제한 대응)
+        self._lock = threading.Lock()  # 보충 작업 순차 처리
+        self.recoveries = 0
+        self.last_gap_sec: Optional[float] = None
+        self.last_recovery_sec: Optional[float] = None
+        self.max_recovery_sec = 0.0
+
+    def on_gap(self, start_ts: float, end_ts: float, codes: List[str]) -> None:
+        """KISWebSocketClient.gap_handler — 호출 스레드를 막지 않도록 보충 스레드를 띄웁니다."""
+        if not codes:
+            return
+        threading.Thread(
+            target=self.backfill, args=(start_ts, end_ts, list(codes)), name="ws-gap-backfill", daemon=True
+        ).start()
+
+    def backfill(self, start_ts: float, end_ts: float, codes: List[str]) -> Dict[str, int]:
+        """끊김 구간이 걸친 1분봉을 종목별로 보충합니다. {종목: 반영한 분봉 수}"""
+        start_dt = datetime.fromtimestamp(start_ts).replace(second=0, microsecond=0)
+        end_dt = datetime.fromtimestamp(end_ts)
+        if start_dt.date() != end_dt.date():
+            logger.warning("[GAP] 날짜가 바뀐 끊김 구간은 보충하지 않습니다.")
+            return {}
+        first_key = start_dt.strftime('%Y%m%d%H%M')
+        last_key = end_dt.strftime('%Y%m%d%H%M')
+
+        merged: Dict[str, int] = {}
+        with self._lock:
+            t0 = monotonic()
+            for code in codes:
+                bars = self.account_manager.get_minute_bars(
+                    code, end_dt.strftime('%H%M%S'), start_time=start_dt.strftime('%H%M%S')
+                )
+                bars = [b for b in bars if first_key <= b['time'] <= last_key]
+                if bars:
+                    n = self.market_cache.merge_minute_bars(code, bars)
+                    if self.data_logger is not None:
+                        self.data_logger.merge_bars(code, bars)
+                    merged[code] = n
+                sleep(self.request_interval)
+
+            self.recoveries += 1
+            self.last_gap_sec = end_ts - start_ts
+            self.last_recovery_sec = time() - start_ts
+            self.max_recovery_sec = max(self.max_recovery_sec, self.last_recovery_sec)
+            logger.info(
+                f"[GAP] 끊김 구간 보충 완료: {len(merged)}/{len(codes)}종목, 분봉 {sum(merged.values())}개 "
+                f"(끊김 {self.last_gap_sec:.1f}s, 보충 {monotonic() - t0:.1f}s, 전체 복구 {self.last_recovery_sec:.1f}s)"
+            )
+        return merged
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "recoveries": self.recoveries,
+            "last_gap_sec": self.last_gap_sec,
+            "last_recovery_sec": self.last_recovery_sec,
+            "max_recovery_sec": self.max_recovery_sec,
+        }
@@ -0,0 +1,344 @@
+"""
+캔들 기반 스트리밍 지표
+- 지표는 마감된 캔들을 on_close()로 한 번씩만 누적하고, 진행 중인 마지막 캔들은 조회 시 value(forming)에서 합산한다.
+  따라서 틱마다 할 일이 없고, 캔들 마감/조회 모두 O(1)이다. (캔들 deque 전체를 다시 훑지 않음)
+- 지표 키는 "이름" 또는 "이름:기간" 문자열이다. 예) 'vwap:480', 'ema:20', 'sma:60', 'ret_std', 'atr:14'
+- 전략은 시작 시 indicator_registry.declare(주기, 이름, 기간)으로 필요한 지표를 선언하고,
+  MarketCache는 선언된 지표만 종목·주기별로 만들어 유지한다. 선언하지 않은 지표를 조회하면
+  그때 만들어 보유 중인 캔들로 한 번 재생(replay)한다.
+"""
+import math
+import threading
+from abc import ABC, abstractmethod
+from collections import deque
+from typing import Any, Callable, Deque, Dict, FrozenSet, Iterable, Mapping, Optional, Tuple
+
+
+def _close(c: Mapping[str, Any]) -> float:
+    return c.get('close', 0) or 0
+
+
+class Indicator(ABC):
+    """스트리밍 지표 기본형"""
+    __slots__ = ()
+
+    @abstractmethod
+    def on_close(self, candle: Mapping[str, Any]) -> None:
+        """마감된 캔들 1개를 누적"""
+
+    @abstractmethod
+    def value(self, forming: Optional[Mapping[str, Any]]) -> Optional[float]:
+        """마감 캔들 누적값 + 진행 중 캔들(forming)로 현재 값을 계산 (데이터 부족 시 None)"""
+
+    def get_state(self) -> Dict[str, Any]:
+        """체크포인트용 누적 상태 (슬롯 값, deque는 리스트로)"""
+        state = {}
+        for name in type(self).__slots__:
+            value = getattr(self, name)
+            state[name] = list(value) if isinstance(value, deque) else value
+        return state
+
+    def set_state(self, state: Mapping[str, Any]) -> None:
+        """get_state() 결과로 누적 상태 복원 (같은 키로 만든 지표에만)"""
+        for name, value in state.items():
+            current = getattr(self, name)
+            setattr(self, name, deque(value, maxlen=current.maxlen) if isinstance(current, deque) else value)
+
+
+class VWAP(Indicator):
+    """
+    VWAP: sum(종가*거래량) / sum(거래량), 최근 n개 캔들(진행 중 캔들 포함)
+    n은 MarketCache 캔들 보관 개수(max_candles_per_interval)와 같게 두어, 보관 중인 1분봉 전체로 계산하던 값과 일치시킨다.
+    """
+    __slots__ = ('period', 'bars', 'pv', 'vol')
+
+    def __init__(self, period: int):
+        self.period = period
+        self.bars: Deque[Tuple[float, float]] = deque()  # (종가*거래량, 거래량)
+        self.pv = 0.0
+        self.vol = 0.0
+
+    def on_close(self, c):
+        volume = c.get('volume', 0)
+        pv = c.get('close', 0) * volume
+        self.bars.append((pv, volume))
+        self.pv += pv
+        self.vol += volume
+        if len(self.bars) > self.period - 1: # 진행 중 캔들 자리 1개를 남겨 둔다
+            old_pv, old_vol = self.bars.popleft()
+            self.pv -= old_pv
+            self.vol -= old_vol
+
+    def value(self, forming):
+        pv, vol = self.pv, self.vol
+        if forming is not None:
+            pv += forming.get('close', 0) * forming.get('volume', 0)
+            vol += forming.get('volume', 0)
+        return pv / vol if vol > 0 else 0.0
+
+
+class EMA(Indicator):
+    """지수이동평균 (pandas ewm(span=n, adjust=False)와 같은 점화식, 첫 값은 첫 종가)"""
+    __slots__ = ('alpha', 'ema')
+
+    def __init__(self, period: int):
+        self.alpha = 2.0 / (period + 1)
+        self.ema: Optional[float] = None
+
+    def _step(self, price):
+        return price if self.ema is None else self.alpha * price + (1 - self.alpha) * self.ema
+
+    def on_close(self, c):
+        self.ema = self._step(_close(c))
+
+    def value(self, forming):
+        return self.ema if forming is None else self._step(_close(forming))
+
+
+class SMA(Indicator):
+    """단순이동평균 (최근 n개 종가, 진행 중 캔들 포함)"""
+    __slots__ = ('period', 'closes', 'total')
+
+    def __init__(self, period: int):
+        self.period = period
+        self.closes: Deque[float] = deque()
+        self.total = 0.0
+
+    def on_close(self, c):
+        price = _close(c)
+        self.closes.append(price)
+        self.total += price
+        if len(self.closes) > self.period - 1: # 진행 중 캔들 자리 1개를 남겨 둔다
+            self.total -= self.closes.popleft()
+
+    def value(self, forming):
+        if forming is None:
+            return None
+        if len(self.closes) + 1 < self.period:
+            return None
+        return (self.total + _close(forming)) / self.period
+
+
+class ReturnStd(Indicator):
+    """
+    캔들 종가 수익률(%)의 표준편차 (모집단, np.std와 같은 ddof=0)
+    window=0이면 세션 전체, 아니면 최근 window개 수익률
+    """
+    __slots__ = ('window', 'prev_close', 'returns', 'n', 's', 'ss')
+
+    def __init__(self, window: int = 0):
+        self.window = window
+        self.prev_close = 0.0
+        self.returns: Deque[float] = deque()
+        self.n = 0
+        self.s = 0.0
+        self.ss = 0.0
+
+    def _ret(self, price):
+        if self.prev_close > 0 and price > 0:
+            return (price - self.prev_close) / self.prev_close * 100.0
+        return None
+
+    def on_close(self, c):
+        price = _close(c)
+        r = self._ret(price)
+        if price > 0:
+            self.prev_close = price
+        if r is None:
+            return
+        self.n += 1
+        self.s += r
+        self.ss += r * r
+        if self.window:
+            self.returns.append(r)
+            if len(self.returns) > self.window - 1:
+                old = self.returns.popleft()
+                self.n -= 1
+                self.s -= old
+                self.ss -= old * old
+
+    def value(self, forming):
+        n, s, ss = self.n, self.s, self.ss
+        r = self._ret(_close(forming)) if forming is not None else None
+        if r is not None:
+            n += 1
+            s += r
+            ss += r * r
+        if n == 0:
+            return None
+        mean = s / n
+        return math.sqrt(max(0.0, ss / n - mean * mean))
+
+
+class ATR(Indicator):
+    """평균 실제 범위 (최근 n개 캔들의 True Range 단순평균, 진행 중 캔들 포함)"""
+    __slots__ = ('period', 'prev_close', 'ranges', 'total')
+
+    def __init__(self, period: int = 14):
+        self.period = period
+        self.prev_close: Optional[float] = None
+        self.ranges: Deque[float] = deque()
+        self.total = 0.0
+
+    def _true_range(self, c):
+        high, low = c.get('high', 0), c.get('low', 0)
+        if self.prev_close is None:
+            return high - low
+        return max(high - low, abs(high - self.prev_close), abs(low - self.prev_close))
+
+    def on_close(self, c):
+        tr = self._true_range(c)
+        self.prev_close = _close(c)
+        self.ranges.append(tr)
+        self.total += tr
+        if len(self.ranges) > self.period - 1:
+            self.total -= self.ranges.popleft()
+
+    def value(self, forming):
+        if forming is None or len(self.ranges) + 1 < self.period:
+            return None
+        return (self.total + self._true_range(forming)) / self.period
+
+
+class DayHigh(Indicator):
+    """세션 고가"""
+    __slots__ = ('high',)
+
+    def __init__(self):
+        self.high: Optional[float] = None
+
+    def on_close(self, c):
+        h = c.get('high', 0)
+        if self.high is None or h > self.high:
+            self.high = h
+
+    def value(self, forming):
+        if forming is None:
+            return self.high
+        h = forming.get('high', 0)
+        return h if self.high is None or h > self.high else self.high
+
+
+class DayLow(Indicator):
+    """세션 저가"""
+    __slots__ = ('low',)
+
+    def __init__(self):
+        self.low: Optional[float] = None
+
+    def on_close(self, c):
+        low = c.get('low', 0)
+        if self.low is None or low < self.low:
+            self.low = low
+
+    def value(self, forming):
+        if forming is None:
+            return self.low
+        low = forming.get('low', 0)
+        return low if self.low is None or low < self.low else self.low
+
+
+class UpCandleRatio(Indicator):
+    """양봉(종가 > 시가) 비율"""
+    __slots__ = ('up', 'n')
+
+    def __init__(self):
+        self.up = 0
+        self.n = 0
+
+    def on_close(self, c):
+        self.n += 1
+        if _close(c) > c.get('open', 0):
+            self.up += 1
+
+    def value(self, forming):
+        up, n = self.up, self.n
+        if forming is not None:
+            n += 1
+            if _close(forming) > forming.get('open', 0):
+                up += 1
+        return up / n if n else None
+
+
+class RateOfChange(Indicator):
+    """n개 캔들 전 종가 대비 현재 종가 변화율(%)"""
+    __slots__ = ('period', 'closes')
+
+    def __init__(self, period: int = 5):
+        self.period = period
+        self.closes: Deque[float] = deque(maxlen=period)
+
+    def on_close(self, c):
+        self.closes.append(_close(c))
+
+    def value(self, forming):
+        if forming is None or len(self.closes) < self.period:
+            return None
+        base = self.closes[0]
+        return (_close(forming) - base) / base * 100.0 if base > 0 else None
+
+
+# 이름 -> (생성자, 기간 인자 기본값). 기본값이 None인 지표는 기간 인자를 받지 않는다
+INDICATOR_TYPES: Dict[str, Tuple[Callable[..., Indicator], Optional[int]]] = {
+    'vwap': (VWAP, 480),
+    'ema': (EMA, 20),
+    'sma': (SMA, 20),
+    'ret_std': (ReturnStd, 0),
+    'atr': (ATR, 14),
+    'day_high': (DayHigh, None),
+    'day_low': (DayLow, None),
+    'up_ratio': (UpCandleRatio, None),
+    'roc': (RateOfChange, 5),
+}
+
+
+def indicator_key(name: str, period: Optional[int] = None) -> str:
+    """지표 키 정규화: ('ema', 20) -> 'ema:20', ('day_high', None) -> 'day_high'"""
+    if name not in INDICATOR_TYPES:
+        raise ValueError(f"알 수 없는 지표: {name}")
+    default = INDICATOR_TYPES[name][1]
+    if default is None:
+        return name
+    return f"{name}:{int(period if period is not None else default)}"
+
+
+def create_indicator(key: str) -> Indicator:
+    name, _, period = key.partition(':')
+    factory, default = INDICATOR_TYPES[name]
+    return factory() if default is None else factory(int(period) if period else default)
+
+
+class IndicatorRegistry:
+    """주기별로 계산할 지표 선언 목록 (전략이 시작 시 선언)"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._specs: Dict[int, FrozenSet[str]] = {}
+
+    def declare(self, interval: int, name: str, period: Optional[int] = None) -> str:
+        key = indicator_key(name, period)
+        with self._lock:
+            self._specs[interval] = self._specs.get(interval, frozenset()) | {key}
+        return key
+
+    def declare_many(self, interval: int, keys: Iterable[str]) -> None:
+        for key in keys:
+            name, _, period = key.partition(':')
+            self.declare(interval, name, int(period) if period else None)
+
+    def specs(self, interval: int) -> FrozenSet[str]:
+        return self._specs.get(interval, frozenset())
+
+
+def build_indicators(keys: Iterable[str], closed: Iterable[Mapping[str, Any]] = ()) -> Dict[str, Indicator]:
+    """지표 집합을 만들고 이미 마감된 캔들을 재생"""
+    indicators = {key: create_indicator(key) for key in keys}
+    if indicators:
+        for c in closed:
+            for ind in indicators.values():
+                ind.on_close(c)
+    return indicators
+
+
+# 전역 인스턴스
+indicator_registry = IndicatorRegistry()
@@ -0,0 +1,168 @@
+"""
+신규 구독 종목 당일 분봉 보충(intraday backfill)
+- 장중에 새로 구독한 종목은 구독 이전 캔들이 없어 이평 정렬(60봉), 마지막 30분 거래량 비중(당일 전체),
+  스윙 EMA 필터(5분봉 20개) 등이 잘못 계산된다. 구독 시 당일 1분봉을 REST로 받아 MarketCache 캔들과
+  DataLogger 1분봉에 병합한다. (완료된 분은 REST 봉으로 교체, 진행 중인 분은 실시간 틱 유지)
+- 요청은 우선순위 큐(보유 → 매수 후보 → 관심)에 쌓이고, 워커 스레드 수로 동시 처리를 제한한다.
+- 모든 워커가 하나의 속도 제한을 공유하며, 분봉 조회의 페이지(30봉) 요청마다 슬롯을 받는다.
+- 이미 장 시작부터 캔들이 있는 종목(체크포인트 복원 등)과 오늘 보충을 마친 종목은 건너뛴다.
+"""
+import heapq
+import itertools
+import threading
+from datetime import datetime, time as dt_time
+from time import monotonic, sleep
+from typing import Any, Dict, Iterable, List, Optional, Set
+
+from utils.logger import logger
+
+MARKET_OPEN = dt_time(9, 0)
+MARKET_CLOSE = dt_time(15, 30)
+
+
+class IntradayBackfiller:
+    def __init__(self, account_manager, market_cache, data_logger=None, workers: int = 2,
+                 rate_per_sec: float = 5.0, max_pages: int = 14):
+        self.account_manager = account_manager
+        self.market_cache = market_cache
+        self.data_logger = data_logger
+        self.workers = max(1, workers)
+        self.max_pages = max_pages  # 30봉/페이지, 14페이지면 09:00~15:30 전체
+        self._interval = 1.0 / rate_per_sec if rate_per_sec > 0 else 0.0
+        self._rate_lock = threading.Lock()
+        self._next_slot = 0.0
+        self._cond = threading.Condition()
+        self._heap = []
+        self._seq = itertools.count()
+        self._pending: Set[str] = set()
+        self._done: Dict[str, str] = {}  # 종목 -> 보충을 마친 세션 일자
+        self._stop_evt = threading.Event()
+        self._threads: List[threading.Thread] = []
+        self.completed = 0
+        self.skipped = 0
+        self.failed = 0
+        self.pages = 0
+        self.bars = 0
+        self.last_backfill_sec: Optional[float] = None
+
+    # ---------- 호출 측 ----------
+    def start(self):
+        if self._threads:
+            return
+        self._stop_evt.clear()
+        self._threads = [
+            threading.Thread(target=self._run, name=f"intraday-backfill-{i}", daemon=True) for i in range(self.workers)
+        ]
+        for th in self._threads:
+            th.start()
+
+    def stop(self):
+        self._stop_evt.set()
+        with self._cond:
+            self._cond.notify_all()
+        for th in self._threads:
+            th.join(timeout=2)
+        self._threads = []
+
+    def request(self, codes: Iterable[str], priority: int = 20) -> int:
+        """보충할 종목을 큐에 넣고 즉시 반환 (이미 대기 중이거나 오늘 보충을 마친 종목 제외). 넣은 종목 수 반환"""
+        session = datetime.now().strftime('%Y%m%d')
+        queued = 0
+        with self._cond:
+            for code in codes:
+                if code in self._pending or self._done.get(code) == session:
+                    continue
+                self._pending.add(code)
+                heapq.heappush(self._heap, (priority, next(self._seq), code))
+                queued += 1
+            if queued:
+                self._cond.notify(queued)
+        return queued
+
+    # ---------- 워커 ----------
+    def _throttle(self) -> None:
+        """모든 워커가 공유하는 페이지 요청 슬롯 대기"""
+        with self._rate_lock:
+            now = monotonic()
+            slot = max(now, self._next_slot)
+            self._next_slot = slot + self._interval
+        if slot > now:
+            sleep(slot - now)
+
+    def _run(self):
+        while not self._stop_evt.is_set():
+            with self._cond:
+                while not self._heap and not self._stop_evt.is_set():
+                    self._cond.wait(1.0)
+                if self._stop_evt.is_set():
+                    return
+                _, _, code = heapq.heappop(self._heap)
+            try:
+                self.backfill(code)
+            except Exception as e:
+                self.failed += 1
+                logger.error(f"[BACKFILL] {code} 당일 분봉 보충 오류: {e}", exc_info=True)
+            finally:
+                with self._cond:
+                    self._pending.discard(code)
+
+    def _is_covered(self, code: str, session_open: datetime) -> bool:
+        """장 시작 분부터 캔들이 있으면 보충 불필요"""
+        candles = self.market_cache.get_candles(code, 1)
+        return bool(candles) and candles[0]['start_ts'] < session_open.timestamp() + 60
+
+    def backfill(self, code: str) -> int:
+        """종목 1개의 당일 1분봉(장 시작 ~ 직전 분)을 받아 병합. 반영한 분봉 수 반환"""
+        now = datetime.now()
+        session = now.strftime('%Y%m%d')
+        if now.time() <= MARKET_OPEN:
+            return 0  # 장 시작 전: 받을 분봉 없음 (완료로 표시하지 않음)
+        session_open = datetime.combine(now.date(), MARKET_OPEN)
+        if self._is_covered(code, session_open):
+            self.skipped += 1
+            self._done[code] = session
+            return 0
+
+        t0 = monotonic()
+        end_time = min(now.time(), MARKET_CLOSE).strftime('%H%M%S')
+        pages = [0]
+
+        def before_page():
+            pages[0] += 1
+            self._throttle()
+
+        bars = self.account_manager.get_minute_bars(
+            code, end_time, start_time=MARKET_OPEN.strftime('%H%M%S'), max_pages=self.max_pages, before_page=before_page
+        )
+        bars = [b for b in bars if b['time'].startswith(session)]
+        self.pages += pages[0]
+        if not bars:
+            self.failed += 1
+            logger.warning(f"[BACKFILL] {code} 당일 분봉 없음 (요청 {pages[0]}페이지)")
+            return 0
+
+        n = self.market_cache.merge_minute_bars(code, bars)
+        if self.data_logger is not None:
+            self.data_logger.merge_bars(code, bars)
+        self._done[code] = session
+        self.completed += 1
+        self.bars += n
+        self.last_backfill_sec = monotonic() - t0
+        logger.info(
+            f"[BACKFILL] {code} 당일 분봉 {n}개 병합 ({bars[0]['time'][8:]}~{bars[-1]['time'][8:]}, "
+            f"{pages[0]}페이지, {self.last_backfill_sec:.1f}s)"
+        )
+        return n
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._cond:
+            queued = len(self._heap)
+        return {
+            "queued": queued,
+            "completed": self.completed,
+            "skipped": self.skipped,
+            "failed": self.failed,
+            "pages": self.pages,
+            "bars": self.bars,
+            "last_backfill_sec": self.last_backfill_sec,
+        }
@@ -1,146 +1,282 @@
 from __future__ import annotations
-from time import time
+from time import time, monotonic, sleep
 from collections import deque, defaultdict
-from typing import Deque, Dict, Tuple, Optional, List, Any
-import threading
+from typing import Deque, Dict, FrozenSet, Tuple, Optional, List, Any, Iterable
 import math
-import pandas as pd
+import numpy as np
 from datetime import datetime, timedelta
 import json
+import os
 import traceback
 
+from web_socket.order_book import OrderBookStore
+from web_socket.tick_series import TickSeries
+from web_socket.striped_lock import StripedLock
+from web_socket.bar_engine import SymbolBars, parse_bar_spec
+from web_socket.indicators import Indicator, build_indicators, create_indicator, indicator_key, indicator_registry
+from web_socket.cache_checkpoint import CANDLE_COLUMNS, QUOTE_COLUMNS, open_checkpoint, write_checkpoint
+from web_socket.market_events import (
+    EVENT_BAR_CLOSE, EVENT_QUOTE, EVENT_TICK, MarketEvent, MarketEventBus, MarketSubscription
+)
+from core.symbol_table import symbol_table, SymbolKey
+
 # 로깅 추가
 import logging
 logger = logging.getLogger(__name__)
 
 class MarketCache:
+    """
+    실시간 시세 캐시
+    - 쓰기(틱 반영/봉 병합)는 종목이 속한 스트라이프 락만 잡으므로 다른 스트라이프의 종목은 동시에 갱신된다.
+    - 읽기는 락을 잡지 않는다. 종목별 버전(seqlock)이 읽는 동안 바뀌지 않은 결과만 쓰고,
+      계속 갱신 중일 때만 스트라이프 락으로 대기한다.
+    - 조회 결과(보유/구독 데이터, 캔들 스냅샷)는 갱신 시 새 객체로 교체되는 스냅샷이므로 읽기 전용으로 다룬다.
+    - 틱 반영/시세 변경/분봉 마감을 이벤트로 발행한다 (subscribe). 구독자가 없는 종목은 발행 비용이 없다.
+    """
+    _SNAPSHOT_RETRIES = 10 # 락 없는 읽기 재시도 횟수 (초과 시 스트라이프 락 사용)
+    # 종목별 메모리 산정용 근사치 (tracemalloc 실측 기준)
+    _CANDLE_BYTES = 460   # 캔들 dict 1개 (키 7개)
+    _BAR_BYTES = 520      # 초봉/거래량봉 dict 1개 (키 9개)
+    _SYMBOL_BYTES = 4096  # 보유 데이터/마지막 틱/지표/deque 등 종목당 고정 비용
+
     def __init__(self, config, position_manager=None, account_manager=None):
-        self._lock = threading.RLock()
+        cache_config = config.get('cache', {})
+        self._locks = StripedLock(cache_config.get('lock_stripes', 16))
+        self._versions: Dict[int, int] = {} # 종목별 갱신 버전 (갱신 중 홀수)
+        self._candle_snapshots: Dict[Tuple[int, int], Tuple[int, Tuple[Dict[str, Any], ...]]] = {}
         self._MAX_WINDOW_SEC = 120
         self._MAX_POINTS = 2000
-        self._series: Dict[str, Deque[Dict[str, Any]]] = {} # 원본 틱 데이터
-        self._last: Dict[str, Dict[str, Any]] = {} # 마지막 틱 데이터
-        self._tick_count: int = 0
-        self._current_holding_data: Dict[str, Dict[str, Any]] = {} # 최신 보유/구독 종목 데이터
+        # 종목별 저장소는 심볼 테이블의 정수 ID로 키를 잡는다 (공개 메서드는 코드 문자열/ID 모두 허용)
+        self._series: Dict[int, TickSeries] = {} # 최근 틱 시계열 (필드별 NumPy 링 버퍼)
+        self._last: Dict[int, Dict[str, Any]] = {} # 마지막 틱 데이터
+        self._tick_counts: List[int] = [0] * self._locks.stripes # 스트라이프별 카운터
+        self._current_holding_data: Dict[int, Dict[str, Any]] = {} # 최신 보유/구독 종목 데이터
         self.position_manager = position_manager # 포지션 매니저 참조
         self.account_manager = account_manager
         self.config = config
 
         # 캔들 데이터 저장소
         self._candle_intervals = [1, 3, 5, 10] # 지원하는 캔들 주기 (분)
-        self._candles: Dict[str, Dict[int, Deque[Dict[str, Any]]]] = {}
-
-    def update_tick(self, code: str, data: Dict[str, Any], ts: Optional[float] = None) -> None:
+        self._candles: Dict[int, Dict[int, Deque[Dict[str, Any]]]] = {}
+        # 캔들 기반 트렌드 (3/5/10분). 캔들이 바뀔 때만 갱신해 두고 틱마다 DataFrame을 만들지 않는다
+        self._trend_intervals = (3, 5, 10)
+        self._trends: Dict[int, Dict[int, Optional[str]]] = {}
+        # 스트리밍 지표 (종목 ID, 주기) -> {지표 키: 지표}. 선언된 지표만 캔들 마감 시 O(1)로 누적
+        self._indicator_registry = indicator_registry
+        self._indicators: Dict[Tuple[int, int], Dict[str, Indicator]] = {}
+        # 분 미만 초봉 / 거래량봉 / 거래대금봉. 봉 집합을 선언한 종목만 유지 (기본 집합은 cache.bar_specs)
+        self._default_bar_specs: List[str] = list(cache_config.get('bar_specs', []))
+        for key in self._default_bar_specs:
+            parse_bar_spec(key) # 설정 오류는 시작 시 드러나게
+        self._max_fine_bars = cache_config.get('max_fine_bars', 600)
+        self._bars: Dict[int, SymbolBars] = {}
+
+        # 실시간 10단계 호가창 (H0STASP0). 오래된 호가창은 스프레드/최우선 호가 계산에 쓰지 않음
+        self.order_books = OrderBookStore()
+        self._book_max_age = cache_config.get('book_max_age_sec', 10)
+
+        # 메모리 예산: 예산을 넘으면 구독·보유하지 않는 종목을 마지막 틱이 오래된 순(LRU)으로 내보낸다 (0이면 무제한)
+        # spill_dir을 지정하면 내보낸 종목을 체크포인트 형식으로 보관했다가 다시 구독할 때 복원한다
+        self._memory_budget = int(float(cache_config.get('memory_budget_mb', 256)) * 1024 * 1024)
+        self._spill_dir: Optional[str] = cache_config.get('spill_dir') or None
+        self._retained: Optional[FrozenSet[int]] = None # set_retained 전에는 내보내지 않음
+        self._evicted = 0
+        self._spilled = 0
+        self._reloaded = 0
+        if self._spill_dir:
+            self._purge_stale_spills()
+
+        # 시세 이벤트 버스 (틱 반영 / 시세 변경 / 분봉 마감). 실시간 틱 경로에서만 발행하고 REST 병합·로드는 발행하지 않음
+        self.events = MarketEventBus()
+
+    def update_tick(self, code: SymbolKey, data: Dict[str, Any], ts: Optional[float] = None) -> None:
         """
         WebSocket 수신 틱을 캐시에 반영하고 캔들 업데이트 트리거
         """
-        if not code:
+        if code is None or code == '':
             return
         t = ts or time()
-        with self._lock:
-            dq = self._series.get(code)
-            if dq is None:
-                dq = deque()
-                self._series[code] = dq
-            
-            data['timestamp'] = t
-            dq.append(data)
-            self._last[code] = data
-            
-            # 윈도우/용량 정리
-            cutoff = t - self._MAX_WINDOW_SEC
-            while dq and dq[0]['timestamp'] < cutoff:
-                dq.popleft()
-            while len(dq) > self._MAX_POINTS:
-                dq.popleft()
-            
-            # 카운터
-            self._tick_count += 1
-            
-            # 최신 보유/구독 종목 데이터 업데이트
-            self._update_current_holding_data(code, data)
+        sid = symbol_table.intern(code)
+        lock = self._locks.acquire(sid)
+        try:
+            self._apply_tick(sid, data, t)
+        finally:
+            lock.release()
 
-            # 캔들 업데이트 트리거
-            self._update_candles(code, data)
+    def update_ticks(self, records: Iterable[Tuple[SymbolKey, Dict[str, Any]]], ts: Optional[float] = None) -> None:
+        """
+        한 프레임에 담긴 여러 건의 (종목 ID 또는 코드, data) 틱을 일괄 반영
+        - 레코드를 스트라이프별로 묶어 스트라이프 락은 프레임당 한 번씩만 잡는다. (같은 종목 레코드 순서는 유지)
+        """
+        t = ts or time()
+        intern = symbol_table.intern
+        stripes = self._locks.stripes
+        groups: Dict[int, List[Tuple[int, Dict[str, Any]]]] = {}
+        for code, data in records:
+            if code is not None and code != '':
+                sid = intern(code)
+                group = groups.get(sid % stripes)
+                if group is None:
+                    groups[sid % stripes] = [(sid, data)]
+                else:
+                    group.append((sid, data))
+        acquire = self._locks.acquire
+        for group in groups.values():
+            lock = acquire(group[0][0])
+            try:
+                for sid, data in group:
+                    self._apply_tick(sid, data, t)
+            finally:
+                lock.release()
+
+    def update_book(self, code: str, fields: List[str], ts: Optional[float] = None) -> None:
+        """H0STASP0 호가 레코드(필드 리스트)를 호가창에 반영"""
+        if code:
+            self.order_books.apply_fields(code, fields, ts)
 
-    def _update_current_holding_data(self, code: str, latest_data: Dict[str, Any]):
+    @staticmethod
+    def _sid(code: SymbolKey) -> Optional[int]:
+        """조회용 종목 ID (캐시에 없는 종목이면 None)"""
+        return symbol_table.lookup(code)
+
+    def _apply_tick(self, sid: int, data: Dict[str, Any], t: float) -> None:
+        """종목의 스트라이프 락을 보유한 상태에서 틱 1건을 반영 (update_tick/update_ticks 공용)"""
+        self._versions[sid] = self._versions.get(sid, 0) + 1 # 갱신 시작 (홀수)
+        prev = self._current_holding_data.get(sid)
+        try:
+            self._apply_tick_locked(sid, data, t)
+        finally:
+            self._versions[sid] += 1 # 갱신 완료 (짝수)
+        # 버전이 짝수가 된 뒤 발행하므로 구독자가 곧바로 조회해도 대기하지 않는다
+        events = self.events
+        tick_targets = events.targets(EVENT_TICK, sid)
+        quote_targets = events.targets(EVENT_QUOTE, sid)
+        if tick_targets or quote_targets:
+            holding = self._current_holding_data[sid]
+            if tick_targets:
+                events.publish(tick_targets, MarketEvent(EVENT_TICK, sid, holding['code'], t, 0, holding))
+            if quote_targets and (prev is None or prev['price'] != holding['price']
+                                  or prev['ask_price'] != holding['ask_price'] or prev['bid_price'] != holding['bid_price']):
+                events.publish(quote_targets, MarketEvent(EVENT_QUOTE, sid, holding['code'], t, 0, holding))
+
+    def _apply_tick_locked(self, sid: int, data: Dict[str, Any], t: float) -> None:
+        series = self._series.get(sid)
+        if series is None:
+            series = self._series[sid] = TickSeries(self._MAX_POINTS, self._MAX_WINDOW_SEC)
+
+        data['timestamp'] = t
+        data['apply_ts'] = monotonic() # 캐시 반영 시각 (지연 추적용)
+        series.append(t, data) # 윈도우/용량 정리 포함
+        prev = self._last.get(sid)
+        if prev is not None and prev is not data and hasattr(prev, 'release'):
+            prev.release() # 최신 틱만 원본(cold 필드)을 유지
+        self._last[sid] = data
+
+        # 카운터
+        self._tick_counts[sid % self._locks.stripes] += 1
+
+        # 최신 보유/구독 종목 데이터 업데이트
+        self._update_current_holding_data(sid, data)
+
+        # 캔들 업데이트 트리거
+        self._update_candles(sid, data)
+
+        # 초봉/거래량봉 (선언한 종목만)
+        bars = self._bars.get(sid)
+        if bars is None and self._default_bar_specs:
+            bars = self._bars[sid] = SymbolBars(self._default_bar_specs, self._max_fine_bars)
+        if bars is not None:
+            bars.on_tick(t, data['price'], data.get('exec_vol', 0) or 0)
+
+    def _update_current_holding_data(self, sid: int, latest_data: Dict[str, Any]):
         """
         보유/구독 종목의 최신 가격, 손익률, 트렌드(상승/하락/횡보) 등을 계산하여 저장
         """
-        with self._lock:
-            # 기본 데이터 업데이트
-            holding = {
-                'code': code,
-                'name': latest_data.get('name', code),
-                'price': latest_data.get('price', 0.0),
-                'change_rate': latest_data.get('change_rate', 0.0),
-                'acc_vol': latest_data.get('acc_vol', 0.0),
-                'ask_price': latest_data.get('ask_price', 0.0),
-                'bid_price': latest_data.get('bid_price', 0.0),
-                'is_holding': False,
-                'profit_rate': 0.0,
-                'buy_price': 0.0,
-                # 트렌드 정보 추가
-                'trend_3': None,
-                'trend_5': None,
-                'trend_10': None,
-            }
-
-            # 보유 종목인 경우 손익률 계산
-            if self.position_manager and code in self.position_manager.positions:
-                position = self.position_manager.positions[code]
-                buy_price = position['price']
-                current_price = latest_data.get('price', 0.0)
-                if buy_price > 0 and current_price > 0:
-                    profit_rate = ((current_price - buy_price) / buy_price) * 100
-                    holding['is_holding'] = True
-                    holding['profit_rate'] = profit_rate
-                    holding['buy_price'] = buy_price
-                else:
-                    logger.warning(f"[Cache] {code} 손익률 계산 불가: 매입가 또는 현재가 0")
+        code = symbol_table.code_of(sid)
+        # 기본 데이터 업데이트
+        holding = {
+            'code': code,
+            'sid': sid,
+            'name': latest_data.get('name', code),
+            'price': latest_data.get('price', 0.0),
+            'change_rate': latest_data.get('change_rate', 0.0),
+            'acc_vol': latest_data.get('acc_vol', 0.0),
+            'ask_price': latest_data.get('ask_price1', 0.0),
+            'bid_price': latest_data.get('bid_price1', 0.0),
+            'is_holding': False,
+            'profit_rate': 0.0,
+            'buy_price': 0.0,
+            # 트렌드 정보 추가
+            'trend_3': None,
+            'trend_5': None,
+            'trend_10': None,
+            # 지연 추적용 스탬프 (체결시각, 소켓 수신/캐시 반영 monotonic 시각)
+            'exec_time': latest_data.get('exec_time'),
+            'recv_ts': latest_data.get('recv_ts'),
+            'apply_ts': latest_data.get('apply_ts'),
+        }
+
+        # 보유 종목인 경우 손익률 계산
+        if self.position_manager and code in self.position_manager.positions:
+            position = self.position_manager.positions[code]
+            buy_price = position['price']
+            current_price = latest_data.get('price', 0.0)
+            if buy_price > 0 and current_price > 0:
+                profit_rate = ((current_price - buy_price) / buy_price) * 100
+                holding['is_holding'] = True
+                holding['profit_rate'] = profit_rate
+                holding['buy_price'] = buy_price
+            else:
+                logger.warning(f"[Cache] {code} 손익률 계산 불가: 매입가 또는 현재가 0")
 
-            # 캔들 기반 트렌드 계산 (3,5,10분)
-            for interval in [3, 5, 10]:
-                candles = self.get_candles(code, interval)
-                if len(candles) >= 2: # 최소 2개 캔들이 있어야 추세 판단 가능
-                    df = pd.DataFrame(list(candles)) # deque를 list로 변환 후 DataFrame 생성
-                    df.set_index('start_min', inplace=True)
-                    trend = self._judge_trend(df)
-                    holding[f'trend_{interval}'] = trend
+        # 캔들 기반 트렌드 (3,5,10분): 직전 틱까지의 캔들로 갱신해 둔 값
+        trends = self._trends.get(sid)
+        if trends:
+            holding['trend_3'] = trends.get(3)
+            holding['trend_5'] = trends.get(5)
+            holding['trend_10'] = trends.get(10)
 
-            self._current_holding_data[code] = holding
+        self._current_holding_data[sid] = holding
 
     @staticmethod
-    def _judge_trend(df: pd.DataFrame) -> Optional[str]:
+    def _judge_trend(start_price: float, end_price: float) -> Optional[str]:
         """
-        캔들 데이터프레임을 기반으로 트렌드를 판단합니다.
+        구간 첫 캔들 시가와 마지막 캔들 종가로 트렌드를 판단합니다.
         (상승, 하락, 횡보)
         """
-        if len(df) < 2:
-            return None
-        
-        # 간단한 시작/끝 가격 비교
-        try:
-            start_price = df['open'].iloc[0]
-            end_price = df['close'].iloc[-1]
-            
-            if start_price == 0:
-                return None
-                
-            change_rate = (end_price - start_price) / start_price
-            
-            # 변화율에 따라 트렌드 결정 (임계값은 조정 가능)
-            if change_rate > 0.005: # 0.5% 이상 상승
-                return '상승'
-            elif change_rate < -0.005: # 0.5% 이상 하락
-                return '하락'
-            else:
-                return '횡보'
-        except (IndexError, KeyError):
-            # 데이터프레임이 비어있거나 필요한 컬럼이 없는 경우
+        if start_price == 0:
             return None
 
-    def _update_candles(self, code: str, tick_data: Dict[str, Any]):
+        change_rate = (end_price - start_price) / start_price
+
+        # 변화율에 따라 트렌드 결정 (임계값은 조정 가능)
+        if change_rate > 0.005: # 0.5% 이상 상승
+            return '상승'
+        elif change_rate < -0.005: # 0.5% 이상 하락
+            return '하락'
+        else:
+            return '횡보'
+
+    def _refresh_trend(self, sid: int, interval: int, candles: Deque[Dict[str, Any]]) -> None:
+        """한 주기의 트렌드를 캔들 deque 양 끝(첫 캔들 시가, 마지막 캔들 종가)만 읽어 O(1)로 갱신"""
+        trends = self._trends.get(sid)
+        if trends is None:
+            trends = self._trends[sid] = {}
+        if len(candles) < 2: # 최소 2개 캔들이 있어야 추세 판단 가능
+            trends[interval] = None
+        else:
+            trends[interval] = self._judge_trend(candles[0]['open'], candles[-1]['close'])
+
+    def _refresh_trends(self, sid: int) -> None:
+        """캔들을 일괄 교체(병합/로드)한 뒤 전체 주기 트렌드를 다시 계산"""
+        store = self._candles.get(sid)
+        if store is None:
+            return
+        for interval in self._trend_intervals:
+            if interval in store:
+                self._refresh_trend(sid, interval, store[interval])
+
+    def _update_candles(self, sid: int, tick_data: Dict[str, Any]):
         """
         수신된 틱 데이터로 각 주기별 캔들 업데이트
         """
@@ -148,151 +284,415 @@ class MarketCache:
         price = tick_data['price']
         exec_volume = tick_data.get('exec_vol', 0) # 개별 체결량 사용
 
-        with self._lock:
-            if code not in self._candles:
+        if sid not in self._candles:
+            MAXLEN = self.config.get('cache', {}).get('max_candles_per_interval', 480)
+            self._candles[sid] = {
+                interval: deque(maxlen=MAXLEN) for interval in self._candle_intervals
+            }
+
+        trend_intervals = self._trend_intervals
+        for interval in self._candle_intervals:
+            candles_deque = self._candles[sid][interval]
+            candle_start_min = math.floor(current_time_min / interval) * interval
+
+            if not candles_deque or candles_deque[-1]['start_min'] != candle_start_min:
+                # 새 캔들 생성
+                new_candle = {
+                    'start_min': candle_start_min,
+                    'open': price,
+                    'high': price,
+                    'low': price,
+                    'close': price,
+                    'volume': exec_volume, # 체결량으로 시작
+                    'start_ts': tick_data['timestamp'] # 캔들 시작 타임스탬프
+                }
+                if candles_deque:
+                    self._close_candle(sid, interval, candles_deque, tick_data['timestamp'])
+                candles_deque.append(new_candle)
+                if interval in trend_intervals: # 캔들 교체(첫 캔들 시가가 바뀔 수 있음)
+                    self._refresh_trend(sid, interval, candles_deque)
+            else:
+                # 기존 캔들 업데이트
+                current_candle = candles_deque[-1]
+                prev_close = current_candle['close']
+                current_candle['high'] = max(current_candle['high'], price)
+                current_candle['low'] = min(current_candle['low'], price)
+                current_candle['close'] = price
+                current_candle['volume'] += exec_volume # 체결량 누적
+                if price != prev_close and interval in trend_intervals: # 종가가 바뀐 경우만
+                    self._refresh_trend(sid, interval, candles_deque)
+
+    def _close_candle(self, sid: int, interval: int, candles: Deque[Dict[str, Any]], ts: float) -> None:
+        """candles[-1]이 마감됨 (다음 캔들 추가 직전에 호출): 지표에 누적하고 봉 마감 이벤트 발행"""
+        closed = candles[-1]
+        targets = self.events.targets(EVENT_BAR_CLOSE, sid)
+        if targets:
+            self.events.publish(targets, MarketEvent(EVENT_BAR_CLOSE, sid, symbol_table.code_of(sid), ts, interval, closed))
+        indicators = self._indicators.get((sid, interval))
+        if indicators is None:
+            # 처음이면 선언된 지표를 만들고 보유 캔들(방금 마감된 것 포함)을 재생
+            self._indicators[(sid, interval)] = build_indicators(self._indicator_registry.specs(interval), candles)
+            return
+        for indicator in indicators.values():
+            indicator.on_close(closed)
+
+    def _rebuild_indicators(self, sid: int, extra: Optional[Tuple[int, str]] = None) -> None:
+        """
+        캔들을 일괄 교체(병합/로드)했거나 새 지표가 필요할 때 지표를 마감 캔들(마지막 캔들 제외)로 다시 만듦.
+        extra: 추가로 만들 (주기, 지표 키). 주면 그 주기만 다시 만든다
+        """
+        store = self._candles.get(sid)
+        if store is None:
+            return
+        for interval, candles in store.items():
+            if extra is not None and extra[0] != interval:
+                continue
+            existing = self._indicators.get((sid, interval))
+            keys = set(existing or ()) | self._indicator_registry.specs(interval)
+            if extra is not None and extra[0] == interval:
+                keys.add(extra[1])
+            if keys:
+                closed = list(candles)[:-1]
+                self._indicators[(sid, interval)] = build_indicators(keys, closed)
+
+    def merge_minute_bars(self, code: SymbolKey, bars: List[Dict[str, Any]]) -> int:
+        """
+        REST로 받은 1분봉(시간 'YYYYMMDDHHMM', OHLCV)을 캔들 저장소에 병합합니다. (끊김 구간 보충용)
+        - 완료된 분은 REST 봉이 기준: 같은 분의 실시간 캔들이 있으면 더하지 않고 교체 → 중복 집계 없음
+        - 진행 중인 현재 분은 실시간 틱이 계속 반영되므로 건드리지 않음
+        - 상위 주기(3/5/10분) 캔들은 영향받은 구간만 1분봉으로 다시 집계
+        반영한 1분봉 수를 반환합니다.
+        """
+        now_min = math.floor(time() / 60)
+        incoming = {}
+        for bar in bars:
+            try:
+                start_ts = datetime.strptime(bar['time'], '%Y%m%d%H%M').timestamp()
+            except (KeyError, ValueError):
+                continue
+            start_min = math.floor(start_ts / 60)
+            if start_min >= now_min:
+                continue
+            incoming[start_min] = {
+                'start_min': start_min,
+                'open': bar['open'], 'high': bar['high'], 'low': bar['low'], 'close': bar['close'],
+                'volume': bar['volume'],
+                'start_ts': start_ts,
+            }
+        if not incoming:
+            return 0
+
+        sid = symbol_table.intern(code)
+        lock = self._locks.acquire(sid)
+        self._versions[sid] = self._versions.get(sid, 0) + 1
+        try:
+            if sid not in self._candles:
                 MAXLEN = self.config.get('cache', {}).get('max_candles_per_interval', 480)
-                self._candles[code] = {
+                self._candles[sid] = {
                     interval: deque(maxlen=MAXLEN) for interval in self._candle_intervals
                 }
+            store = self._candles[sid]
+            one = store[1]
+            merged = {c['start_min']: c for c in one}
+            merged.update(incoming)
+            store[1] = deque((merged[k] for k in sorted(merged)), maxlen=one.maxlen)
 
             for interval in self._candle_intervals:
-                candles_deque = self._candles[code][interval]
-                candle_start_min = math.floor(current_time_min / interval) * interval
-
-                if not candles_deque or candles_deque[-1]['start_min'] != candle_start_min:
-                    # 새 캔들 생성
-                    new_candle = {
-                        'start_min': candle_start_min,
-                        'open': price,
-                        'high': price,
-                        'low': price,
-                        'close': price,
-                        'volume': exec_volume, # 체결량으로 시작
-                        'start_ts': tick_data['timestamp'] # 캔들 시작 타임스탬프
+                if interval == 1:
+                    continue
+                buckets = {m // interval * interval for m in incoming}
+                dq = store[interval]
+                by_start = {c['start_min']: c for c in dq}
+                for bucket in buckets:
+                    parts = [merged[m] for m in range(bucket, bucket + interval) if m in merged]
+                    by_start[bucket] = {
+                        'start_min': bucket,
+                        'open': parts[0]['open'],
+                        'high': max(c['high'] for c in parts),
+                        'low': min(c['low'] for c in parts),
+                        'close': parts[-1]['close'],
+                        'volume': sum(c['volume'] for c in parts),
+                        'start_ts': parts[0]['start_ts'],
                     }
-                    candles_deque.append(new_candle)
-                else:
-                    # 기존 캔들 업데이트
-                    current_candle = candles_deque[-1]
-                    current_candle['high'] = max(current_candle['high'], price)
-                    current_candle['low'] = min(current_candle['low'], price)
-                    current_candle['close'] = price
-                    current_candle['volume'] += exec_volume # 체결량 누적
+                store[interval] = deque((by_start[k] for k in sorted(by_start)), maxlen=dq.maxlen)
+            self._refresh_trends(sid)
+            self._rebuild_indicators(sid)
+        finally:
+            self._versions[sid] += 1
+            lock.release()
+        return len(incoming)
+
+    def _read_snapshot(self, sid: int, read):
+        """
+        락 없이 read()를 호출하고, 읽는 동안 종목 버전이 그대로(짝수)였을 때만 결과를 사용합니다.
+        갱신 중(수신 스레드가 갱신 도중 GIL을 넘긴 상태)이면 양보 후 다시 읽고,
+        재시도 후에도 일관된 결과를 못 얻으면 스트라이프 락을 잡고 읽습니다. (버전, 결과) 반환
+        """
+        versions = self._versions
+        for _ in range(self._SNAPSHOT_RETRIES):
+            version = versions.get(sid, 0)
+            if not version & 1:
+                try:
+                    result = read()
+                except RuntimeError: # 읽는 도중 deque 변경
+                    result = version = None
+                if version is not None and versions.get(sid, 0) == version:
+                    return version, result
+            sleep(0)
+        lock = self._locks.acquire(sid, 'reader')
+        try:
+            return versions.get(sid, 0), read()
+        finally:
+            lock.release()
 
-    def get_candles(self, code: str, interval: int) -> Deque[Dict[str, Any]]:
+    def get_candles(self, code: SymbolKey, interval: int) -> Tuple[Dict[str, Any], ...]:
         """
-        특정 종목의 특정 주기 캔들 데이터를 반환
+        특정 종목의 특정 주기 캔들 스냅샷 (오래된 순 튜플)
+        - 진행 중인 마지막 캔들만 복사하고, 마감된 캔들은 더 이상 바뀌지 않으므로 공유한다. (읽기 전용)
+        - 종목 버전이 그대로면 직전 스냅샷을 재사용한다.
         """
-        with self._lock:
-            return self._candles.get(code, {}).get(interval, deque())
+        sid = self._sid(code)
+        store = self._candles.get(sid) if sid is not None else None
+        if not store or interval not in store:
+            return ()
+        key = (sid, interval)
+        cached = self._candle_snapshots.get(key)
+        if cached is not None and cached[0] == self._versions.get(sid, 0):
+            return cached[1]
+
+        def read():
+            candles = tuple(store[interval])
+            if candles:
+                candles = candles[:-1] + (dict(candles[-1]),)
+            return candles
+
+        version, snapshot = self._read_snapshot(sid, read)
+        self._candle_snapshots[key] = (version, snapshot)
+        return snapshot
+
+    def get_candle_count(self, code: SymbolKey, interval: int) -> int:
+        """보유 중인 캔들 수 (진행 중 캔들 포함)"""
+        sid = self._sid(code)
+        store = self._candles.get(sid) if sid is not None else None
+        candles = store.get(interval) if store else None
+        return len(candles) if candles else 0
+
+    def get_indicator(self, code: SymbolKey, interval: int, name: str, period: Optional[int] = None) -> Optional[float]:
+        """
+        스트리밍 지표의 현재 값 (진행 중 캔들 포함). 캔들이 없거나 데이터가 부족하면 None
+        name: 'vwap', 'ema', 'sma', 'ret_std', 'atr', 'day_high', 'day_low', 'up_ratio', 'roc' (period는 기간)
+        선언되지 않은 지표는 처음 조회할 때 만들어 보유 캔들로 재생한다.
+        """
+        key = indicator_key(name, period)
+        sid = self._sid(code)
+        store = self._candles.get(sid) if sid is not None else None
+        if not store or not store.get(interval):
+            return None
+        if key not in self._indicators.get((sid, interval), ()):
+            lock = self._locks.acquire(sid)
+            self._versions[sid] = self._versions.get(sid, 0) + 1
+            try:
+                if key not in self._indicators.get((sid, interval), ()):
+                    self._rebuild_indicators(sid, (interval, key))
+            finally:
+                self._versions[sid] += 1
+                lock.release()
+
+        def read():
+            indicator = self._indicators.get((sid, interval), {}).get(key)
+            candles = store.get(interval)
+            if indicator is None or not candles:
+                return None
+            return indicator.value(candles[-1])
+
+        return self._read_snapshot(sid, read)[1]
+
+    def declare_bars(self, code: SymbolKey, specs: Iterable[str]) -> None:
+        """
+        종목에 분 미만 봉을 선언합니다. specs 예: ['1s', '5s', '30s', 'v:10000', 't:100000000']
+        (초봉 주기는 60의 약수, 'v:수량'은 거래량봉, 't:금액'은 거래대금봉). 선언 시점부터 쌓인다.
+        """
+        specs = list(specs)
+        for key in specs:
+            parse_bar_spec(key)
+        sid = symbol_table.intern(code)
+        lock = self._locks.acquire(sid)
+        self._versions[sid] = self._versions.get(sid, 0) + 1
+        try:
+            bars = self._bars.get(sid)
+            if bars is None:
+                self._bars[sid] = SymbolBars(self._default_bar_specs + specs, self._max_fine_bars)
+            else:
+                bars.declare(specs)
+        finally:
+            self._versions[sid] += 1
+            lock.release()
+
+    def release_bars(self, code: SymbolKey) -> None:
+        """종목의 분 미만 봉을 모두 해제 (구독 해지 등)"""
+        sid = self._sid(code)
+        if sid is not None:
+            self._bars.pop(sid, None)
+
+    def get_bars(self, code: SymbolKey, spec: str) -> Tuple[Dict[str, Any], ...]:
+        """
+        선언된 분 미만 봉 스냅샷 (오래된 순 튜플, 마지막은 진행 중 봉 복사본).
+        선언하지 않았거나 데이터가 없으면 빈 튜플
+        """
+        sid = self._sid(code)
+        bars = self._bars.get(sid) if sid is not None else None
+        if bars is None:
+            return ()
+        return self._read_snapshot(sid, lambda: bars.snapshot(spec) or ())[1]
 
-    def get_holding_data(self, code: str) -> Optional[Dict[str, Any]]:
+    def get_holding_data(self, code: SymbolKey) -> Optional[Dict[str, Any]]:
         """
-        특정 종목의 최신 보유/구독 데이터를 반환
+        특정 종목의 최신 보유/구독 데이터를 반환 (틱마다 새 dict로 교체되는 스냅샷)
         """
-        with self._lock:
-            return self._current_holding_data.get(code)
+        return self._current_holding_data.get(self._sid(code))
 
     def get_all_holding_data(self) -> List[Dict[str, Any]]:
         """
         모든 보유/구독 종목의 최신 데이터를 리스트로 반환
         """
-        with self._lock:
-            return list(self._current_holding_data.values())
+        return list(self._current_holding_data.values())
 
-    def get_recent_series(self, code: str, seconds: int = 60) -> Tuple[List[float], List[float], List[float]]:
+    def get_recent_series(self, code: SymbolKey, seconds: int = 60) -> Tuple[List[float], List[float], List[float]]:
         """
         최근 seconds초 구간의 (ts[], price[], vol[]) 반환
         """
-        now_t = time()
-        cutoff = now_t - max(1, seconds)
-        with self._lock:
-            dq = self._series.get(code)
-            if not dq:
-                return [], [], []
-            ts: List[float] = []
-            px: List[float] = []
-            vol: List[float] = []
-            for item in dq:
-                if item['timestamp'] >= cutoff:
-                    ts.append(item['timestamp']); px.append(item['price']); vol.append(item.get('exec_vol', 0.0))
-            return ts, px, vol
-
-    def get_recent_momentums(self, code: str, count: int = 5, interval: int = 1) -> List[float]:
+        cols = self.get_recent_arrays(code, seconds, ('timestamp', 'price', 'exec_vol'))
+        if not cols:
+            return [], [], []
+        return cols['timestamp'].tolist(), cols['price'].tolist(), cols['exec_vol'].tolist()
+
+    def get_recent_arrays(self, code: SymbolKey, seconds: int = 60, fields: Optional[Iterable[str]] = None,
+                          copy: bool = True) -> Dict[str, np.ndarray]:
+        """
+        최근 seconds초 구간의 틱을 필드별 NumPy 배열로 반환 (벡터 연산용, 종목이 없으면 빈 dict)
+        - fields: TickSeries 보관 필드 중 일부 (기본: 전체)
+        - copy=False면 복사 없는 읽기 전용 view를 반환한다. 수신 스레드가 계속 덮어쓰므로 받은 즉시 사용할 것
+        """
+        cutoff = time() - max(1, seconds)
+        sid = self._sid(code)
+        series = self._series.get(sid) if sid is not None else None
+        if not series:
+            return {}
+        return self._read_snapshot(sid, lambda: series.window(cutoff, fields, copy))[1]
+
+    def get_recent_momentums(self, code: SymbolKey, count: int = 5, interval: int = 1) -> List[float]:
         """
         최근 N개의 1분봉 모멘텀(종가 기준)을 리스트로 반환합니다.
         """
-        with self._lock:
-            candles = self.get_candles(code, interval) # 1분봉 캔들
-            if len(candles) < 2:
-                return []
-            
-            recent_candles = list(candles)[-(count+1):]
-            
-            momentums = []
-            for i in range(1, len(recent_candles)):
-                prev_close = recent_candles[i-1]['close']
-                curr_close = recent_candles[i]['close']
-                if prev_close > 0:
-                    momentum = (curr_close - prev_close) / prev_close * 100
-                    momentums.append(momentum)
-            return momentums
-
-    def get_last(self, code: str) -> Optional[Dict[str, Any]]:
+        candles = self.get_candles(code, interval) # 1분봉 캔들
+        if len(candles) < 2:
+            return []
+        
+        recent_candles = list(candles)[-(count+1):]
+        
+        momentums = []
+        for i in range(1, len(recent_candles)):
+            prev_close = recent_candles[i-1]['close']
+            curr_close = recent_candles[i]['close']
+            if prev_close > 0:
+                momentum = (curr_close - prev_close) / prev_close * 100
+                momentums.append(momentum)
+        return momentums
+
+    def get_last(self, code: SymbolKey) -> Optional[Dict[str, Any]]:
         return self.get_quote_full(code)
 
-    def get_quote(self, code: str) -> Optional[float]:
-        with self._lock:
-            v = self.get_quote_full(code)
-            return v.get('price') if v else None
+    def get_quote(self, code: SymbolKey) -> Optional[float]:
+        v = self.get_quote_full(code)
+        return v.get('price') if v else None
 
-    def get_quote_full(self, code: str) -> Optional[Dict[str, Any]]:
-        with self._lock:
-            return self._current_holding_data.get(code)
+    def get_quote_full(self, code: SymbolKey) -> Optional[Dict[str, Any]]:
+        return self._current_holding_data.get(self._sid(code))
 
     def reset_cache(self) -> None:
-        with self._lock:
+        self._locks.acquire_all()
+        try:
             self._series.clear()
             self._last.clear()
             self._current_holding_data.clear()
-            self._tick_count = 0
+            self._trends.clear()
+            self._candle_snapshots.clear()
+            self._indicators.clear()
+            self._bars.clear()
+            self._tick_counts = [0] * self._locks.stripes
+            self.order_books.clear()
             for interval_deque in self._candles.values():
                 for dq in interval_deque.values():
                     dq.clear()
-
-    def get_stats(self) -> Dict[str, int]:
-        with self._lock:
-            return {
-                "codes": len(self._series),
-                "last_count": len(self._last),
-                "tick_count": self._tick_count,
-            }
-
-    def get_daily_vwap(self, code: str) -> float:
-        """지정된 종목의 일일 VWAP(거래량 가중 평균 가격)을 계산합니다."""
-        with self._lock:
-            candles = self.get_candles(code, 1) # 1분봉 기준
-            if not candles:
-                return 0.0
-            
-            total_pv = sum(c.get('close', 0) * c.get('volume', 0) for c in candles)
-            total_vol = sum(c.get('volume', 0) for c in candles)
-            
-            return total_pv / total_vol if total_vol > 0 else 0.0
-
-    def get_spread_pct(self, code: str) -> float:
+            for sid in self._versions: # 버전은 계속 증가시켜 이전 스냅샷이 재사용되지 않게 함
+                self._versions[sid] += 2
+        finally:
+            self._locks.release_all()
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "codes": len(self._series),
+            "last_count": len(self._last),
+            "tick_count": sum(self._tick_counts),
+            "memory": {
+                "bytes": sum(self._symbol_nbytes(sid) for sid in self._known_sids()),
+                "budget": self._memory_budget,
+                "evicted": self._evicted,
+                "spilled": self._spilled,
+                "reloaded": self._reloaded,
+            },
+            "locks": self._locks.get_stats(), # 역할별(writer/reader) 락 경합/대기 시간
+            "events": self.events.get_stats(), # 구독자별 대기/전달/버린 이벤트 수
+        }
+
+    def subscribe(self, name: str, kinds: Iterable[str] = (EVENT_TICK, EVENT_QUOTE, EVENT_BAR_CLOSE),
+                  codes: Optional[Iterable[SymbolKey]] = None, intervals: Optional[Iterable[int]] = None,
+                  maxlen: int = 1024) -> MarketSubscription:
+        """
+        시세 이벤트 구독. codes=None이면 전체 종목, 빈 집합이면 set_codes()로 지정할 때까지 받지 않음.
+        이벤트는 수신 스레드에서 구독자 큐에 넣기만 하므로, 구독자는 자기 스레드에서 get()/drain()으로 꺼내 처리한다.
+        """
+        return self.events.subscribe(name, kinds, codes, intervals, maxlen)
+
+    def unsubscribe(self, subscription: MarketSubscription) -> None:
+        self.events.unsubscribe(subscription)
+
+    def get_daily_vwap(self, code: SymbolKey) -> float:
+        """지정된 종목의 일일 VWAP(거래량 가중 평균 가격)을 계산합니다. (보관 중인 1분봉 범위의 스트리밍 지표, O(1))"""
+        window = self.config.get('cache', {}).get('max_candles_per_interval', 480)
+        return self.get_indicator(code, 1, 'vwap', window) or 0.0
+
+    def get_best_ask(self, code: SymbolKey) -> float:
+        """최우선 매도호가. 실시간 호가창이 있으면 사용하고, 없으면 체결 틱의 매도호가1로 대체"""
+        quote = self.order_books.best_bid_ask(symbol_table.normalize(code), self._book_max_age)
+        if quote:
+            return quote[1]
+        quote_info = self.get_quote_full(code)
+        return quote_info.get('ask_price', 0.0) if quote_info else 0.0
+
+    def get_best_bid(self, code: SymbolKey) -> float:
+        """최우선 매수호가. 실시간 호가창이 있으면 사용하고, 없으면 체결 틱의 매수호가1로 대체"""
+        quote = self.order_books.best_bid_ask(symbol_table.normalize(code), self._book_max_age)
+        if quote:
+            return quote[0]
+        quote_info = self.get_quote_full(code)
+        return quote_info.get('bid_price', 0.0) if quote_info else 0.0
+
+    def get_spread_pct(self, code: SymbolKey) -> float:
         """최신 호가를 기반으로 호가 스프레드 비율(%)을 계산합니다."""
-        with self._lock:
-            quote_info = self.get_quote_full(code)
-            if not quote_info:
-                return 10.0 # 정보 없으면 높은 페널티
-            
-            ask = quote_info.get('ask_price', 0)
-            bid = quote_info.get('bid_price', 0)
-            
-            if ask > 0 and bid > 0:
-                return ((ask - bid) / bid) * 100
-            return 10.0
+        spread = self.order_books.spread_pct(symbol_table.normalize(code), self._book_max_age)
+        if spread is not None:
+            return spread
+        quote_info = self.get_quote_full(code)
+        if not quote_info:
+            return 10.0 # 정보 없으면 높은 페널티
+        
+        ask = quote_info.get('ask_price', 0)
+        bid = quote_info.get('bid_price', 0)
+        
+        if ask > 0 and bid > 0:
+            return ((ask - bid) / bid) * 100
+        return 10.0
         
     def load_historical_data(self, file_path: str) -> None:
         """
@@ -346,17 +746,24 @@ class MarketCache:
                 logger.error(f"[MarketCache] Historical candle file has unexpected format: {file_path}")
                 return
 
-            with self._lock:
-                for code, candles_list in items_to_process:
-                    if not isinstance(candles_list, list):
-                        continue
-                    
-                    if code not in self._candles:
-                        self._candles[code] = {
+            for code, candles_list in items_to_process:
+                if not isinstance(candles_list, list):
+                    continue
+                sid = symbol_table.intern(code)
+                lock = self._locks.acquire(sid)
+                self._versions[sid] = self._versions.get(sid, 0) + 1
+                try:
+                    if sid not in self._candles:
+                        self._candles[sid] = {
                             interval: deque(maxlen=MAXLEN) for interval in self._candle_intervals
                         }
-                    
-                    self._candles[code][1] = deque(candles_list, maxlen=MAXLEN)
+
+                    self._candles[sid][1] = deque(candles_list, maxlen=MAXLEN)
+                    self._refresh_trends(sid)
+                    self._rebuild_indicators(sid)
+                finally:
+                    self._versions[sid] += 1
+                    lock.release()
 
             logger.info(f"[MarketCache] Finished loading historical 1-min candles for {len(items_to_process)} codes.")
 
@@ -368,6 +775,238 @@ class MarketCache:
             logger.error(f"[MarketCache] An unexpected error occurred while loading historical candles: {e}")
             logger.error(traceback.format_exc())
 
+    def _collect_checkpoint(self, sids: Iterable[int]) -> Tuple[List[str], List[str], np.ndarray, np.ndarray, Dict[str, Any]]:
+        """체크포인트 기록용 (코드, 종목명, 캔들 행, 시세 행, 지표 상태). 종목마다 락 없이 일관된 스냅샷을 읽는다"""
+        candle_fields = CANDLE_COLUMNS[2:]
+        codes: List[str] = []
+        names: List[str] = []
+        candle_rows: List[Tuple[float, ...]] = []
+        quote_rows: List[Tuple[float, ...]] = []
+        indicator_states: Dict[str, Any] = {}
+        for sid in sids:
+            def read():
+                rows = []
+                for interval, candles in (self._candles.get(sid) or {}).items():
+                    rows.extend((interval,) + tuple(c[f] for f in candle_fields) for c in candles)
+                states = {}
+                for interval in self._candle_intervals:
+                    indicators = self._indicators.get((sid, interval))
+                    if indicators:
+                        states[interval] = {key: ind.get_state() for key, ind in indicators.items()}
+                holding = self._current_holding_data.get(sid)
+                series = self._series.get(sid)
+                last_ts = series.last('timestamp') if series is not None else None
+                return rows, states, holding, last_ts
+            _, (rows, states, holding, last_ts) = self._read_snapshot(sid, read)
+            idx = len(codes)
+            codes.append(symbol_table.code_of(sid))
+            names.append(holding.get('name', '') if holding else '')
+            candle_rows.extend((idx,) + row for row in rows)
+            if states:
+                indicator_states[str(idx)] = states
+            if holding:
+                quote_rows.append((idx, holding['price'], holding['change_rate'], holding['acc_vol'],
+                                   holding['ask_price'], holding['bid_price'], last_ts or 0.0))
+        return (codes, names, np.array(candle_rows, dtype=np.float64),
+                np.array(quote_rows, dtype=np.float64), indicator_states)
+
+    def _restore_checkpoint(self, checkpoint) -> int:
+        """열어 둔 체크포인트의 종목을 복원 (이미 실시간 틱을 받은 종목은 건너뜀). 복원한 종목 수 반환"""
+        meta = checkpoint.meta
+        codes, names = meta['codes'], meta['names']
+        indicator_states = meta.get('indicators', {})
+        candle_fields = CANDLE_COLUMNS[2:]
+        by_code: Dict[int, Dict[int, List[Dict[str, Any]]]] = defaultdict(lambda: defaultdict(list))
+        for row in checkpoint.candles.tolist(): # 종목/주기/시작 분 순으로 기록됨
+            candle = dict(zip(candle_fields, row[2:]))
+            candle['start_min'] = int(candle['start_min'])
+            by_code[int(row[0])][int(row[1])].append(candle)
+        quotes = {int(row[0]): dict(zip(QUOTE_COLUMNS[1:], row[1:])) for row in checkpoint.quotes.tolist()}
+
+        MAXLEN = self.config.get('cache', {}).get('max_candles_per_interval', 480)
+        restored = 0
+        for idx, code in enumerate(codes):
+            sid = symbol_table.intern(code)
+            lock = self._locks.acquire(sid)
+            try:
+                if sid in self._series: # 복원 전에 실시간 틱이 들어온 종목
+                    continue
+                self._versions[sid] = self._versions.get(sid, 0) + 1
+                try:
+                    stored = by_code.get(idx, {})
+                    self._candles[sid] = {
+                        interval: deque(stored.get(interval, ()), maxlen=MAXLEN) for interval in self._candle_intervals
+                    }
+                    for interval, states in indicator_states.get(str(idx), {}).items():
+                        indicators = {}
+                        for key, state in states.items():
+                            indicators[key] = create_indicator(key)
+                            indicators[key].set_state(state)
+                        self._indicators[(sid, int(interval))] = indicators
+                    self._refresh_trends(sid)
+                    quote = quotes.get(idx)
+                    if quote:
+                        quote['name'] = names[idx] or code
+                        self._update_current_holding_data(sid, quote)
+                finally:
+                    self._versions[sid] += 1
+                restored += 1
+            finally:
+                lock.release()
+        return restored
+
+    def _known_sids(self) -> set:
+        return self._series.keys() | self._candles.keys() | self._current_holding_data.keys()
+
+    def _symbol_nbytes(self, sid: int) -> int:
+        """종목 1개의 캐시 메모리 근사치 (바이트)"""
+        n = self._SYMBOL_BYTES
+        series = self._series.get(sid)
+        if series is not None:
+            n += series.nbytes
+        candles = self._candles.get(sid)
+        if candles:
+            n += sum(len(dq) for dq in candles.values()) * self._CANDLE_BYTES
+        bars = self._bars.get(sid)
+        if bars is not None:
+            n += bars.bar_count() * self._BAR_BYTES
+        return n
+
+    def set_retained(self, codes: Iterable[SymbolKey]) -> None:
+        """
+        구독 중인 종목 집합 지정 (구독 변경 시 호출). 이 집합에도 보유 포지션에도 없는 종목만 내보낼 수 있다.
+        디스크에 내보냈던 종목이 다시 들어오면 복원한 뒤 메모리 예산을 맞춘다.
+        """
+        retained = frozenset(symbol_table.intern(c) for c in codes)
+        added = retained - (self._retained or frozenset())
+        self._retained = retained
+        if self._spill_dir:
+            for sid in added:
+                self._reload_spilled(sid)
+        self.enforce_memory_budget()
+
+    def _is_evictable(self, sid: int) -> bool:
+        if self._retained is None or sid in self._retained:
+            return False
+        return not (self.position_manager and symbol_table.code_of(sid) in self.position_manager.positions)
+
+    def enforce_memory_budget(self) -> int:
+        """예산을 넘었으면 내보낼 수 있는 종목을 마지막 틱이 오래된 순으로 내보냄. 내보낸 종목 수 반환"""
+        if self._retained is None or self._memory_budget <= 0:
+            return 0
+        sizes = {sid: self._symbol_nbytes(sid) for sid in self._known_sids()}
+        total = sum(sizes.values())
+        if total <= self._memory_budget:
+            return 0
+
+        def last_tick(sid):
+            series = self._series.get(sid)
+            return (series.last('timestamp') if series is not None else None) or 0.0
+
+        evicted = 0
+        for sid in sorted((sid for sid in sizes if self._is_evictable(sid)), key=last_tick):
+            if total <= self._memory_budget:
+                break
+            self._evict(sid)
+            total -= sizes[sid]
+            evicted += 1
+        if total > self._memory_budget:
+            logger.warning(f"[MarketCache] 구독/보유 종목만으로 메모리 예산 초과: {total / 2**20:.1f}MB > {self._memory_budget / 2**20:.1f}MB")
+        if evicted:
+            logger.info(f"[MarketCache] 메모리 예산 초과로 {evicted}종목 내보냄 (현재 {total / 2**20:.1f}MB)")
+        return evicted
+
+    def _spill_path(self, sid: int) -> str:
+        return os.path.join(self._spill_dir, f"{symbol_table.code_of(sid)}.ckpt")
+
+    def _evict(self, sid: int) -> None:
+        """종목의 캐시 데이터를 모두 제거 (spill_dir이 있으면 먼저 디스크에 기록)"""
+        if self._spill_dir and sid in self._candles:
+            try:
+                codes, names, candles, quotes, states = self._collect_checkpoint([sid])
+                write_checkpoint(self._spill_path(sid), datetime.now().strftime('%Y%m%d'), codes, names, candles, quotes, states)
+                self._spilled += 1
+            except OSError as e:
+                logger.warning(f"[MarketCache] {symbol_table.code_of(sid)} 디스크 보관 실패, 메모리에서만 제거: {e}")
+        lock = self._locks.acquire(sid)
+        self._versions[sid] = self._versions.get(sid, 0) + 1
+        try:
+            self._series.pop(sid, None)
+            self._last.pop(sid, None)
+            self._current_holding_data.pop(sid, None)
+            self._candles.pop(sid, None)
+            self._trends.pop(sid, None)
+            self._bars.pop(sid, None)
+            for interval in self._candle_intervals:
+                self._indicators.pop((sid, interval), None)
+                self._candle_snapshots.pop((sid, interval), None)
+        finally:
+            self._versions[sid] += 1
+            lock.release()
+        self.order_books.discard(symbol_table.code_of(sid))
+        self._evicted += 1
+
+    def _reload_spilled(self, sid: int) -> bool:
+        """디스크에 내보낸 오늘 세션 데이터가 있으면 복원하고 파일 삭제"""
+        path = self._spill_path(sid)
+        checkpoint = open_checkpoint(path)
+        if checkpoint is None:
+            return False
+        restored = 0
+        if checkpoint.meta.get('session') == datetime.now().strftime('%Y%m%d'):
+            restored = self._restore_checkpoint(checkpoint)
+        del checkpoint # memmap을 닫아야 파일을 지울 수 있음 (Windows)
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+        self._reloaded += restored
+        return restored > 0
+
+    def _purge_stale_spills(self) -> None:
+        """지난 세션에 내보낸 파일 정리"""
+        if not os.path.isdir(self._spill_dir):
+            return
+        today = datetime.now().date()
+        for name in os.listdir(self._spill_dir):
+            path = os.path.join(self._spill_dir, name)
+            try:
+                if name.endswith('.ckpt') and datetime.fromtimestamp(os.path.getmtime(path)).date() != today:
+                    os.remove(path)
+            except OSError:
+                pass
+
+    def save_checkpoint(self, path: str) -> int:
+        """
+        캔들(전 주기), 지표 누적 상태, 최근 시세를 체크포인트 파일로 기록 (장중 재시작 복원용). 기록한 종목 수 반환
+        종목마다 락 없이 일관된 스냅샷을 읽으므로 수신 스레드를 막지 않는다.
+        """
+        codes, names, candles, quotes, indicator_states = self._collect_checkpoint(
+            list(self._candles.keys() | self._current_holding_data.keys()))
+        session = datetime.now().strftime('%Y%m%d')
+        size = write_checkpoint(path, session, codes, names, candles, quotes, indicator_states)
+        logger.debug(f"[MarketCache] 체크포인트 기록: {len(codes)}종목, 캔들 {len(candles)}개, {size:,}B -> {path}")
+        return len(codes)
+
+    def restore_checkpoint(self, path: str) -> int:
+        """
+        오늘 세션의 체크포인트로 캔들/지표/트렌드/최근 시세를 복원 (REST 보충 없이 장중 재시작).
+        이미 실시간 틱을 받은 종목은 건드리지 않는다. 복원한 종목 수 반환
+        """
+        checkpoint = open_checkpoint(path)
+        if checkpoint is None:
+            logger.info(f"[MarketCache] 체크포인트 없음: {path}")
+            return 0
+        meta = checkpoint.meta
+        if meta.get('session') != datetime.now().strftime('%Y%m%d'):
+            logger.info(f"[MarketCache] 지난 세션({meta.get('session')}) 체크포인트는 복원하지 않습니다: {path}")
+            return 0
+        t0 = monotonic()
+        restored = self._restore_checkpoint(checkpoint)
+        logger.info(f"[MarketCache] 체크포인트 복원: {restored}종목, 캔들 {len(checkpoint.candles)}개 "
+                    f"({(monotonic() - t0) * 1000:.1f}ms, 기록 시각 {datetime.fromtimestamp(meta['written_at']):%H:%M:%S})")
+        return restored
+
 # 전역 인스턴스
 market_cache = None
 
@@ -0,0 +1,179 @@
+"""
+MarketCache 시세 이벤트 버스
+- MarketCache가 틱 반영(EVENT_TICK), 최우선 시세 변경(EVENT_QUOTE: 현재가/매도호가1/매수호가1 중 하나라도 바뀜),
+  분봉 마감(EVENT_BAR_CLOSE, 주기별)을 발행하고, 구독자는 각자의 제한 큐에서 꺼내 처리한다.
+- 구독자마다 이벤트 종류, 종목(코드 집합 또는 전체), 분봉 주기 필터를 둔다.
+  라우팅 표는 구독/필터 변경 시에만 새로 만들어 교체하므로(copy-on-write) 발행 측은 락 없이
+  dict 조회 1번으로 대상 구독자를 찾고, 구독자가 없는 종목은 이벤트 객체도 만들지 않는다.
+- 큐가 가득 차면 가장 오래된 이벤트를 버리고 dropped를 늘린다. (느린 구독자가 수신 스레드를 막지 않음)
+- 이벤트의 data는 캐시가 갱신 시 새 객체로 교체하는 스냅샷(보유 데이터/마감 캔들)이므로 읽기 전용으로 다룬다.
+"""
+import threading
+import time
+from collections import deque
+from typing import Any, Deque, Dict, FrozenSet, Iterable, List, Mapping, NamedTuple, Optional, Tuple
+
+from core.symbol_table import symbol_table, SymbolKey
+
+EVENT_TICK = 'tick'
+EVENT_QUOTE = 'quote'
+EVENT_BAR_CLOSE = 'bar_close'
+EVENT_KINDS: Tuple[str, ...] = (EVENT_TICK, EVENT_QUOTE, EVENT_BAR_CLOSE)
+
+
+class MarketEvent(NamedTuple):
+    kind: str                  # EVENT_TICK / EVENT_QUOTE / EVENT_BAR_CLOSE
+    sid: int                   # 심볼 테이블 종목 ID
+    code: str                  # 종목코드
+    ts: float                  # 틱 타임스탬프 (봉 마감은 마감을 일으킨 틱의 시각)
+    interval: int              # 봉 마감: 분봉 주기, 그 외 0
+    data: Mapping[str, Any]    # 틱/시세: get_quote_full()과 같은 보유 데이터, 봉 마감: 마감된 캔들
+
+
+class MarketSubscription:
+    """구독자 1개의 제한 큐와 필터 (MarketEventBus.subscribe로 생성)"""
+
+    def __init__(self, bus: "MarketEventBus", name: str, kinds: FrozenSet[str],
+                 sids: Optional[FrozenSet[int]], intervals: Optional[FrozenSet[int]], maxlen: int):
+        self.name = name
+        self.kinds = kinds
+        self.sids = sids                # None이면 전체 종목
+        self.intervals = intervals      # 봉 마감 주기 필터 (None이면 전체)
+        self._bus = bus
+        self._cond = threading.Condition()
+        self._queue: Deque[MarketEvent] = deque()
+        self._maxlen = max(1, maxlen)
+        self.delivered = 0
+        self.dropped = 0
+        self.closed = False
+
+    def _push(self, event: MarketEvent) -> None:
+        if event.kind == EVENT_BAR_CLOSE and self.intervals is not None and event.interval not in self.intervals:
+            return
+        with self._cond:
+            if len(self._queue) >= self._maxlen:
+                self._queue.popleft()
+                self.dropped += 1
+            self._queue.append(event)
+            self.delivered += 1
+            self._cond.notify()
+
+    def get(self, timeout: Optional[float] = None) -> Optional[MarketEvent]:
+        """이벤트 1건 (timeout 동안 없으면 None)"""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._cond:
+            while not self._queue and not self.closed:
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return None
+                self._cond.wait(remaining)
+            return self._queue.popleft() if self._queue else None
+
+    def drain(self, timeout: Optional[float] = 0) -> List[MarketEvent]:
+        """쌓인 이벤트를 모두 꺼냄. 비어 있으면 timeout 동안 첫 이벤트를 기다린다 (시간 초과 시 빈 리스트)"""
+        first = self.get(timeout) if timeout != 0 else None
+        with self._cond:
+            events = list(self._queue)
+            self._queue.clear()
+        return [first] + events if first is not None else events
+
+    def set_codes(self, codes: Optional[Iterable[SymbolKey]]) -> None:
+        """종목 필터 교체 (None이면 전체 종목). 같은 집합이면 아무것도 하지 않는다"""
+        sids = None if codes is None else frozenset(symbol_table.intern(c) for c in codes)
+        if sids != self.sids:
+            self._bus._set_filter(self, sids)
+
+    def close(self) -> None:
+        self._bus.unsubscribe(self)
+
+    def pending(self) -> int:
+        return len(self._queue)
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "kinds": sorted(self.kinds),
+            "codes": None if self.sids is None else len(self.sids),
+            "pending": len(self._queue),
+            "delivered": self.delivered,
+            "dropped": self.dropped,
+        }
+
+
+class MarketEventBus:
+    """종류·종목별 라우팅 표를 가진 구독자 목록"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._subs: List[MarketSubscription] = []
+        # 종류 -> {종목 ID: 구독자 튜플}. 전체 종목 구독자는 모든 항목과 _any에 함께 들어 있다
+        self._routes: Dict[str, Dict[int, Tuple[MarketSubscription, ...]]] = {kind: {} for kind in EVENT_KINDS}
+        self._any: Dict[str, Tuple[MarketSubscription, ...]] = {kind: () for kind in EVENT_KINDS}
+
+    def subscribe(self, name: str, kinds: Iterable[str] = EVENT_KINDS, codes: Optional[Iterable[SymbolKey]] = None,
+                  intervals: Optional[Iterable[int]] = None, maxlen: int = 1024) -> MarketSubscription:
+        """
+        구독 등록. codes=None이면 전체 종목, 빈 집합이면 set_codes()로 지정할 때까지 받지 않음.
+        intervals는 EVENT_BAR_CLOSE를 받을 분봉 주기 (None이면 전체)
+        """
+        kinds = frozenset(kinds)
+        unknown = kinds - set(EVENT_KINDS)
+        if unknown:
+            raise ValueError(f"알 수 없는 이벤트 종류: {sorted(unknown)}")
+        sids = None if codes is None else frozenset(symbol_table.intern(c) for c in codes)
+        sub = MarketSubscription(self, name, kinds, sids, None if intervals is None else frozenset(intervals), maxlen)
+        with self._lock:
+            self._subs.append(sub)
+            self._rebuild()
+        return sub
+
+    def unsubscribe(self, sub: MarketSubscription) -> None:
+        with self._lock:
+            if sub in self._subs:
+                self._subs.remove(sub)
+                self._rebuild()
+        with sub._cond:
+            sub.closed = True
+            sub._cond.notify_all()
+
+    def _set_filter(self, sub: MarketSubscription, sids: Optional[FrozenSet[int]]) -> None:
+        with self._lock:
+            sub.sids = sids
+            self._rebuild()
+
+    def _rebuild(self) -> None:
+        """self._lock 보유 상태에서 라우팅 표를 새로 만들어 교체"""
+        routes: Dict[str, Dict[int, Tuple[MarketSubscription, ...]]] = {}
+        any_subs: Dict[str, Tuple[MarketSubscription, ...]] = {}
+        for kind in EVENT_KINDS:
+            subs = [s for s in self._subs if kind in s.kinds]
+            wildcard = tuple(s for s in subs if s.sids is None)
+            by_sid: Dict[int, List[MarketSubscription]] = {}
+            for s in subs:
+                if s.sids is not None:
+                    for sid in s.sids:
+                        by_sid.setdefault(sid, []).append(s)
+            routes[kind] = {sid: tuple(lst) + wildcard for sid, lst in by_sid.items()}
+            any_subs[kind] = wildcard
+        self._routes = routes
+        self._any = any_subs
+
+    def targets(self, kind: str, sid: int) -> Tuple[MarketSubscription, ...]:
+        """발행 전 대상 구독자 조회 (없으면 빈 튜플, 락 없음)"""
+        return self._routes[kind].get(sid, self._any[kind])
+
+    @staticmethod
+    def publish(targets: Tuple[MarketSubscription, ...], event: MarketEvent) -> None:
+        for sub in targets:
+            sub._push(event)
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {sub.name: sub.get_stats() for sub in self._subs}
+
+
+def latest_by_code(events: Iterable[MarketEvent]) -> Dict[str, MarketEvent]:
+    """종목별 마지막 이벤트만 남김 (시세 이벤트를 모아 최신 값으로 한 번씩만 처리할 때)"""
+    latest: Dict[str, MarketEvent] = {}
+    for event in events:
+        latest[event.code] = event
+    return latest
@@ -0,0 +1,186 @@
+"""
+실시간 10단계 호가창 (H0STASP0)
+- 종목별로 고정 크기 배열(array('d'))을 한 번만 할당하고, 호가 수신 시 제자리 갱신한다. (업데이트당 딕셔너리 생성 없음)
+- 갱신 시 누적 잔량/누적 금액을 미리 계산해 두어 최우선 호가, 깊이 가중 중간가, N단계 누적 잔량,
+  호가 불균형 조회가 모두 O(1)이다.
+"""
+import threading
+from array import array
+from time import time
+from typing import Dict, List, Optional, Sequence
+
+BOOK_LEVELS = 10
+
+# H0STASP0 캐럿 필드 오프셋
+_ASKP = 3
+_BIDP = _ASKP + BOOK_LEVELS
+_ASKP_RSQN = _BIDP + BOOK_LEVELS
+_BIDP_RSQN = _ASKP_RSQN + BOOK_LEVELS
+_TOTAL_ASKP_RSQN = _BIDP_RSQN + BOOK_LEVELS
+_TOTAL_BIDP_RSQN = _TOTAL_ASKP_RSQN + 1
+
+
+class OrderBook:
+    """종목 1개의 호가창. 배열 인덱스 0이 최우선 호가"""
+
+    __slots__ = (
+        'code', 'hour', 'timestamp', 'total_ask_qty', 'total_bid_qty',
+        'ask_px', 'bid_px', 'ask_qty', 'bid_qty',
+        'cum_ask_qty', 'cum_bid_qty', 'cum_ask_amt', 'cum_bid_amt',
+    )
+
+    def __init__(self, code: str):
+        self.code = code
+        self.hour = ''
+        self.timestamp = 0.0
+        self.total_ask_qty = 0.0
+        self.total_bid_qty = 0.0
+        zeros = [0.0] * BOOK_LEVELS
+        self.ask_px = array('d', zeros)
+        self.bid_px = array('d', zeros)
+        self.ask_qty = array('d', zeros)
+        self.bid_qty = array('d', zeros)
+        self.cum_ask_qty = array('d', zeros)
+        self.cum_bid_qty = array('d', zeros)
+        self.cum_ask_amt = array('d', zeros)
+        self.cum_bid_amt = array('d', zeros)
+
+    def apply_fields(self, f: Sequence[str], ts: float) -> None:
+        """H0STASP0 레코드 필드 리스트로 호가창을 제자리 갱신합니다."""
+        ask_px, bid_px, ask_qty, bid_qty = self.ask_px, self.bid_px, self.ask_qty, self.bid_qty
+        cum_aq, cum_bq, cum_aa, cum_ba = self.cum_ask_qty, self.cum_bid_qty, self.cum_ask_amt, self.cum_bid_amt
+        aq = bq = aa = ba = 0.0
+        for i in range(BOOK_LEVELS):
+            ap = float(f[_ASKP + i] or 0)
+            bp = float(f[_BIDP + i] or 0)
+            a = float(f[_ASKP_RSQN + i] or 0)
+            b = float(f[_BIDP_RSQN + i] or 0)
+            ask_px[i] = ap
+            bid_px[i] = bp
+            ask_qty[i] = a
+            bid_qty[i] = b
+            aq += a
+            bq += b
+            aa += ap * a
+            ba += bp * b
+            cum_aq[i] = aq
+            cum_bq[i] = bq
+            cum_aa[i] = aa
+            cum_ba[i] = ba
+        self.hour = f[1]
+        self.total_ask_qty = float(f[_TOTAL_ASKP_RSQN] or 0)
+        self.total_bid_qty = float(f[_TOTAL_BIDP_RSQN] or 0)
+        self.timestamp = ts
+
+    # ---------- 조회 (O(1)) ----------
+    @property
+    def best_ask(self) -> float:
+        return self.ask_px[0]
+
+    @property
+    def best_bid(self) -> float:
+        return self.bid_px[0]
+
+    def spread_pct(self) -> Optional[float]:
+        ask, bid = self.ask_px[0], self.bid_px[0]
+        if ask > 0 and bid > 0:
+            return (ask - bid) / bid * 100
+        return None
+
+    def cum_depth(self, levels: int = BOOK_LEVELS, side: str = 'both') -> float:
+        """최우선부터 levels 단계까지의 누적 잔량 (side: 'ask' | 'bid' | 'both')"""
+        n = min(max(levels, 1), BOOK_LEVELS) - 1
+        if side == 'ask':
+            return self.cum_ask_qty[n]
+        if side == 'bid':
+            return self.cum_bid_qty[n]
+        return self.cum_ask_qty[n] + self.cum_bid_qty[n]
+
+    def imbalance(self, levels: int = BOOK_LEVELS) -> float:
+        """호가 불균형 (매수잔량-매도잔량)/(합계), -1(매도 우위) ~ 1(매수 우위)"""
+        n = min(max(levels, 1), BOOK_LEVELS) - 1
+        a, b = self.cum_ask_qty[n], self.cum_bid_qty[n]
+        total = a + b
+        return (b - a) / total if total > 0 else 0.0
+
+    def weighted_mid(self, levels: int = 1) -> Optional[float]:
+        """
+        깊이 가중 중간가. 각 측의 levels 단계 평균 호가를 반대편 잔량으로 가중 평균합니다.
+        (levels=1이면 최우선 호가 기준 micro-price)
+        """
+        n = min(max(levels, 1), BOOK_LEVELS) - 1
+        aq, bq = self.cum_ask_qty[n], self.cum_bid_qty[n]
+        if aq <= 0 or bq <= 0:
+            return None
+        ask_avg = self.cum_ask_amt[n] / aq
+        bid_avg = self.cum_bid_amt[n] / bq
+        return (ask_avg * bq + bid_avg * aq) / (aq + bq)
+
+    def levels(self) -> Dict[str, List[float]]:
+        """호가창 사본 (디버깅/표시용)"""
+        return {
+            'ask_px': list(self.ask_px), 'ask_qty': list(self.ask_qty),
+            'bid_px': list(self.bid_px), 'bid_qty': list(self.bid_qty),
+        }
+
+
+class OrderBookStore:
+    """종목별 OrderBook 저장소 (처리 스레드가 갱신, 전략 스레드가 조회)"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._books: Dict[str, OrderBook] = {}
+        self.update_count = 0
+
+    def apply_fields(self, code: str, f: Sequence[str], ts: Optional[float] = None) -> None:
+        t = ts or time()
+        with self._lock:
+            book = self._books.get(code)
+            if book is None:
+                book = OrderBook(code)
+                self._books[code] = book
+            book.apply_fields(f, t)
+            self.update_count += 1
+
+    def get(self, code: str) -> Optional[OrderBook]:
+        return self._books.get(code)
+
+    def best_bid_ask(self, code: str, max_age: Optional[float] = None):
+        """(best_bid, best_ask) — 호가창이 없거나 max_age(초)보다 오래되었으면 None"""
+        with self._lock:
+            book = self._books.get(code)
+            if book is None or book.best_ask <= 0 or book.best_bid <= 0:
+                return None
+            if max_age is not None and time() - book.timestamp > max_age:
+                return None
+            return book.best_bid, book.best_ask
+
+    def spread_pct(self, code: str, max_age: Optional[float] = None) -> Optional[float]:
+        quote = self.best_bid_ask(code, max_age)
+        if quote is None:
+            return None
+        bid, ask = quote
+        return (ask - bid) / bid * 100
+
+    def imbalance(self, code: str, levels: int = BOOK_LEVELS) -> Optional[float]:
+        with self._lock:
+            book = self._books.get(code)
+            return book.imbalance(levels) if book else None
+
+    def weighted_mid(self, code: str, levels: int = 1) -> Optional[float]:
+        with self._lock:
+            book = self._books.get(code)
+            return book.weighted_mid(levels) if book else None
+
+    def cum_depth(self, code: str, levels: int = BOOK_LEVELS, side: str = 'both') -> Optional[float]:
+        with self._lock:
+            book = self._books.get(code)
+            return book.cum_depth(levels, side) if book else None
+
+    def discard(self, code: str) -> None:
+        with self._lock:
+            self._books.pop(code, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._books.clear()
@@ -0,0 +1,222 @@
+"""
+로컬 재생(replay) WebSocket 서버
+- KIS 실시간 WebSocket의 구독/해지 JSON 프로토콜과 PINGPONG에 응답하는 로컬 대체 서버.
+- 캡처 세그먼트(data/capture/YYYY-MM-DD) 또는 market_events_*.json 데이터를 구독 종목에 한해 재생한다.
+- 재생 속도: 1x(실시간), Nx, max(대기 없음)
+- 시스템 연결: secrets.json의 WS_URL을 "ws://127.0.0.1:21000/ws"로 지정하면 장외 시간에도 전체 시스템을 돌릴 수 있다.
+
+사용 예:
+    python -m web_socket.replay_server --events data/market_events_2025-10-01.json --speed 10
+    python -m web_socket.replay_server --capture data/capture/2025-10-01 --speed max --loop
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+from datetime import datetime
+from time import monotonic
+from typing import Iterator, List, Optional, Set, Tuple
+
+if __name__ == "__main__":
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.logger import logger
+from data.frame_recorder import CaptureReader
+from web_socket.frame_decoder import H0STCNT0_SCHEMA
+
+try:
+    import websockets
+except ImportError:  # 선택 의존성
+    websockets = None
+
+# (wall 시각, TR_ID, 종목코드, 원본 프레임)
+ReplayItem = Tuple[float, str, str, str]
+
+
+def _frame_header(message: str) -> Optional[Tuple[str, str]]:
+    """평문 캐럿 프레임의 (TR_ID, 첫 레코드 종목코드). 제어 메시지/암호화 프레임은 None"""
+    if not message or message[0] != '0':
+        return None
+    parts = message.split('|', 3)
+    if len(parts) < 4:
+        return None
+    return parts[1], parts[3].split('^', 1)[0]
+
+
+class CaptureSource:
+    """FrameRecorder 캡처 세그먼트 재생 소스"""
+
+    def __init__(self, day_dir: str):
+        self.day_dir = day_dir
+
+    def __iter__(self) -> Iterator[ReplayItem]:
+        for wall, _, message in CaptureReader(self.day_dir).read():
+            header = _frame_header(message)
+            if header:
+                yield wall, header[0], header[1], message
+
+
+class EventsSource:
+    """
+    market_events_*.json (종목별 분 단위 스냅샷) 재생 소스.
+    스냅샷마다 H0STCNT0 캐럿 프레임을 합성하며, 시각 순으로 정렬해 둔다.
+    """
+
+    _INDEX = {name: i for i, (name, _, _) in enumerate(H0STCNT0_SCHEMA)}
+
+    def __init__(self, path: str):
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        items: List[ReplayItem] = []
+        for by_code in data.values():
+            for code, ev in by_code.items():
+                try:
+                    t = datetime.fromisoformat(ev['time'])
+                except (KeyError, ValueError):
+                    continue
+                items.append((t.timestamp(), "H0STCNT0", code, self._build_frame(code, t, ev)))
+        items.sort(key=lambda x: x[0])
+        self.items = items
+        logger.info(f"[Replay] {path}: {len(items):,}건 로드")
+
+    @classmethod
+    def _build_frame(cls, code: str, t: datetime, ev: dict) -> str:
+        idx = cls._INDEX
+        f = ['0'] * len(H0STCNT0_SCHEMA)
+        price = float(ev.get('price', 0) or 0)
+        acc_vol = float(ev.get('acc_vol', 0) or 0)
+        f[idx['code']] = code
+        f[idx['exec_time']] = t.strftime('%H%M%S')
+        f[idx['price']] = f"{price:g}"
+        f[idx['change_rate']] = f"{float(ev.get('change_rate', 0) or 0):g}"
+        f[idx['open_price']] = f"{price:g}"
+        f[idx['high_price']] = f"{float(ev.get('high', price) or price):g}"
+        f[idx['low_price']] = f"{float(ev.get('low', price) or price):g}"
+        f[idx['ask_price1']] = f"{price:g}"
+        f[idx['bid_price1']] = f"{price:g}"
+        f[idx['exec_vol']] = f"{float(ev.get('exec_vol', 0) or 0):g}"
+        f[idx['acc_vol']] = f"{acc_vol:g}"
+        f[idx['acc_tr_amount']] = f"{acc_vol * price:.0f}"
+        f[idx['bsop_date']] = t.strftime('%Y%m%d')
+        return "0|H0STCNT0|001|" + "^".join(f)
+
+    def __iter__(self) -> Iterator[ReplayItem]:
+        return iter(self.items)
+
+
+class ReplayServer:
+    """KIS 실시간 프로토콜 대체 서버 (연결마다 독립적으로 처음부터 재생)"""
+
+    def __init__(self, source, host: str = "127.0.0.1", port: int = 21000, speed: float = 1.0, loop: bool = False,
+                 settle: float = 1.0):
+        self.source = source
+        self.settle = settle  # 첫 구독 후 나머지 구독 요청을 기다리는 시간(초)
+        self.host = host
+        self.port = port
+        self.speed = speed  # 0 = 최대 속도
+        self.loop = loop
+
+    async def serve_forever(self):
+        if websockets is None:
+            raise RuntimeError("websockets 패키지가 필요합니다. (pip install websockets)")
+        async with websockets.serve(self._handle, self.host, self.port, max_size=None):
+            speed = "max" if self.speed <= 0 else f"{self.speed:g}x"
+            logger.info(f"[Replay] 서버 시작: ws://{self.host}:{self.port}/ws (speed={speed}, loop={self.loop})")
+            await asyncio.Future()
+
+    async def _handle(self, ws, *_):
+        subs: Set[Tuple[str, str]] = set()
+        subscribed = asyncio.Event()
+        replay = asyncio.create_task(self._replay(ws, subs, subscribed))
+        peer = getattr(ws, 'remote_address', None)
+        logger.info(f"[Replay] 클라이언트 연결: {peer}")
+        try:
+            async for message in ws:
+                await self._on_control(ws, message, subs, subscribed)
+        except Exception as e:
+            logger.debug(f"[Replay] 연결 종료: {e}")
+        finally:
+            replay.cancel()
+            logger.info(f"[Replay] 클라이언트 종료: {peer}")
+
+    async def _on_control(self, ws, message, subs: Set[Tuple[str, str]], subscribed: asyncio.Event):
+        try:
+            data = json.loads(message)
+        except (TypeError, ValueError):
+            return
+        header = data.get("header", {})
+        if header.get("tr_id") == "PINGPONG":
+            await ws.send(message)
+            return
+        body_input = data.get("body", {}).get("input", {})
+        tr_id, tr_key = body_input.get("tr_id"), body_input.get("tr_key")
+        if not tr_id or not tr_key:
+            return
+        if header.get("tr_type") == "1":
+            subs.add((tr_id, tr_key))
+            subscribed.set()
+            msg1 = "SUBSCRIBE SUCCESS"
+        else:
+            subs.discard((tr_id, tr_key))
+            msg1 = "UNSUBSCRIBE SUCCESS"
+        await ws.send(json.dumps({
+            "header": {"tr_id": tr_id, "tr_key": tr_key, "encrypt": "N"},
+            "body": {"rt_cd": "0", "msg_cd": "OPSP0000", "msg1": msg1, "output": {}},
+        }))
+
+    async def _replay(self, ws, subs: Set[Tuple[str, str]], subscribed: asyncio.Event):
+        await subscribed.wait()
+        await asyncio.sleep(self.settle)
+        sent = 0
+        started = monotonic()
+        while True:
+            base_wall: Optional[float] = None
+            base_mono = monotonic()
+            for wall, tr_id, code, frame in self.source:
+                if base_wall is None:
+                    base_wall = wall
+                if self.speed > 0:
+                    delay = (wall - base_wall) / self.speed - (monotonic() - base_mono)
+                    if delay > 0:
+                        await asyncio.sleep(delay)
+                if (tr_id, code) not in subs:
+                    continue
+                await ws.send(frame)
+                sent += 1
+                if self.speed <= 0 and sent % 1000 == 0:
+                    await asyncio.sleep(0)  # 최대 속도에서도 제어 메시지 처리 기회 보장
+            if not self.loop:
+                break
+        elapsed = monotonic() - started
+        logger.info(f"[Replay] 재생 완료: {sent:,}건 / {elapsed:.2f}s ({sent / elapsed if elapsed else 0:,.0f} frames/s)")
+
+
+def _parse_speed(value: str) -> float:
+    if value.lower() in ("max", "0"):
+        return 0.0
+    return float(value.lower().rstrip("x"))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="KIS 실시간 시세 재생 서버")
+    src = parser.add_mutually_exclusive_group(required=True)
+    src.add_argument("--capture", help="캡처 세그먼트 디렉터리 (data/capture/YYYY-MM-DD)")
+    src.add_argument("--events", help="market_events_*.json 파일")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=21000)
+    parser.add_argument("--speed", type=_parse_speed, default=1.0, help="1, 10(x), max")
+    parser.add_argument("--loop", action="store_true", help="끝나면 처음부터 반복")
+    parser.add_argument("--settle", type=float, default=1.0, help="첫 구독 후 재생 시작까지 대기(초)")
+    args = parser.parse_args(argv)
+
+    source = CaptureSource(args.capture) if args.capture else EventsSource(args.events)
+    server = ReplayServer(source, args.host, args.port, args.speed, args.loop, args.settle)
+    try:
+        asyncio.run(server.serve_forever())
+    except KeyboardInterrupt:
+        logger.info("[Replay] 서버 종료")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,275 @@
+"""
+다중 WebSocket 세션(샤드) 관리자
+- 세션당 구독 개수 제한(max_subscriptions)을 넘기 위해 접속 키별로 KISWebSocketClient 세션을 여러 개 운용한다.
+- 종목 → 샤드 배정은 rendezvous 해시(crc32)로 결정하므로 재시작해도 같은 종목은 같은 샤드로 간다.
+  선호 샤드가 가득 차면 다음 순위 샤드로 넘기고(overflow), 자리가 나면 선호 샤드로 되돌린다.
+  되돌리기는 한 번에 rebalance_batch개까지만 하며(구독 메시지 폭주 방지), 남은 종목은 다음에 자리가 날 때 옮긴다.
+- 모든 샤드는 같은 MarketCache에 반영한다.
+- KISWebSocketClient와 같은 공개 API(start/stop/subscribe/unsubscribe/wait_for_connection/is_connected)를 제공한다.
+"""
+import threading
+import time
+import zlib
+from typing import Any, Dict, Iterable, List, Optional, Sequence
+
+from utils.logger import logger
+from web_socket.market_cache import MarketCache
+from web_socket.web_socket_manager import KISWebSocketClient
+
+
+class ShardedFeed:
+    """접속 키별 WebSocket 세션 여러 개를 하나의 시세 피드처럼 다룹니다."""
+
+    def __init__(
+        self,
+        config,
+        account_manager,
+        approval_keys: Sequence[str],
+        market_cache: MarketCache,
+        codes: Iterable[str] = None,
+        client_cls=KISWebSocketClient,
+        **client_kwargs,
+    ):
+        if not approval_keys:
+            raise ValueError("ShardedFeed에는 최소 1개의 approval_key가 필요합니다.")
+        self.config = config
+        self.account_manager = account_manager
+        self.market_cache = market_cache
+        self._client_cls = client_cls
+        # 체결통보(HTS ID 단위)는 첫 번째 샤드만 구독
+        self._exec_notice_kwargs = {
+            k: client_kwargs.pop(k) for k in ('exec_notice_key', 'exec_notice_tr') if k in client_kwargs
+        }
+        self._client_kwargs = client_kwargs
+        self.max_per_shard = config.get('system', {}).get('max_subscriptions', 40)
+        self.rebalance_batch = config.get('system', {}).get('ws_rebalance_batch', 4)  # 재배치 1회당 최대 이동 종목 수
+
+        self._lock = threading.RLock()
+        self._shards: Dict[str, KISWebSocketClient] = {}
+        self._assignment: Dict[str, str] = {}  # 정규화 코드 -> 샤드 ID
+        self._book_assignment: Dict[str, str] = {}  # 호가(H0STASP0) 구독: 정규화 코드 -> 샤드 ID
+        self._load: Dict[str, int] = {}        # 샤드 ID -> 구독 수 (체결가 + 호가)
+        self._started = False
+        self._next_id = 0
+
+        for i, key in enumerate(approval_keys):
+            # 첫 번째 샤드는 계좌 API로 접속 키를 재발급하고, 추가 샤드는 주어진 키를 그대로 사용
+            provider = None if i == 0 else (lambda k=key: k)
+            self._add_shard_locked(key, provider)
+
+        for code in codes or ():
+            self.subscribe(code)
+
+    # ---------- 배정 ----------
+    @staticmethod
+    def _score(code: str, shard_id: str) -> int:
+        return zlib.crc32(f"{shard_id}:{code}".encode())
+
+    def _rank(self, code: str) -> List[str]:
+        """종목별 샤드 선호 순위 (rendezvous 해시 점수 내림차순)"""
+        return sorted(self._shards, key=lambda sid: self._score(code, sid), reverse=True)
+
+    def _choose(self, code: str) -> Optional[str]:
+        for sid in self._rank(code):
+            if self._load[sid] < self.max_per_shard:
+                return sid
+        return None
+
+    def _assign(self, code: str, sid: str) -> bool:
+        self._assignment[code] = sid
+        self._load[sid] += 1
+        if self._shards[sid].subscribe(code):
+            return True
+        self._assignment.pop(code, None) # 샤드가 거부하면 배정 취소
+        self._load[sid] -= 1
+        return False
+
+    def _release(self, code: str) -> Optional[str]:
+        sid = self._assignment.pop(code, None)
+        if sid is not None:
+            self._load[sid] -= 1
+            self._shards[sid].unsubscribe(code)
+        return sid
+
+    def _move(self, code: str, sid: str) -> bool:
+        """
+        code를 sid 샤드로 옮깁니다. 두 세션에서 같은 틱을 중복 반영하지 않도록 기존 샤드를 먼저 해지하고,
+        새 샤드가 거부하면 방금 비운 기존 샤드에 다시 구독합니다.
+        """
+        current = self._release(code)
+        if self._assign(code, sid):
+            return True
+        if current is None or not self._assign(code, current):
+            logger.error(f"📡 [SHARD] 재배치 중 {code} 구독 복구 실패 ({current} → {sid})")
+        return False
+
+    def _pull_into(self, sid: str):
+        """sid 샤드에 자리가 있으면, sid를 더 선호하는 종목을 현재 샤드에서 옮겨 옵니다. (최대 rebalance_batch개)"""
+        moved = []
+        for code in sorted(self._assignment):
+            if self._load[sid] >= self.max_per_shard or len(moved) >= self.rebalance_batch:
+                break
+            current = self._assignment[code]
+            if current == sid:
+                continue
+            rank = self._rank(code)
+            if rank.index(sid) < rank.index(current):
+                if not self._move(code, sid):
+                    break  # 대상 샤드가 거부하면 이번 재배치 중단
+                moved.append(code)
+        if moved:
+            logger.info(f"[SHARD] 재배치: {len(moved)}개 종목 → {sid}")
+
+    # ---------- 공개 API ----------
+    def subscribe(self, code: str) -> bool:
+        if not code:
+            return False
+        code = KISWebSocketClient._normalize(code)
+        with self._lock:
+            if code in self._assignment:
+                return True
+            sid = self._choose(code)
+            if sid is None:
+                logger.warning(f"📡 [SHARD] 전체 구독 한도({self.capacity}개) 초과로 구독 불가: {code}")
+                return False
+            return self._assign(code, sid)
+
+    def unsubscribe(self, code: str):
+        if not code:
+            return
+        code = KISWebSocketClient._normalize(code)
+        with self._lock:
+            sid = self._release(code)
+            if sid is not None:
+                self._pull_into(sid)
+
+    def subscribe_book(self, code: str) -> bool:
+        """호가 구독은 가능하면 체결가를 받는 샤드와 같은 세션에 배정합니다."""
+        if not code:
+            return False
+        code = KISWebSocketClient._normalize(code)
+        with self._lock:
+            if code in self._book_assignment:
+                return True
+            sid = self._assignment.get(code)
+            if sid is None or self._load[sid] >= self.max_per_shard:
+                sid = self._choose(code)
+            if sid is None:
+                logger.warning(f"📡 [SHARD] 전체 구독 한도({self.capacity}개) 초과로 호가 구독 불가: {code}")
+                return False
+            if not self._shards[sid].subscribe_book(code):
+                return False
+            self._book_assignment[code] = sid
+            self._load[sid] += 1
+            return True
+
+    def unsubscribe_book(self, code: str):
+        if not code:
+            return
+        code = KISWebSocketClient._normalize(code)
+        with self._lock:
+            sid = self._book_assignment.pop(code, None)
+            if sid is not None:
+                self._load[sid] -= 1
+                self._shards[sid].unsubscribe_book(code)
+                self._pull_into(sid)
+
+    def rebalance(self) -> None:
+        """선호 샤드로 아직 되돌리지 못한 종목을 샤드마다 최대 rebalance_batch개씩 옮깁니다. (주기적 호출용)"""
+        with self._lock:
+            for sid in list(self._shards):
+                self._pull_into(sid)
+
+    def add_shard(self, approval_key: str) -> str:
+        """세션을 추가하고, 새 샤드를 더 선호하는 종목을 옮깁니다."""
+        with self._lock:
+            sid = self._add_shard_locked(approval_key, lambda k=approval_key: k)
+            if self._started:
+                self._shards[sid].start()
+            self._pull_into(sid)
+            return sid
+
+    def remove_shard(self, sid: str):
+        """세션을 종료하고 해당 샤드의 종목을 남은 샤드에 재배정합니다."""
+        with self._lock:
+            if sid not in self._shards or len(self._shards) == 1:
+                logger.warning(f"[SHARD] 제거할 수 없는 샤드: {sid}")
+                return
+            orphans = [c for c, s in self._assignment.items() if s == sid]
+            book_orphans = [c for c, s in self._book_assignment.items() if s == sid]
+            for code in orphans:
+                del self._assignment[code]
+            for code in book_orphans:
+                del self._book_assignment[code]
+            client = self._shards.pop(sid)
+            del self._load[sid]
+            for code in orphans:
+                target = self._choose(code)
+                if target is None:
+                    logger.warning(f"📡 [SHARD] 샤드 제거로 구독 유지 불가: {code}")
+                    continue
+                self._assign(code, target)
+            for code in book_orphans:
+                self.subscribe_book(code)
+        client.stop()
+        logger.info(f"[SHARD] {sid} 제거 ({len(orphans)}개 종목 재배정)")
+
+    def start(self):
+        with self._lock:
+            self._started = True
+            shards = list(self._shards.values())
+        for client in shards:
+            client.start()
+
+    def stop(self):
+        with self._lock:
+            self._started = False
+            shards = list(self._shards.values())
+        for client in shards:
+            client.stop()
+
+    def wait_for_connection(self, timeout: int = 10) -> bool:
+        """모든 샤드의 연결을 timeout까지 기다립니다. 하나라도 연결되면 True"""
+        deadline = time.monotonic() + timeout
+        connected = []
+        for sid, client in list(self._shards.items()):
+            if client.wait_for_connection(max(0.0, deadline - time.monotonic())):
+                connected.append(sid)
+            else:
+                logger.warning(f"[SHARD] {sid} 연결 대기 시간 초과")
+        return bool(connected)
+
+    @property
+    def is_connected(self) -> bool:
+        return any(c.is_connected for c in list(self._shards.values()))
+
+    @property
+    def capacity(self) -> int:
+        return self.max_per_shard * len(self._shards)
+
+    def shard_of(self, code: str) -> Optional[str]:
+        return self._assignment.get(KISWebSocketClient._normalize(code))
+
+    def get_pipeline_stats(self) -> Dict[str, Any]:
+        return {sid: c.get_pipeline_stats() for sid, c in list(self._shards.items())}
+
+    def get_shard_stats(self) -> Dict[str, Any]:
+        """샤드별 상태/지연 지표"""
+        return {sid: c.get_health() for sid, c in list(self._shards.items())}
+
+    # ---------- 내부 ----------
+    def _add_shard_locked(self, approval_key: str, provider) -> str:
+        sid = f"ws{self._next_id}"
+        self._next_id += 1
+        self._shards[sid] = self._client_cls(
+            self.config,
+            self.account_manager,
+            approval_key,
+            market_cache=self.market_cache,
+            approval_key_provider=provider,
+            name=sid,
+            **(self._exec_notice_kwargs if sid == "ws0" else {}),
+            **self._client_kwargs,
+        )
+        self._load[sid] = 0
+        return sid
@@ -0,0 +1,230 @@
+"""
+핫 스탠바이(hot-standby) WebSocket 피드
+- 같은 종목을 구독하는 세션 2개(주/대기)를 동시에 운용한다. 접속 키는 세션마다 따로 필요하다.
+- 두 세션의 체결 틱은 (종목, 체결시각, 누적거래량) 키로 중복 제거하여 먼저 도착한 것만 MarketCache/로거에 반영한다.
+- 주 세션이 끊기거나 stall_sec 동안 수신이 없는데 대기 세션은 수신 중이면 역할을 바꾼다.
+  대기 세션은 이미 같은 종목을 구독하고 있으므로 재구독 지연이 없다.
+- KISWebSocketClient와 같은 공개 API(start/stop/subscribe/unsubscribe/wait_for_connection/is_connected)를 제공한다.
+"""
+import threading
+import time
+from collections import deque
+from typing import Any, Callable, Deque, Dict, List, Optional, Set, Tuple
+
+from core.symbol_table import symbol_table
+from utils.logger import logger
+from web_socket.market_cache import MarketCache
+from web_socket.web_socket_manager import KISWebSocketClient
+
+
+class TickDeduper:
+    """여러 세션에서 들어오는 같은 체결 틱 중 첫 도착분만 통과시킵니다. (종목별 최근 window개 키 기억)"""
+
+    def __init__(self, window: int = 512):
+        self.window = window
+        self._lock = threading.Lock()
+        self._seen: Dict[int, Tuple[Set[tuple], Deque[tuple]]] = {}
+        self.passed = 0
+        self.suppressed = 0
+        self.first_arrivals: Dict[str, int] = {}  # 세션별 먼저 도착해 반영된 틱 수
+
+    def filter(self, source: str, ticks: List[tuple]) -> List[tuple]:
+        """KISWebSocketClient.tick_filter — (종목 ID, 틱) 목록에서 이미 반영된 틱을 제거합니다."""
+        out = []
+        with self._lock:
+            for sid, tick in ticks:
+                key = (tick['exec_time'], tick['acc_vol'])
+                entry = self._seen.get(sid)
+                if entry is None:
+                    entry = self._seen[sid] = (set(), deque())
+                keys, order = entry
+                if key in keys:
+                    self.suppressed += 1
+                    continue
+                keys.add(key)
+                order.append(key)
+                if len(order) > self.window:
+                    keys.discard(order.popleft())
+                out.append((sid, tick))
+            self.passed += len(out)
+            if out:
+                self.first_arrivals[source] = self.first_arrivals.get(source, 0) + len(out)
+        return out
+
+    def discard(self, sid: int):
+        with self._lock:
+            self._seen.pop(sid, None)
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "passed": self.passed,
+                "suppressed": self.suppressed,
+                "first_arrivals": dict(self.first_arrivals),
+            }
+
+
+class StandbyFeed:
+    """주/대기 WebSocket 세션을 하나의 시세 피드처럼 다룹니다."""
+
+    def __init__(
+        self,
+        config,
+        account_manager,
+        approval_key: str,
+        standby_approval_key: str,
+        market_cache: MarketCache,
+        codes=None,
+        client_cls=KISWebSocketClient,
+        gap_handler: Optional[Callable[[float, float, List[str]], None]] = None,
+        **client_kwargs,
+    ):
+        system_config = config.get('system', {})
+        self.stall_sec = system_config.get('ws_stall_sec', 3.0)
+        self.check_interval = 0.5
+        self.market_cache = market_cache
+        self._gap_handler = gap_handler
+        self._dedup = TickDeduper(system_config.get('ws_dedup_window', 512))
+        # 체결통보(HTS ID 단위)는 첫 세션만 구독
+        exec_notice_kwargs = {
+            k: client_kwargs.pop(k) for k in ('exec_notice_key', 'exec_notice_tr') if k in client_kwargs
+        }
+
+        self._sessions: Dict[str, KISWebSocketClient] = {}
+        for name, key, provider in (
+            ("ws-a", approval_key, None),  # 첫 세션은 계좌 API로 접속 키를 재발급
+            ("ws-b", standby_approval_key, lambda k=standby_approval_key: k),
+        ):
+            self._sessions[name] = client_cls(
+                config,
+                account_manager,
+                key,
+                codes=codes,
+                market_cache=market_cache,
+                approval_key_provider=provider,
+                name=name,
+                gap_handler=lambda s, e, c, n=name: self._on_gap(n, s, e, c),
+                tick_filter=self._dedup.filter,
+                **(exec_notice_kwargs if name == "ws-a" else {}),
+                **client_kwargs,
+            )
+        self._primary, self._standby = "ws-a", "ws-b"
+
+        self._stop_evt = threading.Event()
+        self._monitor: Optional[threading.Thread] = None
+        self.failovers = 0
+        self.last_failover_sec: Optional[float] = None  # 주 세션 마지막 수신 → 대기 세션 승격까지 걸린 시간
+        self.max_failover_sec = 0.0
+
+    # ---------- 공개 API ----------
+    def subscribe(self, code: str) -> bool:
+        """모든 세션에 구독하고 주 세션의 구독 성공 여부를 반환"""
+        results = {name: client.subscribe(code) for name, client in self._sessions.items()}
+        return results[self._primary]
+
+    def unsubscribe(self, code: str):
+        for client in self._sessions.values():
+            client.unsubscribe(code)
+        if code:
+            self._dedup.discard(symbol_table.intern(code))
+
+    def subscribe_book(self, code: str) -> bool:
+        results = {name: client.subscribe_book(code) for name, client in self._sessions.items()}
+        return results[self._primary]
+
+    def unsubscribe_book(self, code: str):
+        for client in self._sessions.values():
+            client.unsubscribe_book(code)
+
+    def start(self):
+        self._stop_evt.clear()
+        for client in self._sessions.values():
+            client.start()
+        self._monitor = threading.Thread(target=self._monitor_loop, name="ws-standby-monitor", daemon=True)
+        self._monitor.start()
+
+    def stop(self):
+        self._stop_evt.set()
+        for client in self._sessions.values():
+            client.stop()
+        logger.info(f"[STANDBY] 이중화 통계: {self.get_failover_stats()}")
+
+    def wait_for_connection(self, timeout: int = 10) -> bool:
+        """주 세션 연결을 timeout까지 기다리고, 실패하면 대기 세션 연결 여부를 확인합니다."""
+        deadline = time.monotonic() + timeout
+        if self.primary.wait_for_connection(timeout):
+            self.standby.wait_for_connection(max(0.0, deadline - time.monotonic()))
+            return True
+        logger.warning(f"[STANDBY] 주 세션({self._primary}) 연결 대기 시간 초과")
+        return self.standby.is_connected
+
+    @property
+    def is_connected(self) -> bool:
+        return any(c.is_connected for c in self._sessions.values())
+
+    @property
+    def primary(self) -> KISWebSocketClient:
+        return self._sessions[self._primary]
+
+    @property
+    def standby(self) -> KISWebSocketClient:
+        return self._sessions[self._standby]
+
+    def get_pipeline_stats(self) -> Dict[str, Any]:
+        return {name: c.get_pipeline_stats() for name, c in self._sessions.items()}
+
+    def get_health(self) -> Dict[str, Any]:
+        health = {name: c.get_health() for name, c in self._sessions.items()}
+        health["primary"] = self._primary
+        health["failover"] = self.get_failover_stats()
+        return health
+
+    def get_failover_stats(self) -> Dict[str, Any]:
+        """역할 전환 횟수/소요 시간과 중복 제거 카운터"""
+        return {
+            "primary": self._primary,
+            "failovers": self.failovers,
+            "last_failover_sec": self.last_failover_sec,
+            "max_failover_sec": self.max_failover_sec,
+            "dedup": self._dedup.get_stats(),
+        }
+
+    # ---------- 내부 ----------
+    def _stalled(self, client: KISWebSocketClient, now: float) -> bool:
+        if not client.is_connected:
+            return True
+        return not client._last_recv_ts or now - client._last_recv_ts > self.stall_sec
+
+    def _monitor_loop(self):
+        while not self._stop_evt.wait(self.check_interval):
+            try:
+                now = time.monotonic()
+                primary, standby = self.primary, self.standby
+                # 장 시작 전 등 둘 다 조용하면 전환하지 않음
+                if self._stalled(primary, now) and not self._stalled(standby, now):
+                    self._failover(now)
+            except Exception as e:
+                logger.error(f"[STANDBY] 세션 감시 오류: {e}")
+
+    def _failover(self, now: float):
+        old = self.primary
+        elapsed = round(now - old._last_recv_ts, 3) if old._last_recv_ts else None
+        self._primary, self._standby = self._standby, self._primary
+        self.failovers += 1
+        if elapsed is not None:
+            self.last_failover_sec = elapsed
+            self.max_failover_sec = max(self.max_failover_sec, elapsed)
+        logger.warning(
+            f"[STANDBY] 주 세션 전환: {self._standby} → {self._primary} "
+            f"(연결={old.is_connected}, 마지막 수신 후 {elapsed}s, 누적 {self.failovers}회)"
+        )
+
+    def _on_gap(self, name: str, start_ts: float, end_ts: float, codes: List[str]):
+        """다른 세션이 연결돼 있었으면 그 세션이 끊김 구간을 받았으므로 보충하지 않습니다."""
+        if self._gap_handler is None:
+            return
+        other = self._sessions[self._standby if name == self._primary else self._primary]
+        if other.is_connected:
+            logger.info(f"[STANDBY] {name} 재연결: 다른 세션이 수신 중이어서 끊김 구간 보충 생략")
+            return
+        self._gap_handler(start_ts, end_ts, codes)
@@ -0,0 +1,195 @@
+"""
+구독 스케줄러
+- 원하는 구독 집합(종목별 우선순위)을 받아 현재 적용된 구독과의 차이를 계산하고,
+  구독/해지 메시지를 전용 스레드에서 최대 허용 속도로 전송한다. (호출 스레드는 대기하지 않음)
+- 우선순위: 해지(구독 한도 내 자리 확보) → 보유 종목 → 매수 후보 → 관심 종목
+- 대기 중인 작업은 최신 목표 집합 기준으로 다시 확인하여, 이미 필요 없어진 작업은 건너뛴다.
+- 피드가 구독을 거부하면(구독 한도 초과/전송 실패) 적용된 것으로 보지 않고 retry_sec 후 다시 시도한다.
+- 목표 집합이 모두 반영되면 converged 이벤트를 세우고 로그를 남긴다.
+"""
+import heapq
+import itertools
+import threading
+from time import monotonic
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from utils.logger import logger
+
+PRIORITY_UNSUBSCRIBE = -10  # 구독보다 먼저 보내야 한도 안에서 새 구독 자리가 난다
+PRIORITY_HOLDING = 0
+PRIORITY_CANDIDATE = 10
+PRIORITY_WATCH = 20
+
+# 구독 종류: 체결가 / 호가
+KIND_TICK = "tick"
+KIND_BOOK = "book"
+
+
+class SubscriptionScheduler:
+    """WebSocket 구독을 목표 집합에 맞춰 비동기로 동기화합니다."""
+
+    def __init__(self, feed, rate_per_sec: float = 10.0, initial: Iterable[str] = (), retry_sec: float = 5.0):
+        self.feed = feed  # KISWebSocketClient 또는 ShardedFeed
+        self._interval = 1.0 / rate_per_sec if rate_per_sec > 0 else 0.0
+        self._retry_sec = retry_sec
+        self._deferred: List[Tuple[float, int, Tuple[str, str, bool]]] = []  # (재시도 시각, 우선순위, 작업)
+        self._cond = threading.Condition()
+        self._heap = []
+        self._seq = itertools.count()
+        self._desired: Dict[Tuple[str, str], int] = {}
+        self._applied: Set[Tuple[str, str]] = {(KIND_TICK, c) for c in initial}
+        self._queued: Set[Tuple[str, str, bool]] = set()
+        self._stop_evt = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self.converged = threading.Event()
+        self.converged.set()
+        self._sent = 0
+        self._skipped = 0
+        self._refused = 0
+        self._last_change = monotonic()
+
+    # ---------- 호출 측 ----------
+    def set_desired(self, codes: Dict[str, int], books: Optional[Dict[str, int]] = None) -> int:
+        """
+        목표 구독 집합을 교체합니다. codes/books: {정규화 코드: 우선순위}
+        전송할 작업 수를 반환하며 즉시 반환합니다.
+        """
+        desired = {(KIND_TICK, c): p for c, p in codes.items()}
+        for c, p in (books or {}).items():
+            desired[(KIND_BOOK, c)] = p
+        with self._cond:
+            self._desired = desired
+            ops = 0
+            for key, prio in desired.items():
+                if key not in self._applied:
+                    ops += self._push_locked(prio, key, True)
+            for key in self._applied - desired.keys():
+                ops += self._push_locked(PRIORITY_UNSUBSCRIBE, key, False)
+            if ops:
+                self.converged.clear()
+                self._last_change = monotonic()
+                self._cond.notify()
+            return ops
+
+    def _push_locked(self, prio: int, key: Tuple[str, str], subscribe: bool) -> int:
+        op = (key[0], key[1], subscribe)
+        if op in self._queued:
+            return 0
+        self._queued.add(op)
+        heapq.heappush(self._heap, (prio, next(self._seq), op))
+        return 1
+
+    def wait_converged(self, timeout: Optional[float] = None) -> bool:
+        return self.converged.wait(timeout)
+
+    @property
+    def pending(self) -> int:
+        with self._cond:
+            return len(self._heap)
+
+    # ---------- 전송 스레드 ----------
+    def start(self):
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop_evt.clear()
+        self._thread = threading.Thread(target=self._run, name="ws-sub-scheduler", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop_evt.set()
+        with self._cond:
+            self._cond.notify_all()
+        if self._thread:
+            self._thread.join(timeout=5)
+            self._thread = None
+
+    def _promote_deferred_locked(self) -> Optional[float]:
+        """재시도 시각이 된 작업을 큐로 되돌리고, 남은 작업 중 가장 이른 재시도까지의 시간을 반환"""
+        if not self._deferred:
+            return None
+        now = monotonic()
+        rest = []
+        for ready_at, prio, op in self._deferred:
+            if ready_at <= now:
+                heapq.heappush(self._heap, (prio, next(self._seq), op))
+            else:
+                rest.append((ready_at, prio, op))
+        self._deferred = rest
+        return min(r[0] for r in rest) - now if rest else None
+
+    def _run(self):
+        next_send = 0.0
+        while not self._stop_evt.is_set():
+            with self._cond:
+                while True:
+                    retry_in = self._promote_deferred_locked()
+                    if self._heap or self._stop_evt.is_set():
+                        break
+                    self._cond.wait(1.0 if retry_in is None else min(1.0, retry_in))
+                if self._stop_evt.is_set():
+                    return
+                if not self.feed.is_connected:
+                    self._cond.wait(0.5)
+                    continue
+                _, _, op = heapq.heappop(self._heap)
+                self._queued.discard(op)
+                kind, code, subscribe = op
+                key = (kind, code)
+                # 최신 목표와 비교해 필요 없어진 작업은 건너뜀
+                if subscribe != (key in self._desired) or subscribe == (key in self._applied):
+                    self._skipped += 1
+                    self._check_converged_locked()
+                    continue
+
+            wait = next_send - monotonic()
+            if wait > 0:
+                self._stop_evt.wait(wait)
+            ok = True
+            try:
+                if kind == KIND_BOOK:
+                    result = (self.feed.subscribe_book if subscribe else self.feed.unsubscribe_book)(code)
+                else:
+                    result = (self.feed.subscribe if subscribe else self.feed.unsubscribe)(code)
+                if subscribe:
+                    ok = bool(result)
+            except Exception as e:
+                ok = not subscribe  # 해지 실패는 로컬에서 해지된 것으로 취급 (기존 동작)
+                logger.error(f"[SUB_SCHED] {'구독' if subscribe else '해지'} 실패 ({kind}:{code}): {e}")
+            next_send = monotonic() + self._interval
+            self._sent += 1
+
+            with self._cond:
+                if not ok:
+                    # 거부된 구독은 적용하지 않고 잠시 뒤 다시 시도 (그 사이 목표에서 빠지면 건너뜀)
+                    self._refused += 1
+                    self._queued.add(op)
+                    self._deferred.append((monotonic() + self._retry_sec, self._desired.get(key, PRIORITY_WATCH), op))
+                    continue
+                if subscribe:
+                    self._applied.add(key)
+                else:
+                    self._applied.discard(key)
+                self._check_converged_locked()
+
+    def _check_converged_locked(self):
+        if not self._heap and self._applied == self._desired.keys():
+            if not self.converged.is_set():
+                self.converged.set()
+                logger.info(
+                    f"[SUB_SCHED] 구독 동기화 완료: 체결 {sum(1 for k, _ in self._applied if k == KIND_TICK)}개, "
+                    f"호가 {sum(1 for k, _ in self._applied if k == KIND_BOOK)}개 "
+                    f"({monotonic() - self._last_change:.2f}s)"
+                )
+
+    def get_stats(self):
+        with self._cond:
+            return {
+                "desired": len(self._desired),
+                "applied": len(self._applied),
+                "pending": len(self._heap),
+                "sent": self._sent,
+                "skipped": self._skipped,
+                "refused": self._refused,
+                "deferred": len(self._deferred),
+                "converged": self.converged.is_set(),
+            }
@@ -0,0 +1,184 @@
+"""
+수신 프레임 처리 파이프라인
+- WebSocket 수신 스레드는 원본 프레임을 고정 크기 링 버퍼에 넣기만 하고 즉시 반환한다.
+- 전용 처리 스레드가 버퍼를 비우며 파싱/캐시 반영/로거 기록을 수행한다.
+- 버퍼가 가득 찼을 때의 정책(backpressure):
+  * block       : 공간이 생길 때까지 수신 스레드를 대기시킴 (유실 없음)
+  * drop_oldest : 가장 오래된 프레임을 버리고 새 프레임을 넣음
+  * coalesce    : 같은 종목의 대기 중 호가 프레임을 최신 프레임으로 교체 (없으면 drop_oldest)
+                  교체 대상은 key_fn이 키를 주는 프레임(최신 값만 의미 있는 호가 등)뿐이며,
+                  체결 프레임은 레코드마다 체결량을 담고 있어 교체하지 않는다.
+"""
+import threading
+from time import monotonic
+from typing import Any, Callable, Dict, Hashable, List, Optional, Tuple
+
+from utils.logger import logger
+
+POLICIES = ('block', 'drop_oldest', 'coalesce')
+
+
+class FramePipeline:
+    """고정 크기 링 버퍼 + 전용 처리 스레드"""
+
+    def __init__(
+        self,
+        handler: Callable[[str, float], None],
+        capacity: int = 20000,
+        policy: str = 'drop_oldest',
+        key_fn: Optional[Callable[[str], Optional[Hashable]]] = None,
+        batch_size: int = 256,
+        name: str = "ws-pipeline",
+    ):
+        if policy not in POLICIES:
+            raise ValueError(f"지원하지 않는 backpressure 정책: {policy} (허용: {POLICIES})")
+        self._handler = handler
+        self._capacity = max(1, int(capacity))
+        self._policy = policy
+        self._key_fn = key_fn
+        self._batch_size = max(1, int(batch_size))
+        self._name = name
+
+        # 링 버퍼: 절대 시퀀스 번호(seq % capacity)로 슬롯 지정
+        self._slots: List[Optional[Tuple[str, float, Optional[Hashable]]]] = [None] * self._capacity
+        self._head = 0  # 다음에 꺼낼 seq
+        self._tail = 0  # 다음에 넣을 seq
+        self._pending_by_key: Dict[Hashable, int] = {}  # coalesce용: key -> seq
+
+        self._lock = threading.Lock()
+        self._not_empty = threading.Condition(self._lock)
+        self._not_full = threading.Condition(self._lock)
+        self._stop_evt = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+        # 카운터
+        self._enqueued = 0
+        self._processed = 0
+        self._dropped = 0
+        self._coalesced = 0
+        self._blocked = 0
+        self._errors = 0
+        self._max_depth = 0
+        self._last_lag = 0.0
+        self._max_lag = 0.0
+
+    # ---------- 수신 스레드 측 ----------
+    def put(self, message: str, recv_ts: Optional[float] = None) -> bool:
+        """프레임을 버퍼에 추가합니다. 종료 중이라 적재하지 못한 경우 False를 반환합니다."""
+        t = recv_ts if recv_ts is not None else monotonic()
+        key = None
+        if self._policy == 'coalesce' and self._key_fn is not None:
+            key = self._key_fn(message)
+
+        dropped = False
+        with self._lock:
+            if self._tail - self._head >= self._capacity:
+                seq = self._pending_by_key.get(key) if key is not None else None
+                if seq is not None:
+                    # 버퍼 포화 시에만: 대기 중인 같은 종목 프레임을 최신으로 교체 (대기 시작 시각은 유지)
+                    idx = seq % self._capacity
+                    _, first_ts, _ = self._slots[idx]
+                    self._slots[idx] = (message, first_ts, key)
+                    self._coalesced += 1
+                    return True
+                if self._policy == 'block':
+                    self._blocked += 1
+                    while self._tail - self._head >= self._capacity and not self._stop_evt.is_set():
+                        self._not_full.wait(0.5)
+                    if self._stop_evt.is_set():
+                        return False
+                else:
+                    self._pop_locked()
+                    self._dropped += 1
+                    dropped = True
+
+            self._slots[self._tail % self._capacity] = (message, t, key)
+            if key is not None:
+                self._pending_by_key[key] = self._tail
+            self._tail += 1
+            self._enqueued += 1
+            depth = self._tail - self._head
+            if depth > self._max_depth:
+                self._max_depth = depth
+            self._not_empty.notify()
+
+        if dropped and self._dropped % 1000 == 1:
+            logger.warning(f"[{self._name}] 버퍼 포화로 프레임 유실 (누적 {self._dropped}건, capacity={self._capacity})")
+        return True
+
+    # ---------- 처리 스레드 측 ----------
+    def _pop_locked(self) -> Tuple[str, float, Optional[Hashable]]:
+        idx = self._head % self._capacity
+        item = self._slots[idx]
+        self._slots[idx] = None
+        key = item[2]
+        if key is not None and self._pending_by_key.get(key) == self._head:
+            del self._pending_by_key[key]
+        self._head += 1
+        return item
+
+    def _run(self):
+        batch: List[Tuple[str, float, Optional[Hashable]]] = []
+        while True:
+            with self._lock:
+                while self._tail == self._head and not self._stop_evt.is_set():
+                    self._not_empty.wait(0.5)
+                if self._tail == self._head and self._stop_evt.is_set():
+                    return
+                n = min(self._batch_size, self._tail - self._head)
+                for _ in range(n):
+                    batch.append(self._pop_locked())
+                self._not_full.notify_all()
+
+            for message, t, _ in batch:
+                lag = monotonic() - t
+                self._last_lag = lag
+                if lag > self._max_lag:
+                    self._max_lag = lag
+                try:
+                    self._handler(message, t)
+                except Exception as e:
+                    self._errors += 1
+                    logger.error(f"[{self._name}] 프레임 처리 실패: {e}")
+                self._processed += 1
+            batch.clear()
+
+    def start(self):
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop_evt.clear()
+        self._thread = threading.Thread(target=self._run, name=self._name, daemon=True)
+        self._thread.start()
+        logger.info(f"[{self._name}] 처리 스레드 시작 (capacity={self._capacity}, policy={self._policy})")
+
+    def stop(self, timeout: float = 5.0):
+        """남은 프레임을 처리한 뒤 처리 스레드를 종료합니다."""
+        self._stop_evt.set()
+        with self._lock:
+            self._not_empty.notify_all()
+            self._not_full.notify_all()
+        if self._thread:
+            self._thread.join(timeout)
+            self._thread = None
+
+    @property
+    def is_running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            depth = self._tail - self._head
+        return {
+            "policy": self._policy,
+            "capacity": self._capacity,
+            "depth": depth,
+            "max_depth": self._max_depth,
+            "enqueued": self._enqueued,
+            "processed": self._processed,
+            "dropped": self._dropped,
+            "coalesced": self._coalesced,
+            "blocked": self._blocked,
+            "errors": self._errors,
+            "last_lag_ms": round(self._last_lag * 1000, 3),
+            "max_lag_ms": round(self._max_lag * 1000, 3),
+        }
@@ -0,0 +1,108 @@
+"""
+종목별 실시간 틱 시계열 (컬럼형 NumPy 링 버퍼)
+- 체결 틱을 dict로 보관하지 않고 hot 필드(timestamp, price, exec_vol 등)만 필드별 float64 배열에 기록한다.
+- 배열은 용량의 2배 길이로 잡고 각 값을 i, i+capacity 두 위치에 쓴다(미러링).
+  따라서 보관 중인 어떤 구간도 항상 연속된 메모리이므로 복사 없이 슬라이스(view)로 돌려줄 수 있다.
+- 추가는 O(1), 용량 초과/시간 윈도우 밖의 오래된 틱은 시작 위치만 옮겨 버린다.
+- 구간 조회는 timestamp 배열에 대한 이진 탐색(searchsorted)으로 시작 위치를 찾는다. (틱은 시각 순으로 들어온다고 가정)
+- 스레드 안전하지 않다. MarketCache가 락을 잡은 상태에서만 호출한다.
+"""
+from typing import Any, Dict, Iterable, Mapping, Optional, Sequence
+
+import numpy as np
+
+# 기본 보관 필드 (timestamp는 필수이며 항상 첫 번째)
+SERIES_FIELDS = ('timestamp', 'price', 'exec_vol', 'acc_vol', 'ask_price1', 'bid_price1')
+
+
+class TickSeries:
+    INITIAL_CAPACITY = 256  # 처음엔 작게 잡고 max_points까지 두 배씩 늘린다 (조용한 종목의 메모리 절약)
+
+    def __init__(self, max_points: int = 2000, window_sec: float = 120.0, fields: Sequence[str] = SERIES_FIELDS):
+        if not fields or fields[0] != 'timestamp':
+            raise ValueError("fields의 첫 번째 항목은 'timestamp'여야 합니다.")
+        self.max_points = max_points
+        self.window_sec = window_sec
+        self.fields = tuple(fields)
+        self._capacity = min(self.INITIAL_CAPACITY, max_points)
+        self._alloc(self._capacity)
+        self._start = 0  # 가장 오래된 틱의 논리 인덱스
+        self._end = 0    # 다음에 기록할 논리 인덱스
+
+    def _alloc(self, capacity: int):
+        self._cols: Dict[str, np.ndarray] = {f: np.zeros(2 * capacity, dtype=np.float64) for f in self.fields}
+        self._ts = self._cols['timestamp']
+        self._value_cols = [(f, self._cols[f]) for f in self.fields[1:]]
+
+    def __len__(self) -> int:
+        return self._end - self._start
+
+    def _grow(self):
+        """보관 중인 구간을 두 배 용량의 새 배열 앞쪽으로 옮긴다"""
+        n = len(self)
+        s = self._start % self._capacity
+        old = {f: col[s:s + n] for f, col in self._cols.items()}
+        self._capacity = min(self._capacity * 2, self.max_points)
+        self._alloc(self._capacity)
+        cap = self._capacity
+        for f, col in self._cols.items():
+            col[:n] = old[f]
+            col[cap:cap + n] = old[f]
+        self._start, self._end = 0, n
+
+    def append(self, t: float, data: Mapping[str, Any]) -> None:
+        """틱 1건 기록 후 용량/시간 윈도우 밖의 오래된 틱을 버린다"""
+        if self._end - self._start >= self._capacity and self._capacity < self.max_points:
+            self._grow()
+        cap = self._capacity
+        i = self._end % cap
+        j = i + cap
+        ts = self._ts
+        ts[i] = ts[j] = t
+        for f, col in self._value_cols:
+            v = data.get(f) or 0.0
+            col[i] = col[j] = v
+        self._end += 1
+
+        # 윈도우/용량 정리
+        if self._end - self._start > cap:
+            self._start = self._end - cap
+        cutoff = t - self.window_sec
+        while self._start < self._end and ts[self._start % cap] < cutoff:
+            self._start += 1
+
+    def _slice_since(self, cutoff: float) -> slice:
+        """timestamp >= cutoff 인 구간의 물리 슬라이스"""
+        n = len(self)
+        s = self._start % self._capacity
+        k = int(np.searchsorted(self._ts[s:s + n], cutoff, side='left'))
+        return slice(s + k, s + n)
+
+    def window(self, cutoff: float, fields: Optional[Iterable[str]] = None, copy: bool = True) -> Dict[str, np.ndarray]:
+        """
+        timestamp >= cutoff 인 틱들의 필드별 배열
+        - copy=True: 연속 구간 복사본 (락을 놓은 뒤에도 안전)
+        - copy=False: 읽기 전용 view (복사 없음). 이후 용량만큼 틱이 더 들어오면 내용이 덮어써지므로 즉시 사용해야 한다
+        """
+        sl = self._slice_since(cutoff)
+        out = {}
+        for f in (fields or self.fields):
+            arr = self._cols[f][sl]
+            if copy:
+                arr = arr.copy()
+            else:
+                arr.flags.writeable = False
+            out[f] = arr
+        return out
+
+    def last(self, field: str = 'price') -> Optional[float]:
+        if self._end == self._start:
+            return None
+        return float(self._cols[field][(self._end - 1) % self._capacity])
+
+    def clear(self) -> None:
+        self._start = self._end = 0
+
+    @property
+    def nbytes(self) -> int:
+        return sum(col.nbytes for col in self._cols.values())
@@ -2,13 +2,20 @@ import websocket
 import threading
 import json
 import time
+import random
 from core.position_manager import RealPositionManager
 from utils.logger import logger
 from api.kis_api import KISApi
 from web_socket.market_cache import MarketCache
+from web_socket.frame_decoder import split_frame, build_decoders, frame_key, FIELDS_PER_RECORD, H0STASP0_FIELDS
+from web_socket.tick_pipeline import FramePipeline
 from data.data_logger import data_logger
 from data.event_logger import event_logger
-from typing import Optional, Set, Iterable, Dict, Any
+from data.latency_tracer import latency_tracer
+from core.symbol_table import symbol_table
+from web_socket.exec_notice import EXEC_NOTICE_TRS, ExecNoticeCipher, parse_exec_notice, fill_events
+from data.frame_recorder import FrameRecorder
+from typing import Optional, Set, Iterable, Dict, Any, Callable, List
 import inspect
 
 class KISWebSocketClient:
@@ -30,10 +37,18 @@ class KISWebSocketClient:
         reconnect_max_tries: int = 0,  # 0 = 무제한
         url: Optional[str] = None,
         market_cache: MarketCache = None,
+        approval_key_provider: Optional[Callable[[], Optional[str]]] = None,  # 재연결 시 접속 키 재발급 (기본: api.get_approval_key)
+        name: str = "ws", # 세션 이름 (샤드 구분, 캡처 파일명)
+        gap_handler: Optional[Callable[[float, float, List[str]], None]] = None, # 재연결 후 (끊긴 시각, 복구 시각, 구독 종목) 통지
+        tick_filter: Optional[Callable[[str, List[tuple]], List[tuple]]] = None, # 캐시 반영 전 (세션 이름, 틱 목록) 필터 (이중화 중복 제거)
+        exec_notice_key: Optional[str] = None, # 체결통보 구독용 HTS ID (지정 시 연결마다 체결통보 구독)
+        exec_notice_tr: str = "H0STCNI0", # 체결통보 TR (모의투자: H0STCNI9)
     ):
         self.api = account_manager.api  # 필요  시 KISApi도 내부에서 사용 가능
         self.tr_id = tr_id
+        self.name = name
         self.approval_key = approval_key
+        self._approval_key_provider = approval_key_provider
         self.custtype = custtype    
         
         # KIS WebSocket 기본 URL
@@ -48,16 +63,47 @@ class KISWebSocketClient:
         self._subscribed: Set[str] = set() # 현재 구독중인 종목 (정규화된 코드)
         self._initial_codes = set(codes) if codes else set()
         self._pending_subscribe: Set[str] = set()
+        self._book_subscribed: Set[str] = set() # 호가(H0STASP0) 구독 종목
+        self._pending_book: Set[str] = set()
         self._ping_interval = ping_interval
         self._ping_thread: Optional[threading.Thread] = None
         self._reconnect_max_tries = reconnect_max_tries
         self._reconnect_attempts = 0
         self._is_reconnecting = False
+        self._disconnected_at: Optional[float] = None # 연결이 끊긴 시각 (epoch)
+        self.gap_handler = gap_handler
+        self.tick_filter = tick_filter
+        self.exec_notice_key = exec_notice_key
+        self.exec_notice_tr = exec_notice_tr
+        self._exec_cipher: Optional[ExecNoticeCipher] = None # 구독 응답으로 받은 복호화 키
+        self._recv_frames = 0
+        self._last_recv_ts = 0.0  # 마지막 프레임 수신 시각 (monotonic)
         self.market_cache = market_cache # 외부에서 주입받음
         if self.market_cache is None:
             logger.error("[WS] MarketCache가 주입되지 않았습니다. Client를 초기화할 수 없습니다.")
             raise ValueError("MarketCache is a required dependency.")
-        self.max_subscriptions = config.get('system', {}).get('max_subscriptions', 40)
+        system_config = config.get('system', {})
+        self.max_subscriptions = system_config.get('max_subscriptions', 40)
+        self._reconnect_max_delay = system_config.get('ws_reconnect_max_delay', 60)
+        # TR_ID별 컴파일된 디코더 (hot 필드는 설정으로 조정 가능)
+        self._decoders = build_decoders(system_config.get('ws_hot_fields'))
+        # 수신/처리 분리 파이프라인 (수신 스레드는 버퍼 적재만 수행)
+        self._pipeline: Optional[FramePipeline] = None
+        if system_config.get('ws_pipeline', True):
+            self._pipeline = FramePipeline(
+                handler=self._process_message,
+                capacity=system_config.get('ws_queue_size', 20000),
+                policy=system_config.get('ws_backpressure', 'drop_oldest'),
+                key_fn=frame_key,
+            )
+        # 원본 프레임 캡처 (재생/분석용, 선택)
+        self._recorder: Optional[FrameRecorder] = None
+        if system_config.get('ws_capture', False):
+            self._recorder = FrameRecorder(
+                base_dir=system_config.get('ws_capture_dir', 'data/capture'),
+                source=name,
+                max_segment_bytes=system_config.get('ws_capture_segment_mb', 64) * 1024 * 1024,
+            )
 
     def start(self):
         """WebSocket 연결 시작"""
@@ -71,7 +117,8 @@ class KISWebSocketClient:
         logger.info(f"[WS] 연결 시도: url={self.url}")
         logger.info(f"[WS] approval_key={self.approval_key[:16]}...")
         logger.info(f"[WS] tr_id={self.tr_id}")
-        
+
+        self._start_workers()
         self._spawn_ws()
 
     def stop(self):
@@ -82,8 +129,22 @@ class KISWebSocketClient:
         except Exception:
             pass
         self._connected_evt.clear()
+        self._stop_workers()
         logger.info("🛑 WebSocket 중지 요청 완료")
 
+    def _start_workers(self):
+        """수신 프레임 처리/기록용 백그라운드 스레드 시작"""
+        if self._pipeline:
+            self._pipeline.start()
+        if self._recorder:
+            self._recorder.start()
+
+    def _stop_workers(self):
+        if self._pipeline:
+            self._pipeline.stop()
+        if self._recorder:
+            self._recorder.stop()
+
     def wait_for_connection(self, timeout: int = 10) -> bool:
         """
         WebSocket 연결이 설정될 때까지 대기합니다.
@@ -93,28 +154,33 @@ class KISWebSocketClient:
         logger.info(f"[WS] WebSocket 연결 대기... (최대 {timeout}초)")
         return self._connected_evt.wait(timeout)
 
-    def subscribe(self, code: str):
-        """특정 종목의 실시간 시세 구독"""
+    def subscribe(self, code: str) -> bool:
+        """
+        특정 종목의 실시간 시세 구독.
+        구독 중이거나 구독했거나 연결 대기 목록에 넣었으면 True, 구독 한도 초과/전송 실패면 False
+        """
         if not code:
-            return
+            return False
         
         code = self._normalize(code)
         if code in self._subscribed:
-            return # 이미 구독 중
+            return True # 이미 구독 중
 
-        # 구독 개수 제한 체크 (안전장치)
-        if len(self._subscribed) >= self.max_subscriptions:
+        # 구독 개수 제한 체크 (안전장치, 체결가/호가 구독 합산)
+        if self.subscription_count >= self.max_subscriptions:
             logger.warning(f"📡 [WS] 최대 구독 개수({self.max_subscriptions}개) 초과로 구독 불가: {code}")
-            return
+            return False
 
         if not self.is_connected:
             self._pending_subscribe.add(code)
-            return
+            return True
         
         msg = self._build_msg(self.tr_id, code.lstrip('A'), subscribe=True)
         if self._send_json(msg):
             self._subscribed.add(code)
-            logger.info(f"📡 [WS] 구독: {code} (현재 {len(self._subscribed)}/{self.max_subscriptions})")
+            logger.info(f"📡 [WS] 구독: {code} (현재 {self.subscription_count}/{self.max_subscriptions})")
+            return True
+        return False
 
     def unsubscribe(self, code: str):
         """특정 종목의 실시간 시세 구독 해지"""
@@ -122,6 +188,7 @@ class KISWebSocketClient:
             return
         
         code = self._normalize(code)
+        self._pending_subscribe.discard(code)
         if code not in self._subscribed:
             return
         if not self.is_connected:
@@ -133,6 +200,50 @@ class KISWebSocketClient:
             self._subscribed.discard(code)
             logger.info(f"📡 [WS] 구독 해지: {code}")
 
+    def subscribe_book(self, code: str) -> bool:
+        """특정 종목의 실시간 10단계 호가(H0STASP0) 구독. 구독 개수 제한에 함께 집계됩니다. 반환값은 subscribe와 같음"""
+        if not code:
+            return False
+        code = self._normalize(code)
+        if code in self._book_subscribed:
+            return True
+        if self.subscription_count >= self.max_subscriptions:
+            logger.warning(f"📡 [WS] 최대 구독 개수({self.max_subscriptions}개) 초과로 호가 구독 불가: {code}")
+            return False
+        if not self.is_connected:
+            self._pending_book.add(code)
+            return True
+
+        msg = self._build_msg("H0STASP0", code.lstrip('A'), subscribe=True)
+        if self._send_json(msg):
+            self._book_subscribed.add(code)
+            logger.info(f"📡 [WS] 호가 구독: {code} (현재 {self.subscription_count}/{self.max_subscriptions})")
+            return True
+        return False
+
+    def unsubscribe_book(self, code: str):
+        """특정 종목의 실시간 호가 구독 해지"""
+        if not code:
+            return
+        code = self._normalize(code)
+        self._pending_book.discard(code)
+        if code not in self._book_subscribed:
+            return
+        if not self.is_connected:
+            self._book_subscribed.discard(code)
+            self.market_cache.order_books.discard(code)
+            return
+
+        msg = self._build_msg("H0STASP0", code.lstrip('A'), subscribe=False)
+        if self._send_json(msg):
+            self._book_subscribed.discard(code)
+            self.market_cache.order_books.discard(code)
+            logger.info(f"📡 [WS] 호가 구독 해지: {code}")
+
+    @property
+    def subscription_count(self) -> int:
+        return len(self._subscribed) + len(self._book_subscribed)
+
     def on_open(self, ws):
         logger.info("✅ WebSocket 연결 성공")
         with self._reconnect_lock:
@@ -141,18 +252,48 @@ class KISWebSocketClient:
         self._reconnect_attempts = 0 # 재연결 성공 시 시도 횟수 초기화
         self._start_ping_thread()
         try:
-            # 초기 구독 종목들 전송
-            for code in self._initial_codes:
-                self.subscribe(code)
-            # 재연결 시 보류된 구독 요청 처리
-            for code in list(self._pending_subscribe):
-                self.subscribe(code)
+            # 초기/보류/기존 구독을 한 번에 다시 전송 (재연결 시 서버측 구독은 모두 사라짐)
+            codes = self._subscribed | self._initial_codes | self._pending_subscribe
+            books = self._book_subscribed | self._pending_book
+            self._subscribed.clear()
+            self._book_subscribed.clear()
             self._pending_subscribe.clear()
+            self._pending_book.clear()
+            t0 = time.monotonic()
+            for code in codes:
+                self.subscribe(code)
+            for code in books:
+                self.subscribe_book(code)
+            if codes or books:
+                logger.info(f"[WS] 구독 {len(codes)}개, 호가 {len(books)}개 재전송 ({(time.monotonic() - t0) * 1000:.0f}ms)")
+            if self.exec_notice_key:
+                self._send_json(self._build_msg(self.exec_notice_tr, self.exec_notice_key, subscribe=True))
         except Exception as e:
             logger.error(f"WS 초기/보류 구독 실패: {e}")
 
+        # 끊김 구간 보충 (REST 분봉)
+        gap_start, self._disconnected_at = self._disconnected_at, None
+        if gap_start is not None:
+            logger.info(f"[WS] 재연결 완료: {time.time() - gap_start:.1f}s 끊김")
+            if self.gap_handler:
+                try:
+                    self.gap_handler(gap_start, time.time(), sorted(self._subscribed | self._pending_subscribe))
+                except Exception as e:
+                    logger.error(f"[WS] 끊김 구간 보충 요청 실패: {e}")
+
     def on_message(self, ws, message: str):
-        """웹소켓 메시지 수신 및 처리 (KIS 실시간 시세 포맷 파싱)"""
+        """웹소켓 메시지 수신. 처리 스레드가 동작 중이면 버퍼에 적재만 하고 즉시 반환"""
+        self._recv_frames += 1
+        recv_ts = self._last_recv_ts = time.monotonic()
+        if self._recorder:
+            self._recorder.append(message, recv_ts)
+        if self._pipeline and self._pipeline.is_running:
+            self._pipeline.put(message, recv_ts)
+        else:
+            self._process_message(message, recv_ts)
+
+    def _process_message(self, message: str, recv_ts: Optional[float] = None):
+        """웹소켓 메시지 처리 (KIS 실시간 시세 포맷 파싱)"""
         try:
             if not isinstance(message, str):
                 return
@@ -166,134 +307,54 @@ class KISWebSocketClient:
                 if tr_id == "PINGPONG":
                     # logger.info("[WS] PINGPONG 수신")
                     pass
+                elif tr_id in EXEC_NOTICE_TRS:  # 체결통보 구독 응답: 복호화 key/iv 수신
+                    output = body.get("output") or {}
+                    if output.get("key") and output.get("iv"):
+                        self._exec_cipher = ExecNoticeCipher(output["key"], output["iv"])
+                        fill_events.set_live(True)
+                        logger.info(f"📡 [WS] 체결통보 구독: {tr_id}")
+                    elif body.get("rt_cd") not in (None, "0"):
+                        logger.warning(f"[WS] 체결통보 구독 실패: {body.get('msg1')}")
                 #elif body.get("rt_cd") != "0":
                     #logger.warning(f"[WS] Error Message Received: {body}")
-                elif tr_id == "H0STCNT0":  # 실시간 주식 체결가 데이터
+                elif tr_id in self._decoders:  # 실시간 주식 체결가 데이터 등 스키마가 등록된 TR
                     output = body.get("output", {})
-
-                    # 공식 필드명에 맞춰 파싱
-                    parsed_data = {
-                        'code': output.get('MKSC_SHRN_ISCD', ''),
-                        'exec_time': output.get('STCK_CNTG_HOUR', ''),
-                        'price': float(output.get('STCK_PRPR', 0) or 0),
-                        'change_sign': output.get('PRDY_VRSS_SIGN', ''),
-                        'change': float(output.get('PRDY_VRSS', 0) or 0),
-                        'change_rate': float(output.get('PRDY_CTRT', 0) or 0),
-                        'wghn_avrg_stck_prc': float(output.get('WGHN_AVRG_STCK_PRC', 0) or 0),
-                        'open_price': float(output.get('STCK_OPRC', 0) or 0),
-                        'high_price': float(output.get('STCK_HGPR', 0) or 0),
-                        'low_price': float(output.get('STCK_LWPR', 0) or 0),
-                        'ask_price1': float(output.get('ASKP1', 0) or 0),
-                        'bid_price1': float(output.get('BIDP1', 0) or 0),
-                        'exec_vol': float(output.get('CNTG_VOL', 0) or 0),
-                        'acc_vol': float(output.get('ACML_VOL', 0) or 0),
-                        'acc_tr_amount': float(output.get('ACML_TR_PBMN', 0) or 0),
-                        'seln_cntg_csnu': int(output.get('SELN_CNTG_CSNU', 0) or 0),
-                        'shnu_cntg_csnu': int(output.get('SHNU_CNTG_CSNU', 0) or 0),
-                        'ntby_cntg_csnu': int(output.get('NTBY_CNTG_CSNU', 0) or 0),
-                        'cttr': float(output.get('CTTR', 0) or 0),
-                        'seln_cntg_smtn': float(output.get('SELN_CNTG_SMTN', 0) or 0),
-                        'shnu_cntg_smtn': float(output.get('SHNU_CNTG_SMTN', 0) or 0),
-                        'ccld_dvsn': output.get('CCLD_DVSN', ''),
-                        'shnu_rate': float(output.get('SHNU_RATE', 0) or 0),
-                        'prdy_vol_vrss_acml_vol_rate': float(output.get('PRDY_VOL_VRSS_ACML_VOL_RATE', 0) or 0),
-                        'oprc_hour': output.get('OPRC_HOUR', ''),
-                        'oprc_vrss_prpr_sign': output.get('OPRC_VRSS_PRPR_SIGN', ''),
-                        'oprc_vrss_prpr': float(output.get('OPRC_VRSS_PRPR', 0) or 0),
-                        'hgpr_hour': output.get('HGPR_HOUR', ''),
-                        'hgpr_vrss_prpr_sign': output.get('HGPR_VRSS_PRPR_SIGN', ''),
-                        'hgpr_vrss_prpr': float(output.get('HGPR_VRSS_PRPR', 0) or 0),
-                        'lwpr_hour': output.get('LWPR_HOUR', ''),
-                        'lwpr_vrss_prpr_sign': output.get('LWPR_VRSS_PRPR_SIGN', ''),
-                        'lwpr_vrss_prpr': float(output.get('LWPR_VRSS_PRPR', 0) or 0),
-                        'bsop_date': output.get('BSOP_DATE', ''),
-                        'new_mkop_cls_code': output.get('NEW_MKOP_CLS_CODE', ''),
-                        'trht_yn': output.get('TRHT_YN', ''),
-                        'askp_rsqn1': float(output.get('ASKP_RSQN1', 0) or 0),
-                        'bidp_rsqn1': float(output.get('BIDP_RSQN1', 0) or 0),
-                        'total_askp_rsqn': float(output.get('TOTAL_ASKP_RSQN', 0) or 0),
-                        'total_bidp_rsqn': float(output.get('TOTAL_BIDP_RSQN', 0) or 0),
-                        'vol_tnrt': float(output.get('VOL_TNRT', 0) or 0),
-                        'prdy_smns_hour_acml_vol': float(output.get('PRDY_SMNS_HOUR_ACML_VOL', 0) or 0),
-                        'prdy_smns_hour_acml_vol_rate': float(output.get('PRDY_SMNS_HOUR_ACML_VOL_RATE', 0) or 0),
-                        'hour_cls_code': output.get('HOUR_CLS_CODE', ''),
-                        'mrkt_trtm_cls_code': output.get('MRKT_TRTM_CLS_CODE', ''),
-                        'vi_stnd_prc': float(output.get('VI_STND_PRC', 0) or 0),
-                    }
-
-                    norm_code = self._normalize(parsed_data['code'])
-                    self.market_cache.update_tick(norm_code, parsed_data)
-                    # 1분봉 데이터 로거 (체결량 사용)
-                    data_logger.add_tick(norm_code, parsed_data['price'], parsed_data['exec_vol'])
-                    event_logger.log_event(parsed_data)
+                    if not output.get(self._decoders[tr_id].code_key):
+                        return  # 구독/해지 응답 (시세 없음)
+                    parsed_data = self._decoders[tr_id].decode_json(output)
+                    self._apply_ticks([(symbol_table.intern(parsed_data['code']), parsed_data)], recv_ts)
+                elif tr_id == "H0STASP0":  # 실시간 호가
+                    output = body.get("output", {})
+                    if not output.get(H0STASP0_FIELDS[0]):
+                        return
+                    fields = [output.get(k, '') for k in H0STASP0_FIELDS]
+                    self.market_cache.update_book(self._normalize(fields[0]), fields)
 
             elif message[0] in ['0', '1']:
                 # 실시간 시세 데이터 (파이프 | 로 헤더 분리, 캐럿 ^ 으로 데이터 분리)
-                # 이 부분은 JSON 파싱이 실패했을 때의 폴백으로 남겨둠
-                header_parts = message.split('|')
-                if len(header_parts) < 4: 
+                # 헤더의 데이터건수만큼 레코드가 한 프레임에 담겨 올 수 있음
+                frame = split_frame(message)
+                if frame is None:
                     logger.info(f"[WS] 알 수 없는 시세 포맷 (헤더 부족): {message}")
                     return
-                tr_id = header_parts[1]
-                data_payload = header_parts[3]
-
-                if tr_id == "H0STCNT0": 
-                    data_fields = data_payload.split('^')
-                    if len(data_fields) > 49:
-                        parsed_data = {
-                            'code': data_fields[0],  # MKSC_SHRN_ISCD (String)
-                            'exec_time': data_fields[1],  # STCK_CNTG_HOUR (String)
-                            'price': float(data_fields[2] or 0),  # STCK_PRPR (Number)
-                            'change_sign': data_fields[3],  # PRDY_VRSS_SIGN (String)
-                            'change': float(data_fields[4] or 0),  # PRDY_VRSS (Number)
-                            'change_rate': float(data_fields[5] or 0),  # PRDY_CTRT (Number)
-                            'wghn_avrg_stck_prc': float(data_fields[6] or 0),  # WGHN_AVRG_STCK_PRC (Number)
-                            'open_price': float(data_fields[7] or 0),  # STCK_OPRC (Number)
-                            'high_price': float(data_fields[8] or 0),  # STCK_HGPR (Number)
-                            'low_price': float(data_fields[9] or 0),  # STCK_LWPR (Number)
-                            'ask_price1': float(data_fields[10] or 0),  # ASKP1 (Number)
-                            'bid_price1': float(data_fields[11] or 0),  # BIDP1 (Number)
-                            'exec_vol': float(data_fields[12] or 0),  # CNTG_VOL (Number)
-                            'acc_vol': float(data_fields[13] or 0),  # ACML_VOL (Number)
-                            'acc_tr_amount': float(data_fields[14] or 0),  # ACML_TR_PBMN (Number)
-                            'seln_cntg_csnu': int(data_fields[15] or 0),  # SELN_CNTG_CSNU (Number)
-                            'shnu_cntg_csnu': int(data_fields[16] or 0),  # SHNU_CNTG_CSNU (Number)
-                            'ntby_cntg_csnu': int(data_fields[17] or 0),  # NTBY_CNTG_CSNU (Number)
-                            'cttr': float(data_fields[18] or 0),  # CTTR (Number)
-                            'seln_cntg_smtn': float(data_fields[19] or 0),  # SELN_CNTG_SMTN (Number)
-                            'shnu_cntg_smtn': float(data_fields[20] or 0),  # SHNU_CNTG_SMTN (Number)
-                            'ccld_dvsn': data_fields[21],  # CCLD_DVSN (String)
-                            'shnu_rate': float(data_fields[22] or 0),  # SHNU_RATE (Number)
-                            'prdy_vol_vrss_acml_vol_rate': float(data_fields[23] or 0),  # PRDY_VOL_VRSS_ACML_VOL_RATE (Number)
-                            'oprc_hour': data_fields[24],  # OPRC_HOUR (String)
-                            'oprc_vrss_prpr_sign': data_fields[25],  # OPRC_VRSS_PRPR_SIGN (String)
-                            'oprc_vrss_prpr': float(data_fields[26] or 0),  # OPRC_VRSS_PRPR (Number)
-                            'hgpr_hour': data_fields[27],  # HGPR_HOUR (String)
-                            'hgpr_vrss_prpr_sign': data_fields[28],  # HGPR_VRSS_PRPR_SIGN (String)
-                            'hgpr_vrss_prpr': float(data_fields[29] or 0),  # HGPR_VRSS_PRPR (Number)
-                            'lwpr_hour': data_fields[30],  # LWPR_HOUR (String)
-                            'lwpr_vrss_prpr_sign': data_fields[31],  # LWPR_VRSS_PRPR_SIGN (String)
-                            'lwpr_vrss_prpr': float(data_fields[32] or 0),  # LWPR_VRSS_PRPR (Number)
-                            'bsop_date': data_fields[33],  # BSOP_DATE (String)
-                            'new_mkop_cls_code': data_fields[34],  # NEW_MKOP_CLS_CODE (String)
-                            'trht_yn': data_fields[35],  # TRHT_YN (String)
-                            'askp_rsqn1': float(data_fields[36] or 0),  # ASKP_RSQN1 (Number)
-                            'bidp_rsqn1': float(data_fields[37] or 0),  # BIDP_RSQN1 (Number)
-                            'total_askp_rsqn': float(data_fields[38] or 0),  # TOTAL_ASKP_RSQN (Number)
-                            'total_bidp_rsqn': float(data_fields[39] or 0),  # TOTAL_BIDP_RSQN (Number)
-                            'vol_tnrt': float(data_fields[40] or 0),  # VOL_TNRT (Number)
-                            'prdy_smns_hour_acml_vol': float(data_fields[41] or 0),  # PRDY_SMNS_HOUR_ACML_VOL (Number)
-                            'prdy_smns_hour_acml_vol_rate': float(data_fields[42] or 0),  # PRDY_SMNS_HOUR_ACML_VOL_RATE (Number)
-                            'hour_cls_code': data_fields[43],  # HOUR_CLS_CODE (String)
-                            'mrkt_trtm_cls_code': data_fields[44],  # MRKT_TRTM_CLS_CODE (String)
-                            'vi_stnd_prc': float(data_fields[45] or 0),  # VI_STND_PRC (Number)
-                        }
-
-                        norm_code = self._normalize(parsed_data['code'])
-                        self.market_cache.update_tick(norm_code, parsed_data)
-                        # 1분봉 데이터 로거 (체결량 사용)
-                        data_logger.add_tick(norm_code, parsed_data['price'], parsed_data['exec_vol'])
-                        event_logger.log_event(parsed_data)
+
+                if frame.encrypted:
+                    if frame.tr_id in EXEC_NOTICE_TRS:
+                        self._handle_exec_notice(frame.payload, recv_ts)
+                    return
+
+                if frame.tr_id == "H0STASP0":
+                    width = FIELDS_PER_RECORD["H0STASP0"]
+                    for rec in frame.records:
+                        if len(rec) >= width:
+                            self.market_cache.update_book(self._normalize(rec[0]), rec)
+                    return
+
+                decoder = self._decoders.get(frame.tr_id)
+                if decoder is not None:
+                    intern = symbol_table.intern
+                    ticks = [(intern(rec['code']), rec) for rec in decoder.decode_frame(frame)]
+                    self._apply_ticks(ticks, recv_ts)
 
         except Exception as e:
             # error 로그에만 위치 정보 추가
@@ -320,51 +381,105 @@ class KISWebSocketClient:
             except Exception as ee:
                 logger.error(f"[WS] 메시지 처리 중 오류(로깅 중 추가 오류): {ee} | 원래 오류: {e} | 메시지: {message}")
 
+    def _handle_exec_notice(self, payload: str, recv_ts: Optional[float]):
+        """암호화된 체결통보를 복호화하여 체결 이벤트로 발행"""
+        if self._exec_cipher is None:
+            logger.warning("[WS] 복호화 키 수신 전 체결통보 무시")
+            return
+        event = parse_exec_notice(self._exec_cipher.decrypt(payload), recv_ts)
+        if event is not None:
+            logger.info(f"[FILL] 체결통보: 주문 {event.order_id} {event.side} {event.code} {event.qty}주 @{event.price:,.0f}")
+            fill_events.publish(event)
+
+    def _apply_ticks(self, ticks, recv_ts: Optional[float] = None):
+        """파싱된 (종목 ID, 틱) 목록을 캐시에 일괄 반영하고 로거에 전달"""
+        if self.tick_filter and ticks:
+            ticks = self.tick_filter(self.name, ticks)
+        if not ticks:
+            return
+        recv_ts = recv_ts or time.monotonic()
+        for _, parsed_data in ticks:
+            parsed_data['recv_ts'] = recv_ts # 소켓 수신 시각 (지연 추적용)
+        self.market_cache.update_ticks(ticks)
+        latency_tracer.record_ticks(ticks, recv_ts, ticks[-1][1].get('apply_ts') or time.monotonic())
+        for sid, parsed_data in ticks:
+            # 1분봉 데이터 로거 (체결량 사용)
+            data_logger.add_tick(sid, parsed_data['price'], parsed_data['exec_vol'])
+            event_logger.log_event(parsed_data)
+
     def on_error(self, ws, err):
         logger.error(f"🚨 WebSocket 에러: {err}")
-        self._schedule_reconnect()
+        if ws is not None and ws is not self.wsapp:
+            return # 이미 교체된 이전 세션의 콜백
+        self._mark_disconnected()
+        self._schedule_reconnect(ws)
 
     def on_close(self, ws, code=None, msg=None):
         logger.info(f"WebSocket 연결 종료 code={code} msg={msg}")
+        if ws is not None and ws is not self.wsapp:
+            return # 이미 교체된 이전 세션의 콜백
         self._connected_evt.clear()
-        self._schedule_reconnect()
+        self._mark_disconnected()
+        self._schedule_reconnect(ws)
+
+    def _mark_disconnected(self):
+        if self.exec_notice_key:
+            fill_events.set_live(False) # 재연결 후 구독 응답을 받을 때까지 REST 조회로 대체
+        if self._disconnected_at is None and not self._stop_evt.is_set():
+            self._disconnected_at = time.time()
 
-    def _schedule_reconnect(self):
+    def _schedule_reconnect(self, ws=None):
         with self._reconnect_lock:
             if self._stop_evt.is_set(): return
+            if ws is not None and ws is not self.wsapp:
+                return # 이전 세션의 에러/종료 콜백은 무시
 
             if self._is_reconnecting:
                 logger.debug("[WS] 재연결이 이미 진행 중입니다.")
                 return
             self._is_reconnecting = True
 
-            if self._reconnect_max_tries and self._reconnect_attempts >= self._reconnect_max_tries:
-                logger.error("재연결 최대 횟수 도달 → 중지")
+            delay = self._next_reconnect_delay()
+            if delay is None:
                 self._is_reconnecting = False
                 return
-            
-            self._reconnect_attempts += 1
-
-            # 5번 실패마다 접속 키 갱신 시도
-            if self._reconnect_attempts > 0 and self._reconnect_attempts % 5 == 0:
-                logger.warning(f"[WS] 재연결 {self._reconnect_attempts}회 실패. 접속 키 갱신을 시도합니다.")
-                try:
-                    new_key = self.api.get_approval_key()
-                    if new_key:
-                        self.approval_key = new_key
-                        logger.info("[WS] 새 접속 키로 갱신되었습니다.")
-                    else:
-                        logger.error("[WS] 새 접속 키 발급에 실패했습니다.")
-                except Exception as e:
-                    logger.error(f"[WS] 접속 키 갱신 중 오류: {e}")
-
-            # 지수 백오프 적용
-            delay = min(10 * (2 ** min(self._reconnect_attempts - 1, 5)), 300) # 10s, 20s, 40s, 80s, 160s, 300s (최대 5분)
             logger.info(f"[WS] {delay}s 후 재연결 시도 (#{self._reconnect_attempts})")
             threading.Thread(target=self._reconnect_after, args=(delay,), daemon=True).start()
 
-    def _reconnect_after(self, delay: int):
-        time.sleep(delay)
+    def _next_reconnect_delay(self) -> Optional[float]:
+        """
+        재연결 시도 횟수를 증가시키고 대기 시간(초)을 반환합니다.
+        첫 시도는 즉시, 이후는 지터를 준 지수 백오프(최대 ws_reconnect_max_delay초)입니다.
+        최대 시도 횟수에 도달하면 None을 반환합니다. (5번 실패마다 접속 키 갱신 포함)
+        """
+        if self._reconnect_max_tries and self._reconnect_attempts >= self._reconnect_max_tries:
+            logger.error("재연결 최대 횟수 도달 → 중지")
+            return None
+
+        self._reconnect_attempts += 1
+
+        # 5번 실패마다 접속 키 갱신 시도
+        if self._reconnect_attempts > 0 and self._reconnect_attempts % 5 == 0:
+            logger.warning(f"[WS] 재연결 {self._reconnect_attempts}회 실패. 접속 키 갱신을 시도합니다.")
+            try:
+                new_key = (self._approval_key_provider or self.api.get_approval_key)()
+                if new_key:
+                    self.approval_key = new_key
+                    logger.info("[WS] 새 접속 키로 갱신되었습니다.")
+                else:
+                    logger.error("[WS] 새 접속 키 발급에 실패했습니다.")
+            except Exception as e:
+                logger.error(f"[WS] 접속 키 갱신 중 오류: {e}")
+
+        if self._reconnect_attempts == 1:
+            return 0.0
+        # 지수 백오프 + 지터 (동시에 끊긴 여러 세션이 같은 순간에 몰리지 않도록)
+        base = min(2 ** (self._reconnect_attempts - 1), self._reconnect_max_delay) # 2s, 4s, 8s, ... 최대 60s
+        return round(base * random.uniform(0.5, 1.0), 2)
+
+    def _reconnect_after(self, delay: float):
+        if delay > 0:
+            time.sleep(delay)
         if self._stop_evt.is_set():
             with self._reconnect_lock:
                 self._is_reconnecting = False
@@ -394,6 +509,7 @@ class KISWebSocketClient:
 
     def _spawn_ws(self):
         self._connected_evt.clear()
+        old = self.wsapp
         self.wsapp = websocket.WebSocketApp(
             self.url,
             on_open=self.on_open,
@@ -402,6 +518,11 @@ class KISWebSocketClient:
             on_close=self.on_close
         )
         threading.Thread(target=self.wsapp.run_forever, daemon=True).start()
+        if old is not None:
+            try:
+                old.close() # 에러만 나고 닫히지 않은 이전 세션 정리 (콜백은 무시됨)
+            except Exception:
+                pass
 
     def _build_msg(self, tr_id: str, tr_key: str, subscribe: bool) -> Optional[Dict[str, Any]]:
         """KIS 웹소켓 구독/해지 메시지 JSON 포맷 생성"""
@@ -435,18 +556,32 @@ class KISWebSocketClient:
             logger.debug(f"[WS] send 실패: {e}")
             return False
 
+    def get_pipeline_stats(self) -> Dict[str, Any]:
+        """수신 파이프라인 카운터 (대기 깊이, 유실/교체 건수, 최대 지연)"""
+        return self._pipeline.get_stats() if self._pipeline else {}
+
+    def get_health(self) -> Dict[str, Any]:
+        """세션 상태 (연결 여부, 구독 수, 재연결 횟수, 마지막 수신 후 경과 시간, 파이프라인 지연)"""
+        idle = round(time.monotonic() - self._last_recv_ts, 3) if self._last_recv_ts else None
+        return {
+            "connected": self.is_connected,
+            "subscriptions": self.subscription_count,
+            "pending": len(self._pending_subscribe) + len(self._pending_book),
+            "reconnect_attempts": self._reconnect_attempts,
+            "recv_frames": self._recv_frames,
+            "idle_sec": idle,
+            "pipeline": self.get_pipeline_stats(),
+            "recorder": self._recorder.get_stats() if self._recorder else {},
+        }
+
     @property
     def is_connected(self) -> bool:
         return (self.wsapp is not None) and self._connected_evt.is_set()
 
     @staticmethod
     def _normalize(code: str) -> str:
-        s = str(code).strip().upper()
-        s = s.replace("-", "").replace(".", "").lstrip("A")
-        # 숫자 6자리 보정
-        if s.isdigit() and len(s) <= 6:
-            s = s.zfill(6)
-        return f"A{s}"
+        # 정규화 결과는 심볼 테이블에 캐싱됨 (원본 표기별 1회만 문자열 가공)
+        return symbol_table.normalize(code)
 
     def refresh_approval_key(self, new_key: str) -> None:
         try: